@@ -8,23 +8,44 @@ import shutil
 import signal
 import subprocess
 import time
-import tempfile
 import math
 import collections
-import hashlib
 import re
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
 
 
 from mutation.mutator_pool import MutatorPool
-from utils.compiler import RustCompiler, CompilationStatus
+from utils.compiler import (
+    RustCompiler,
+    CompilationStatus,
+    CompilerMatrix,
+    CompileCache,
+    CompileSlots,
+    configure_compile_cache,
+    configure_compile_slots,
+)
 from utils.ttdn_model import TTDNModel
-from LLM import LLMConnector, ExtractorAgent, InjectorAgent, RevisionAgent
+from utils.seed_index import SeedIndex, tool_identity
+from utils.seed_weights import WeightedSampler
+from utils.seed_manifest import INTERNAL_SCAN_BYTES, SeedEntry, SeedManifest, infer_family, is_internal_only_source
+from utils.mutation_client import MutationServerClient, MutationToolError
+from utils.pipeline import VariantPipeline
+from utils.scratch import ScratchWorkspace, configure_scratch
+from utils.analysis.bug_index import BugLocationIndex
+from utils.results_catalog import ResultsCatalog
+from utils.case_store import PackedCaseStore, render_detail_log
+from utils.coverage.case_queue import FEEDBACK_FILENAME, FeedbackReader, wait_for_queue_room
+from utils.analysis.signature import bucket_key as crash_bucket_key, parse_crash
+from LLM import LLMConnector, RevisionAgent
 from LLM.agents.trait_rewriter import TraitRewriterAgent
 
+# One planned mutant flowing through the worker pipeline (produce -> compile -> classify).
+PlannedVariant = collections.namedtuple("PlannedVariant", "variant_id variant_index strategy content")
+
+
 class SimpleFileLock:
     def __init__(self, lock_file: Path, timeout: float = 300.0):
         self.lock_file = lock_file
@@ -115,6 +136,7 @@ def _start_coverage_consumer_if_needed(worker_index: int, config: Dict):
     case_dir.mkdir(parents=True, exist_ok=True)
     consumer_log = live_dir / "consumer.log"
 
+    coverage_cfg = config.get("coverage", {})
     cmd = [
         sys.executable,
         "utils/coverage/live_case_consumer.py",
@@ -122,6 +144,10 @@ def _start_coverage_consumer_if_needed(worker_index: int, config: Dict):
         str(case_dir),
         "--work-dir",
         str(live_dir),
+        "--jobs",
+        str(int(coverage_cfg.get("compile_jobs", 4))),
+        "--max-queued",
+        str(int(coverage_cfg.get("max_queued_cases", 512))),
     ]
 
     try:
@@ -133,6 +159,20 @@ def _start_coverage_consumer_if_needed(worker_index: int, config: Dict):
         logging.warning("Failed to start coverage consumer: %s", e)
 
 
+def _detail_section(name: str, cmd, res) -> Dict:
+    """One compiler run as a detail.log section (see utils.case_store.render_detail_log)."""
+    return {
+        "name": name,
+        "command": " ".join(map(str, cmd)),
+        "status": res.status.value,
+        "duration": res.duration,
+        "tier": res.tier,
+        "return_code": res.return_code,
+        "stdout": res.stdout,
+        "stderr": res.stderr,
+    }
+
+
 def _dir_size_bytes(path: Path) -> int:
     total = 0
     try:
@@ -217,13 +257,17 @@ def _prune_oldest_files(files: List[Path], max_keep: int, label: str, log_first_
 # churn. This is intentionally not user-configurable.
 _PRUNE_WATERMARK = 0.90
 
+# Default interval between full rescans of a cataloged results namespace.
+_CATALOG_RECONCILE_SEC = 600.0
+
 
 _BUG_LOCATION_RE = re.compile(r"([A-Za-z0-9_./\\-]+\.(?:h|hpp|c|cc|cpp|rs)):(\d+)")
 _ICE_SIG_RE = re.compile(
     r"internal compiler error:\s*in\s*([^,\n]+),\s*at\s*([^\n]+)",
     re.IGNORECASE,
 )
-_TMP_TRAIT_FUZZER_DIR_RE = re.compile(r"/tmp/trait_fuzzer_rustc_[^/]+/")
+# Compiler out-dirs: a fresh /tmp/trait_fuzzer_rustc_* or a scratch slot .../trait_fuzzer_rustc_t<k>/.
+_TMP_TRAIT_FUZZER_DIR_RE = re.compile(r"(?:/[^/\s:]+)*/trait_fuzzer_rustc_[^/]+/")
 _TEMP_CASE_RS_RE = re.compile(r"(^|/)temp_w\d+_iter_\d+_[^/:]+\.rs$")
 
 
@@ -243,7 +287,26 @@ def _normalize_bug_path(path: str) -> str:
 
 
 def _extract_bug_location(stderr: str) -> Optional[str]:
-    """Best-effort extraction of a compiler bug location like path/file.h:123."""
+    """Crash dedup key: the stack-signature bucket when the output parses as a
+    rustc panic/ICE or gccrs ICE, else a best-effort location like path/file.h:123."""
+    text = str(stderr or "")
+    if not text:
+        return None
+
+    try:
+        key = crash_bucket_key(text)
+    except Exception:
+        key = None
+    if key:
+        return key
+    return _legacy_bug_location(text)
+
+
+def _legacy_bug_location(stderr: str) -> Optional[str]:
+    """The pre-signature dedup key (ICE header or best-effort path/file.h:123).
+
+    Older crash indexes and `.bug_locations.txt` files are keyed this way.
+    """
     text = str(stderr or "")
     if not text:
         return None
@@ -277,11 +340,24 @@ def _extract_bug_location(stderr: str) -> Optional[str]:
     return f"{_normalize_bug_path(p)}:{line}"
 
 
+_bug_indexes: Dict[str, BugLocationIndex] = {}
+
+
+def _bug_index_for(results_root: Path) -> BugLocationIndex:
+    key = str(Path(results_root).resolve())
+    index = _bug_indexes.get(key)
+    if index is None:
+        index = BugLocationIndex.for_results(results_root)
+        _bug_indexes[key] = index
+    return index
+
+
 def _dedup_crash_status_by_location(
     results_root: Path,
     compiler_ns: str,
     status_name: str,
     stderr: str,
+    case_id: str = "",
 ) -> tuple:
     """If crash location is seen before, route status from crash -> dup.
 
@@ -296,37 +372,30 @@ def _dedup_crash_status_by_location(
 
     results_root = Path(results_root)
     ns = str(compiler_ns)
-    crash_dir = results_root / ns / "crash"
-    crash_dir.mkdir(parents=True, exist_ok=True)
-
-    index_file = crash_dir / ".bug_locations.txt"
-    lock_dir = results_root / f".{ns}_crash_dedup_lock.dir"
+    (results_root / ns / "crash").mkdir(parents=True, exist_ok=True)
 
+    # Locations recorded before crash signatures (imported .bug_locations.txt, old index
+    # rows) use file:line keys; a crash at one of those is a known bug, not a new one.
+    # The index matches these aliases against legacy rows only.
+    aliases = []
     try:
-        with SimpleFileLock(lock_dir, timeout=30):
-            seen = set()
-            if index_file.exists():
-                try:
-                    seen = {
-                        ln.strip()
-                        for ln in index_file.read_text(encoding="utf-8", errors="ignore").splitlines()
-                        if ln.strip()
-                    }
-                except Exception:
-                    seen = set()
-
-            if bug_location in seen:
-                return "dup", bug_location, True
-
-            try:
-                with open(index_file, "a", encoding="utf-8") as f:
-                    f.write(bug_location + "\n")
-            except Exception:
-                pass
-
-            return "crash", bug_location, False
+        sig = parse_crash(stderr)
     except Exception:
+        sig = None
+    for alias in (_legacy_bug_location(stderr), sig.location if sig is not None else None):
+        if alias and alias != bug_location and alias not in aliases:
+            aliases.append(alias)
+
+    try:
+        index = _bug_index_for(results_root)
+        index.import_legacy(ns, results_root / ns / "crash" / ".bug_locations.txt")
+        is_new, _ = index.check_and_insert(ns, bug_location, case_id, aliases=aliases)
+    except Exception as e:
+        logging.warning("Crash dedup index unavailable: %s", e)
         return status_name, bug_location, False
+    if not is_new:
+        return "dup", bug_location, True
+    return "crash", bug_location, False
 
 
 def enforce_results_limits(
@@ -338,9 +407,20 @@ def enforce_results_limits(
     keep_error_cases: int,
     keep_fate_cases: int,
     keep_rewritten_cases: int = -1,
+    catalog: Optional[ResultsCatalog] = None,
+    reconcile_sec: float = _CATALOG_RECONCILE_SEC,
+    case_store: Optional[PackedCaseStore] = None,
 ) -> bool:
     """Prune SUCCESS/ERROR/FATE cases under one result namespace directory.
 
+    With a `catalog`, counts and sizes come from it and victims are popped
+    oldest-first from its index (no directory scan); the namespace is rescanned
+    every `reconcile_sec` to pick up manual changes. Without one, every status
+    directory is listed and stat'ed on each call.
+
+    With a `case_store`, this namespace's packed records count against the same
+    limits once the case directories have been pruned.
+
     Returns True if safe to continue. If disk is still below min_free_gb after
     pruning prunable categories, returns False.
     """
@@ -349,6 +429,193 @@ def enforce_results_limits(
 
     prune_watermark = _PRUNE_WATERMARK
 
+    if catalog is not None:
+        _prune_cataloged_cases(
+            catalog,
+            results_dir,
+            max_cases=max_cases,
+            max_results_gb=max_results_gb,
+            keep_success_cases=keep_success_cases,
+            keep_error_cases=keep_error_cases,
+            keep_fate_cases=keep_fate_cases,
+            reconcile_sec=reconcile_sec,
+        )
+    else:
+        _prune_scanned_cases(
+            results_dir,
+            max_cases=max_cases,
+            max_results_gb=max_results_gb,
+            keep_success_cases=keep_success_cases,
+            keep_error_cases=keep_error_cases,
+            keep_fate_cases=keep_fate_cases,
+        )
+
+    if case_store is not None:
+        try:
+            _prune_packed_cases(
+                case_store,
+                results_dir,
+                catalog=catalog,
+                max_cases=max_cases,
+                max_results_gb=max_results_gb,
+                keep_success_cases=keep_success_cases,
+                keep_error_cases=keep_error_cases,
+                keep_fate_cases=keep_fate_cases,
+            )
+        except Exception as e:
+            logging.warning("Packed case store pruning failed: %s", e)
+
+    # Rewrites are now stored under the LLM subfolder instead of results/rewrites.
+    # When results are nested (e.g. results/rustc, results/gccrs), try a couple
+    # of parents to find the project-level LLM/rewrites directory.
+    rewrite_candidates = [
+        results_dir.parent / "LLM" / "rewrites",
+        results_dir.parent.parent / "LLM" / "rewrites",
+        Path("LLM") / "rewrites",
+    ]
+    rewrite_dir = rewrite_candidates[0]
+    for cand in rewrite_candidates:
+        if cand.exists():
+            rewrite_dir = cand
+            break
+    if rewrite_dir.exists() and keep_rewritten_cases >= 0:
+        rewritten_files = list(rewrite_dir.glob("*.rs"))
+        if len(rewritten_files) > keep_rewritten_cases:
+            target = int(keep_rewritten_cases * prune_watermark)
+            target = min(target, keep_rewritten_cases)
+            _prune_oldest_files(rewritten_files, target, label="rewrite", log_first_only=True)
+
+    # 3) Disk free guard (only stop if still low after pruning prunable categories)
+    if min_free_gb is not None:
+        try:
+            usage = shutil.disk_usage(str(results_dir))
+        except FileNotFoundError:
+            usage = shutil.disk_usage(str(results_dir.parent))
+        min_free_bytes = int(min_free_gb * 1024**3)
+        if usage.free < min_free_bytes:
+            logging.warning(
+                "Low disk space after pruning prunable results: free=%.2fGB < min_free=%.2fGB. Stopping.",
+                usage.free / 1024**3,
+                min_free_gb,
+            )
+            return False
+
+    return True
+
+
+def _prune_cataloged_cases(
+    catalog: ResultsCatalog,
+    results_dir: Path,
+    max_cases: Optional[int],
+    max_results_gb: Optional[float],
+    keep_success_cases: int,
+    keep_error_cases: int,
+    keep_fate_cases: int,
+    reconcile_sec: float,
+):
+    ns = results_dir.name
+    if catalog.needs_reconcile(ns, reconcile_sec):
+        added, dropped = catalog.reconcile(results_dir)
+        if added or dropped:
+            logging.info("Results catalog reconciled %s: +%d / -%d cases", results_dir, added, dropped)
+
+    def _prune(statuses, label, max_count=None, max_bytes=None):
+        logged = False
+        for status, name in catalog.claim_oldest(ns, statuses, max_count=max_count, max_bytes=max_bytes):
+            victim = results_dir / status / name
+            try:
+                shutil.rmtree(victim)
+                if not logged:
+                    logging.info("Pruned old %s case: %s", label, victim)
+                    logged = True
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.warning("Failed to prune %s: %s", victim, e)
+
+    # 1) Per-category pruning policy
+    for status, keep in (("success", keep_success_cases), ("error", keep_error_cases), ("fate", keep_fate_cases)):
+        if keep >= 0 and catalog.stats(ns, [status])[0] > keep:
+            _prune([status], status, max_count=min(int(keep * _PRUNE_WATERMARK), keep))
+
+    # 2) Global caps (apply ONLY to prunable categories: success+error)
+    prunable = ("success", "error")
+    count, size = catalog.stats(ns, prunable)
+    if max_cases is not None and count > max_cases:
+        _prune(prunable, "prunable (max-cases)", max_count=min(int(max_cases * _PRUNE_WATERMARK), max_cases))
+    if max_results_gb is not None:
+        max_results_bytes = int(max_results_gb * 1024**3)
+        if size > max_results_bytes:
+            target_bytes = min(int(max_results_bytes * _PRUNE_WATERMARK), max_results_bytes)
+            _prune(prunable, "prunable (max-results-gb)", max_bytes=target_bytes)
+
+
+def _prune_packed_cases(
+    case_store: PackedCaseStore,
+    results_dir: Path,
+    catalog: Optional[ResultsCatalog],
+    max_cases: Optional[int],
+    max_results_gb: Optional[float],
+    keep_success_cases: int,
+    keep_error_cases: int,
+    keep_fate_cases: int,
+):
+    """Apply the results limits to packed records: whatever the remaining case
+    directories leave of each budget, oldest records first, then compact."""
+    ns = results_dir.name
+
+    def _dir_usage(statuses):
+        if catalog is not None:
+            return catalog.stats(ns, statuses)
+        dirs = [d for st in statuses for d in _iter_case_dirs_in(results_dir / st)]
+        return len(dirs), sum(_dir_size_bytes(results_dir / st) for st in statuses)
+
+    evicted = 0
+    # 1) Per-category pruning policy
+    for status, keep in (("success", keep_success_cases), ("error", keep_error_cases), ("fate", keep_fate_cases)):
+        if keep < 0:
+            continue
+        dir_count, _ = _dir_usage([status])
+        packed_count, _ = case_store.usage(ns, [status])
+        if packed_count and dir_count + packed_count > keep:
+            target = min(int(keep * _PRUNE_WATERMARK), keep)
+            evicted += case_store.evict_oldest(ns, [status], keep_count=max(0, target - dir_count))
+
+    # 2) Global caps (apply ONLY to prunable categories: success+error)
+    prunable = ("success", "error")
+    dir_count, dir_bytes = _dir_usage(prunable)
+    packed_count, packed_bytes = case_store.usage(ns, prunable)
+    if max_cases is not None and packed_count and dir_count + packed_count > max_cases:
+        target = min(int(max_cases * _PRUNE_WATERMARK), max_cases)
+        evicted += case_store.evict_oldest(ns, prunable, keep_count=max(0, target - dir_count))
+        packed_count, packed_bytes = case_store.usage(ns, prunable)
+    if max_results_gb is not None and packed_count:
+        max_results_bytes = int(max_results_gb * 1024**3)
+        if dir_bytes + packed_bytes > max_results_bytes:
+            target_bytes = min(int(max_results_bytes * _PRUNE_WATERMARK), max_results_bytes)
+            evicted += case_store.evict_oldest(ns, prunable, free_bytes=dir_bytes + packed_bytes - target_bytes)
+
+    if evicted:
+        removed, reclaimed = case_store.compact()
+        logging.info(
+            "Evicted %d old packed %s cases; compacted %d segments (%.1f MB)",
+            evicted,
+            ns,
+            removed,
+            reclaimed / (1024 * 1024),
+        )
+
+
+def _prune_scanned_cases(
+    results_dir: Path,
+    max_cases: Optional[int],
+    max_results_gb: Optional[float],
+    keep_success_cases: int,
+    keep_error_cases: int,
+    keep_fate_cases: int,
+):
+    prune_watermark = _PRUNE_WATERMARK
+
     # 1) Per-category pruning policy
     by_status = _case_dirs_by_status(results_dir)
     success_dirs = by_status.get("success", [])
@@ -372,26 +639,6 @@ def enforce_results_limits(
             target = min(target, keep_fate_cases)
             _prune_oldest(fate_dirs, target, label="fate", log_first_only=True)
 
-    # Rewrites are now stored under the LLM subfolder instead of results/rewrites.
-    # When results are nested (e.g. results/rustc, results/gccrs), try a couple
-    # of parents to find the project-level LLM/rewrites directory.
-    rewrite_candidates = [
-        results_dir.parent / "LLM" / "rewrites",
-        results_dir.parent.parent / "LLM" / "rewrites",
-        Path("LLM") / "rewrites",
-    ]
-    rewrite_dir = rewrite_candidates[0]
-    for cand in rewrite_candidates:
-        if cand.exists():
-            rewrite_dir = cand
-            break
-    if rewrite_dir.exists() and keep_rewritten_cases >= 0:
-        rewritten_files = list(rewrite_dir.glob("*.rs"))
-        if len(rewritten_files) > keep_rewritten_cases:
-            target = int(keep_rewritten_cases * prune_watermark)
-            target = min(target, keep_rewritten_cases)
-            _prune_oldest_files(rewritten_files, target, label="rewrite", log_first_only=True)
-
     # 2) Global caps (apply ONLY to prunable categories: success+error)
     prunable_dirs = _sort_oldest_first(success_dirs + error_dirs)
     if max_cases is not None:
@@ -439,23 +686,6 @@ def enforce_results_limits(
                 logging.warning("Failed to prune %s: %s", victim, e)
                 break
 
-    # 3) Disk free guard (only stop if still low after pruning prunable categories)
-    if min_free_gb is not None:
-        try:
-            usage = shutil.disk_usage(str(results_dir))
-        except FileNotFoundError:
-            usage = shutil.disk_usage(str(results_dir.parent))
-        min_free_bytes = int(min_free_gb * 1024**3)
-        if usage.free < min_free_bytes:
-            logging.warning(
-                "Low disk space after pruning prunable results: free=%.2fGB < min_free=%.2fGB. Stopping.",
-                usage.free / 1024**3,
-                min_free_gb,
-            )
-            return False
-
-    return True
-
 
 def pick_next_new_seed_dir(seeds_dir: Path, prefix: str = "new") -> Path:
     seeds_dir = Path(seeds_dir)
@@ -475,6 +705,14 @@ def pick_next_new_seed_dir(seeds_dir: Path, prefix: str = "new") -> Path:
     return out
 
 
+def promoted_seed_path(promoted_dir: Path, stem: str) -> Path:
+    """`<promoted_dir>/<stem>.rs`, or a timestamped name if that file already exists."""
+    out_path = Path(promoted_dir) / f"{stem}.rs"
+    if out_path.exists():
+        out_path = Path(promoted_dir) / f"{stem}_{int(time.time())}.rs"
+    return out_path
+
+
 def enforce_seed_file_cap(seed_dir: Path, max_files: int):
     seed_dir = Path(seed_dir)
     if max_files <= 0 or not seed_dir.exists():
@@ -636,7 +874,18 @@ def parse_args_and_config(argv: Optional[List[str]] = None):
     return args, config
 
 class SeedSelector:
-    def __init__(self, seeds_dir: Path, fuzzer_cfg: Optional[dict] = None, promoted_prefix: str = "new", shard_index: int = 0, num_shards: int = 1):
+    def __init__(
+        self,
+        seeds_dir: Path,
+        fuzzer_cfg: Optional[dict] = None,
+        promoted_prefix: str = "new",
+        shard_index: int = 0,
+        num_shards: int = 1,
+        ttdn_model: Optional[TTDNModel] = None,
+        seed_index: Optional[SeedIndex] = None,
+        manifest_shard: Optional[List[SeedEntry]] = None,
+        parse_tool: Optional[str] = None,
+    ):
         # Allow organizing seeds in subdirectories (e.g. imported official suites).
         self._seeds_dir = Path(seeds_dir)
         self._promoted_prefix = str(promoted_prefix or "new")
@@ -655,45 +904,70 @@ class SeedSelector:
 
         self._promoted_seeds: set = set()
 
-        all_seeds = list(seeds_dir.rglob("*.rs"))
-        # Sort for deterministic sharding
-        all_seeds.sort()
-        
-        # Filter internal-only seeds first, and also ignore empty files
-        valid_seeds = []
-        empty_count = 0
-        for p in all_seeds:
-            if not p.is_file():
-                continue
-            if p.stat().st_size == 0:
-                empty_count += 1
-                continue
-            if not self._is_internal_only_seed(p):
-                valid_seeds.append(p)
-
-        if empty_count > 0:
-            logging.warning("Ignored %d empty seed files (0 bytes)", empty_count)
-        
-        # Apply sharding
-        self.seeds = []
-        for i, seed in enumerate(valid_seeds):
-            if i % self._num_shards == self._shard_index:
-                self.seeds.append(seed)
+        # Families known up front (manifest entries carry them).
+        manifest_families: Dict[Path, str] = {}
+        if manifest_shard is not None:
+            # The parent already scanned, filtered, deduplicated and sharded the corpus.
+            self.seeds = [e.path for e in manifest_shard]
+            manifest_families = {e.path: e.family for e in manifest_shard}
+            logging.info(f"Worker {self._shard_index}/{self._num_shards}: Assigned {len(self.seeds)} seeds from the seed manifest")
+        else:
+            all_seeds = list(seeds_dir.rglob("*.rs"))
+            # Sort for deterministic sharding
+            all_seeds.sort()
+
+            # Filter internal-only seeds first, and also ignore empty files
+            valid_seeds = []
+            empty_count = 0
+            for p in all_seeds:
+                if not p.is_file():
+                    continue
+                if p.stat().st_size == 0:
+                    empty_count += 1
+                    continue
+                if not self._is_internal_only_seed(p):
+                    valid_seeds.append(p)
+
+            if empty_count > 0:
+                logging.warning("Ignored %d empty seed files (0 bytes)", empty_count)
+
+            # Seeds this mutation-ast build is known not to parse (shared parse-status table).
+            parse_excluded = 0
+            if seed_index is not None and parse_tool:
+                parsable = [p for p in valid_seeds if seed_index.path_parse_status(p, parse_tool) is not False]
+                parse_excluded = len(valid_seeds) - len(parsable)
+                if parse_excluded:
+                    logging.info("Excluded %d seeds that failed to parse earlier", parse_excluded)
+                valid_seeds = parsable
+
+            # Apply sharding
+            self.seeds = []
+            for i, seed in enumerate(valid_seeds):
+                if i % self._num_shards == self._shard_index:
+                    self.seeds.append(seed)
+
+            filtered = len(all_seeds) - len(valid_seeds) - parse_excluded
+            if filtered > 0:
+                logging.info(
+                    "Filtered %d seeds due to internal-only features (rustc_attrs/lang_items/intrinsics/etc.)",
+                    filtered,
+                )
+            logging.info(f"Worker {self._shard_index}/{self._num_shards}: Assigned {len(self.seeds)} seeds (total pool: {len(valid_seeds)})")
+        self._seed_pos: Dict[Path, int] = {seed: i for i, seed in enumerate(self.seeds)}
 
         for p in self.seeds:
             if self._is_promoted_seed(p):
                 self._promoted_seeds.add(p)
-        
-        filtered = len(all_seeds) - len(valid_seeds)
-        if filtered > 0:
-            logging.info(
-                "Filtered %d seeds due to internal-only features (rustc_attrs/lang_items/intrinsics/etc.)",
-                filtered,
-            )
-        logging.info(f"Worker {self._shard_index}/{self._num_shards}: Assigned {len(self.seeds)} seeds (total pool: {len(valid_seeds)})")
+
         self.scores: Dict[Path, int] = {}
-        self._ttdn = TTDNModel()
+        self._score_sum = 0
+        self._ttdn = ttdn_model if ttdn_model is not None else TTDNModel()
         self._ttdn_cache = {}  # (path, mtime_ns) -> score(int)
+        # Persistent metrics (seeds/.index); misses are scored and written back.
+        self._seed_index = seed_index
+        self._index_hits = 0
+        self._index_misses = 0
+        self._bulk_scoring = True  # cleared if the binary lacks ttdn_metrics_bulk
         self._scores_initialized = False
 
         # Seed selection smoothing to avoid getting stuck on one high-score seed.
@@ -703,10 +977,30 @@ class SeedSelector:
         self._min_weight = float(fuzzer_cfg.get("seed_min_weight", 1.0))
         self._repeat_window = int(fuzzer_cfg.get("seed_repeat_window", 32))
         self._max_picks_per_seed = fuzzer_cfg.get("seed_max_picks_per_seed", 1)
+        try:
+            self._max_picks = -1 if self._max_picks_per_seed is None else int(self._max_picks_per_seed)
+        except Exception:
+            self._max_picks = -1
         self._family_repeat_window = int(fuzzer_cfg.get("seed_family_repeat_window", 8))
         self._family_pick_decay_beta = float(fuzzer_cfg.get("seed_family_pick_decay_beta", 0.75))
         self._family_min_weight = float(fuzzer_cfg.get("seed_family_min_weight", 0.3))
         self._pick_retry_limit = int(fuzzer_cfg.get("seed_pick_retry_limit", 16))
+        # Coverage feedback: each mutant of a seed that reached new coverage multiplies
+        # the seed's weight by `seed_coverage_boost`, up to `seed_coverage_boost_max`.
+        self._coverage_boost_factor = max(1.0, float(fuzzer_cfg.get("seed_coverage_boost", 2.0)))
+        self._coverage_boost_max = max(1.0, float(fuzzer_cfg.get("seed_coverage_boost_max", 16.0)))
+        self._coverage_boost: Dict[Path, float] = {}
+
+        # "eager": score the whole shard before the first ttdn_metric pick.
+        # "lazy": pick from a scored random reservoir of K candidates while a
+        # background thread scores the rest; once `seed_scoring_coverage` of the
+        # pool is scored, pick over all candidates (unscored ones at the mean score).
+        self._lazy_scoring = str(fuzzer_cfg.get("seed_scoring", "eager")).strip().lower() == "lazy"
+        self._reservoir_size = max(1, int(fuzzer_cfg.get("seed_scoring_reservoir", 32)))
+        self._coverage_threshold = min(1.0, max(0.0, float(fuzzer_cfg.get("seed_scoring_coverage", 0.9))))
+        self._scoring_chunk = max(1, int(fuzzer_cfg.get("seed_scoring_chunk", 256)))
+        self._scoring_thread: Optional[threading.Thread] = None
+        self._scoring_stop = threading.Event()
 
         if self._repeat_window < 0:
             self._repeat_window = 0
@@ -731,53 +1025,34 @@ class SeedSelector:
         self._family_pick_counts: Dict[str, int] = {}
         self._family_recent = collections.deque(maxlen=self._family_repeat_window)
         self._seed_family: Dict[Path, str] = {}
+        self._family_members: Dict[str, set] = {}
         self._banned_families: set = set()
 
+        # Selection weights live in one Fenwick tree per pool (base / promoted), so a
+        # pick, a reweight (pick decay, family decay, ban, new score) and an
+        # insert/remove are O(log n) instead of a rebuild over every seed.
+        # The lock is shared with the background scoring thread.
+        self._weights_lock = threading.RLock()
+        self._estimates_refreshed = False
+        self._base_pool: WeightedSampler[Path] = WeightedSampler()
+        self._promoted_pool: WeightedSampler[Path] = WeightedSampler()
+        for seed in self.seeds:
+            self._track_family(seed, manifest_families.get(seed) or self._family_key(seed))
+        for pool, members in (
+            (self._base_pool, [p for p in self.seeds if p not in self._promoted_seeds]),
+            (self._promoted_pool, [p for p in self.seeds if p in self._promoted_seeds]),
+        ):
+            pool.add_many((p, self._target_weight(p)) for p in members)
+
     @staticmethod
     def _is_internal_only_seed(seed_path: Path) -> bool:
-        """Heuristically filter seeds that rely on internal-only rustc features.
-
-        Motivation: ICEs triggered by incorrect usage of internal-only features (e.g.
-        rustc_attrs/lang_items/intrinsics) are typically not accepted upstream.
-
-        We only scan a small prefix because these attributes are almost always at the top.
-        """
+        """Heuristically filter seeds that rely on internal-only rustc features (see `is_internal_only_source`)."""
         try:
-            text = seed_path.read_text(encoding="utf-8", errors="ignore")
+            with open(seed_path, "rb") as f:
+                head = f.read(INTERNAL_SCAN_BYTES)
         except Exception:
             return False
-
-        head = text[:8000]
-
-        # Feature gates that strongly suggest "internal-only" testing seeds.
-        internal_features = (
-            "rustc_attrs",
-            "lang_items",
-            "intrinsics",
-            "core_intrinsics",
-            "rustc_private",
-        )
-
-        # Quick substring checks (fast path).
-        if "#![feature(" in head and any(f in head for f in internal_features):
-            return True
-
-        # Attributes often used with rustc-internal plumbing.
-        internal_attr_markers = (
-            "#[rustc_",
-            "#![rustc_",
-            "#[lang =",
-            "#![no_core]",
-            "#![rustc_attrs]",
-        )
-        if any(m in head for m in internal_attr_markers):
-            return True
-
-        # Intrinsics linkage style.
-        if "extern \"rust-intrinsic\"" in head:
-            return True
-
-        return False
+        return is_internal_only_source(head.decode("utf-8", errors="ignore"))
 
     def _is_promoted_seed(self, seed_path: Path) -> bool:
         """Return True if the seed lives under seeds/<prefix><digits>/..."""
@@ -793,36 +1068,83 @@ class SeedSelector:
         suffix = top[len(self._promoted_prefix):]
         return bool(suffix) and suffix.isdigit()
         
+    def _prefetch_metrics(self, seeds: List[Path]) -> Dict[Path, Dict[str, int]]:
+        """Bulk-score seeds the index does not cover yet (one `ttdn_metrics_bulk` run)."""
+        if self._seed_index is not None:
+            seeds = [s for s in seeds if self._seed_index.get(s) is None]
+        if len(seeds) < 2 or not self._bulk_scoring:
+            return {}
+        by_abs = {s.absolute(): s for s in seeds}
+        fetched: Dict[Path, Dict[str, int]] = {}
+        start = time.time()
+        try:
+            for path, metrics in self._ttdn.bulk_metrics(list(by_abs)):
+                seed = by_abs.get(path)
+                if seed is None or metrics is None:
+                    continue
+                fetched[seed] = metrics
+                if self._seed_index is not None:
+                    self._seed_index.put(seed, metrics)
+        except MutationToolError as e:
+            logging.warning("Bulk TTDN scoring unavailable, scoring seeds one by one: %s", e)
+            self._bulk_scoring = False
+        logging.info("Bulk-scored %d/%d seeds in %.1fs", len(fetched), len(seeds), time.time() - start)
+        return fetched
+
     def _calculate_scores(self):
         logging.info("Calculating seed scores (constraint-choice metric) for all seeds...")
-        for seed in self.seeds:
+        prefetched = self._prefetch_metrics(self.seeds)
+        for seed in list(self.seeds):
             try:
-                self.scores[seed] = self._score_one(seed)
+                self._set_score(seed, self._score_one(seed, prefetched.get(seed)))
             except Exception as e:
                 logging.warning(f"Failed to score {seed.name}: {e}")
-                self.scores[seed] = 1
+                self._set_score(seed, 1)
 
+        if self._seed_index is not None:
+            logging.info(
+                "Seed metrics index: %d hits, %d misses (%s)",
+                self._index_hits,
+                self._index_misses,
+                self._seed_index.db_path,
+            )
         self._scores_initialized = True
 
-    def _score_one(self, seed: Path) -> int:
+    @staticmethod
+    def _score_from_metrics(metrics: Dict[str, int]) -> int:
+        # New definition (source of truth):
+        # score = sum over all constraint injection sites of (# selectable constraints).
+        # Exposed by mutation-ast --mode ttdn_metrics as `constraint_choice_sum`.
+        score = int(metrics.get("constraint_choice_sum", 0))
+
+        # Backwards-compatible fallback if the Rust tool is older.
+        if score <= 0:
+            depth = int(metrics.get("depth", 0))
+            cycles = int(metrics.get("cycles", 0))
+            score = max(1, depth * 20 + cycles)
+        return score
+
+    def _metrics_for(self, seed: Path) -> Dict[str, int]:
+        if self._seed_index is not None:
+            metrics = self._seed_index.get(seed)
+            if metrics is not None:
+                self._index_hits += 1
+                return metrics
+            self._index_misses += 1
+        metrics = self._ttdn.calculate_complexity_for_file(seed).extra
+        # Empty metrics can also mean the tool failed; only persist real results.
+        if self._seed_index is not None and metrics:
+            self._seed_index.put(seed, metrics)
+        return metrics
+
+    def _score_one(self, seed: Path, metrics: Optional[Dict[str, int]] = None) -> int:
         mtime_ns = seed.stat().st_mtime_ns
         cache_key = (str(seed), int(mtime_ns))
         cached = self._ttdn_cache.get(cache_key)
         if cached is None:
-            complexity = self._ttdn.calculate_complexity_for_file(seed)
-
-            # New definition (source of truth):
-            # score = sum over all constraint injection sites of (# selectable constraints).
-            # Exposed by mutation-ast --mode ttdn_metrics as `constraint_choice_sum`.
-            score = int(complexity.extra.get("constraint_choice_sum", 0))
-
-            # Backwards-compatible fallback if the Rust tool is older.
-            if score <= 0:
-                depth = int(complexity.extra.get("depth", 0))
-                cycles = int(complexity.extra.get("cycles", 0))
-                score = max(1, depth * 20 + cycles)
-
-            cached = int(score)
+            if metrics is None:
+                metrics = self._metrics_for(seed)
+            cached = int(self._score_from_metrics(metrics))
             self._ttdn_cache[cache_key] = cached
 
         return max(1, int(cached))
@@ -831,61 +1153,74 @@ class SeedSelector:
         seed = Path(seed)
         if not seed.exists() or not seed.is_file() or seed.suffix != ".rs":
             return
-        if seed in self.seeds:
+        if seed in self._seed_pos:
             return
         if self._is_internal_only_seed(seed):
             return
-        self.seeds.append(seed)
-        if self._is_promoted_seed(seed):
-            self._promoted_seeds.add(seed)
-        if family_id:
-            self._seed_family[seed] = str(family_id)
-        else:
-            self._seed_family[seed] = self._infer_family_from_seed(seed)
+        family = str(family_id) if family_id else self._infer_family_from_seed(seed)
+        with self._weights_lock:
+            self._seed_pos[seed] = len(self.seeds)
+            self.seeds.append(seed)
+            if self._is_promoted_seed(seed):
+                self._promoted_seeds.add(seed)
+            self._track_family(seed, family)
+            self._pool_for(seed).add(seed, self._target_weight(seed))
         # If we've already initialized scoring, score this seed now (incremental, cheap).
         if self._scores_initialized or self.scores:
             try:
-                self.scores[seed] = self._score_one(seed)
+                self._set_score(seed, self._score_one(seed))
             except Exception:
-                self.scores[seed] = 1
+                self._set_score(seed, 1)
 
-    def _choose_pool_candidates(self, eligible: List[Path]) -> List[Path]:
-        if not eligible:
-            return eligible
+    def _track_family(self, seed: Path, family: str):
+        self._seed_family[seed] = family
+        self._family_members.setdefault(family, set()).add(seed)
 
-        promoted = [s for s in eligible if s in self._promoted_seeds]
-        base = [s for s in eligible if s not in self._promoted_seeds]
+    def _pool_for(self, seed: Path) -> WeightedSampler:
+        return self._promoted_pool if seed in self._promoted_seeds else self._base_pool
 
-        # Prefer base pool by default (aggressive 9:1), but fall back if empty.
-        want_promoted = random.random() < self._promoted_pool_prob
-        if want_promoted and promoted:
-            return promoted
-        if base:
-            return base
-        return promoted
+    def _is_eligible(self, seed: Path) -> bool:
+        # Banned (fate-excluded) families and the per-seed pick budget.
+        if self._family_key(seed) in self._banned_families:
+            return False
+        return self._max_picks < 0 or self._pick_counts.get(seed, 0) < self._max_picks
 
-    def _eligible_seeds(self) -> List[Path]:
-        if not self.seeds:
-            return []
+    def _default_score(self) -> float:
+        """Stand-in score for seeds not scored yet: 1, or the mean so far with lazy scoring."""
+        if not self._lazy_scoring or not self.scores:
+            return 1.0
+        return max(1.0, self._score_sum / len(self.scores))
 
-        # Drop seeds whose families are banned (fate-excluded).
-        eligible = [s for s in self.seeds if self._family_key(s) not in self._banned_families]
-        if not eligible:
-            return []
+    def _target_weight(self, seed: Path) -> float:
+        return self._weight_for_seed(seed, self._default_score()) if self._is_eligible(seed) else 0.0
 
-        # Enforce a simple budget per seed if configured.
-        if self._max_picks_per_seed is not None:
-            try:
-                max_picks = int(self._max_picks_per_seed)
-            except Exception:
-                max_picks = -1
-            if max_picks >= 0:
-                return [s for s in eligible if self._pick_counts.get(s, 0) < max_picks]
+    def _refresh_weight(self, seed: Path):
+        self._pool_for(seed).set_weight(seed, self._target_weight(seed))
+
+    def _refresh_family(self, family: str):
+        for seed in self._family_members.get(family, ()):
+            self._refresh_weight(seed)
 
-        return list(eligible)
+    def _set_score(self, seed: Path, score: int):
+        with self._weights_lock:
+            if seed not in self._seed_pos:
+                return
+            self._score_sum += int(score) - self.scores.get(seed, 0)
+            self.scores[seed] = int(score)
+            self._refresh_weight(seed)
+            if (
+                self._lazy_scoring
+                and not self._estimates_refreshed
+                and self._scoring_coverage() >= self._coverage_threshold
+            ):
+                # Unscored seeds were weighted with an early estimate; re-estimate once.
+                self._estimates_refreshed = True
+                for other in self.seeds:
+                    if other not in self.scores:
+                        self._refresh_weight(other)
 
-    def _weight_for_seed(self, seed: Path) -> float:
-        base = float(self.scores.get(seed, 1))
+    def _weight_for_seed(self, seed: Path, default_score: float = 1.0) -> float:
+        base = float(self.scores.get(seed, default_score))
 
         # Temperature > 1 flattens distribution; < 1 makes it greedier.
         shaped = math.pow(max(1.0, base), 1.0 / self._weight_temperature)
@@ -899,22 +1234,85 @@ class SeedSelector:
         fam_factor = 1.0 / math.pow(1.0 + fam_picks, self._family_pick_decay_beta)
         fam_weight = max(self._family_min_weight, fam_factor)
 
-        return max(self._min_weight, decayed) * fam_weight
+        return max(self._min_weight, decayed) * fam_weight * self._coverage_boost.get(seed, 1.0)
 
-    def _weighted_choice(self, candidates: List[Path]) -> Optional[Path]:
-        if not candidates:
+    def boost_seed(self, seed: Path):
+        """Raise `seed`'s weight after one of its mutants reached new coverage."""
+        seed = Path(seed)
+        with self._weights_lock:
+            if seed not in self._seed_pos:
+                return
+            boost = self._coverage_boost.get(seed, 1.0) * self._coverage_boost_factor
+            self._coverage_boost[seed] = min(self._coverage_boost_max, boost)
+            self._refresh_weight(seed)
+
+    def _weighted_choice(self, candidates: List[Path], pool: WeightedSampler) -> Optional[Path]:
+        weights = [pool.weight(s) for s in candidates]
+        if not candidates or not any(w > 0 for w in weights):
             return None
-        weights = [self._weight_for_seed(s) for s in candidates]
         return random.choices(candidates, weights=weights, k=1)[0]
 
+    def _scoring_coverage(self) -> float:
+        return (len(self.scores) / len(self.seeds)) if self.seeds else 1.0
+
+    def _reservoir(self, pool: WeightedSampler) -> List[Path]:
+        """K random live candidates, scored now (index hits are cheap, misses go to the mutation server)."""
+        candidates = pool.sample_many(self._reservoir_size, uniform=True)
+        for seed in candidates:
+            if seed not in self.scores:
+                try:
+                    self._set_score(seed, self._score_one(seed))
+                except Exception:
+                    self._set_score(seed, 1)
+        return candidates
+
+    def _start_background_scoring(self):
+        if self._scoring_thread is not None:
+            return
+        self._scoring_thread = threading.Thread(
+            target=self._background_score, name="seed-scoring", daemon=True
+        )
+        self._scoring_thread.start()
+
+    def _background_score(self):
+        start = time.time()
+        pending = [s for s in list(self.seeds) if s not in self.scores]
+        random.shuffle(pending)
+        for i in range(0, len(pending), self._scoring_chunk):
+            if self._scoring_stop.is_set():
+                return
+            chunk = [s for s in pending[i:i + self._scoring_chunk] if s not in self.scores]
+            prefetched = self._prefetch_metrics(chunk)
+            for seed in chunk:
+                if self._scoring_stop.is_set():
+                    return
+                if seed in self.scores:
+                    continue
+                try:
+                    self._set_score(seed, self._score_one(seed, prefetched.get(seed)))
+                except Exception as e:
+                    logging.warning(f"Failed to score {seed.name}: {e}")
+                    self._set_score(seed, 1)
+        self._scores_initialized = True
+        logging.info("Background seed scoring done: %d seeds in %.1fs", len(pending), time.time() - start)
+
+    def close(self):
+        self._scoring_stop.set()
+        if self._scoring_thread is not None:
+            self._scoring_thread.join(timeout=5)
+
     def _record_pick(self, seed: Path):
-        self._pick_counts[seed] = self._pick_counts.get(seed, 0) + 1
-        if self._repeat_window > 0:
-            self._recent.append(seed)
-        family = self._family_key(seed)
-        self._family_pick_counts[family] = self._family_pick_counts.get(family, 0) + 1
-        if self._family_repeat_window > 0:
-            self._family_recent.append(family)
+        with self._weights_lock:
+            self._pick_counts[seed] = self._pick_counts.get(seed, 0) + 1
+            if self._repeat_window > 0:
+                self._recent.append(seed)
+            family = self._family_key(seed)
+            self._family_pick_counts[family] = self._family_pick_counts.get(family, 0) + 1
+            if self._family_repeat_window > 0:
+                self._family_recent.append(family)
+            # Pick decay on the seed, family decay on its whole lineage.
+            self._refresh_family(family)
+            self._refresh_weight(seed)
 
     def _family_key(self, seed: Path) -> str:
         if seed in self._seed_family:
@@ -924,15 +1322,7 @@ class SeedSelector:
         return fam
 
     def _infer_family_from_seed(self, seed: Path) -> str:
-        # If filename encodes family: <stem>__fam__<family>
-        try:
-            stem = seed.stem
-            if "__fam__" in stem:
-                return stem.split("__fam__", 1)[1]
-        except Exception:
-            pass
-        # Fallback: treat each original seed as its own family
-        return str(seed.resolve())
+        return infer_family(seed)
 
     def get_family(self, seed: Path) -> str:
         return self._family_key(seed)
@@ -940,107 +1330,136 @@ class SeedSelector:
     def ban_family(self, family: str):
         if family is None:
             return
-        self._banned_families.add(str(family))
+        with self._weights_lock:
+            self._banned_families.add(str(family))
+            self._refresh_family(str(family))
 
-    def _candidates_within_window(self, eligible: List[Path]) -> List[Path]:
-        if self._repeat_window <= 0 or len(eligible) <= 1:
-            seed_candidates = eligible
-        else:
-            recent_set = set(self._recent)
-            seed_candidates = [s for s in eligible if s not in recent_set]
-            # If all seeds are "recent", relax the constraint.
-            if not seed_candidates:
-                seed_candidates = eligible
-
-        if self._family_repeat_window <= 0 or len(seed_candidates) <= 1:
-            return seed_candidates
-        recent_families = set(self._family_recent)
-        fam_candidates = [s for s in seed_candidates if self._family_key(s) not in recent_families]
-        return fam_candidates if fam_candidates else seed_candidates
+    def _choose_pool(self) -> Optional[WeightedSampler]:
+        promoted, base = self._promoted_pool, self._base_pool
+        # Prefer base pool by default (aggressive 9:1), but fall back if empty.
+        want_promoted = random.random() < self._promoted_pool_prob
+        if want_promoted and promoted.live_count():
+            return promoted
+        if base.live_count():
+            return base
+        return promoted if promoted.live_count() else None
 
-    def select(self, strategy="random"):
-        if not self.seeds:
-            return None
+    def _suspend_recent(self, pool: WeightedSampler) -> List[Path]:
+        """Zero the weights of recently picked seeds, then of recent families.
 
-        def _pick_with_retry(pick_fn):
-            # Seeds under promoted pool can be pruned on disk (new_seeds_max). If we
-            # still have stale paths in memory, drop them lazily and retry.
-            for _ in range(self._pick_retry_limit):
-                picked = pick_fn()
-                if picked is None:
-                    return None
-                if Path(picked).exists():
-                    return picked
-                self.remove_seed(Path(picked))
-            return None
-            
-        if strategy == "ttdn_metric":
-            if not self.scores:
-                self._calculate_scores()
+        Each step is undone if it would leave nothing to pick (relaxed window).
+        Returns the suspended seeds; `_refresh_weight` restores them.
+        """
+        suspended: List[Path] = []
+        if self._repeat_window > 0 and pool.live_count() > 1:
+            recent = pool.live_keys(s for s in set(self._recent) if s in pool)
+            for s in recent:
+                pool.set_weight(s, 0.0)
+            if pool.live_count() == 0:
+                for s in recent:
+                    self._refresh_weight(s)
+            else:
+                suspended.extend(recent)
 
-            # Prefer not repeating seeds within a short window.
-            eligible = self._eligible_seeds()
-            if not eligible:
+        if self._family_repeat_window > 0 and pool.live_count() > 1:
+            members = pool.live_keys(
+                s for f in set(self._family_recent) for s in self._family_members.get(f, ()) if s in pool
+            )
+            for s in members:
+                pool.set_weight(s, 0.0)
+            if pool.live_count() == 0:
+                for s in members:
+                    self._refresh_weight(s)
+            else:
+                suspended.extend(members)
+        return suspended
+
+    def _pick(self, weighted: bool) -> Optional[Path]:
+        with self._weights_lock:
+            pool = self._choose_pool()
+            if pool is None:
                 return None
+            # Prefer not repeating seeds within a short window.
+            suspended = self._suspend_recent(pool)
+            try:
+                if not weighted:
+                    return pool.sample(uniform=True)
+                if self._lazy_scoring and self._scoring_coverage() < self._coverage_threshold:
+                    return self._weighted_choice(self._reservoir(pool), pool)
+                return pool.sample()
+            finally:
+                for s in suspended:
+                    self._refresh_weight(s)
 
-            pool = self._choose_pool_candidates(eligible)
-            candidates = self._candidates_within_window(pool)
+    def select(self, strategy="random"):
+        if not self.seeds:
+            return None
 
-            def _do_pick():
-                return self._weighted_choice(candidates)
+        weighted = strategy == "ttdn_metric"
+        if weighted:
+            if self._lazy_scoring:
+                self._start_background_scoring()
+            elif not self.scores:
+                self._calculate_scores()
 
-            picked = _pick_with_retry(_do_pick)
-            if picked is not None:
-                self._record_pick(picked)
-            return picked
-            
-        else:
-            eligible = self._eligible_seeds()
-            if not eligible:
+        # Seeds under promoted pool can be pruned on disk (new_seeds_max). If we
+        # still have stale paths in memory, drop them lazily and retry.
+        for _ in range(self._pick_retry_limit):
+            picked = self._pick(weighted)
+            if picked is None:
                 return None
-            pool = self._choose_pool_candidates(eligible)
-            candidates = self._candidates_within_window(pool)
-            def _do_pick():
-                if not candidates:
-                    return None
-                return random.choice(candidates)
-
-            picked = _pick_with_retry(_do_pick)
-            if picked is not None:
+            if Path(picked).exists():
                 self._record_pick(picked)
-            return picked
+                return picked
+            self.remove_seed(Path(picked))
+        return None
 
     def remove_seed(self, seed: Path):
-        try:
-            self.seeds.remove(seed)
-        except ValueError:
-            return
-        self.scores.pop(seed, None)
-        self._promoted_seeds.discard(seed)
-        self._pick_counts.pop(seed, None)
-        family = self._seed_family.get(seed)
-        self._seed_family.pop(seed, None)
-        if self._repeat_window > 0:
-            try:
-                self._recent = collections.deque([s for s in self._recent if s != seed], maxlen=self._repeat_window)
-            except Exception:
-                pass
-        # Best-effort cleanup for family tracking
-        if family is None:
-            try:
-                family = self._infer_family_from_seed(seed)
-            except Exception:
-                family = None
-        if family is not None:
-            self._family_pick_counts.pop(family, None)
-            if self._family_repeat_window > 0:
+        with self._weights_lock:
+            pos = self._seed_pos.pop(seed, None)
+            if pos is None:
+                return
+            # Swap-remove: seed order only matters for the initial sharding.
+            last = self.seeds.pop()
+            if last != seed:
+                self.seeds[pos] = last
+                self._seed_pos[last] = pos
+            self._pool_for(seed).remove(seed)
+            self._score_sum -= self.scores.pop(seed, 0)
+            self._promoted_seeds.discard(seed)
+            self._pick_counts.pop(seed, None)
+            self._coverage_boost.pop(seed, None)
+            family = self._seed_family.get(seed)
+            self._seed_family.pop(seed, None)
+            if self._repeat_window > 0:
                 try:
-                    self._family_recent = collections.deque(
-                        [f for f in self._family_recent if f != family],
-                        maxlen=self._family_repeat_window,
-                    )
+                    self._recent = collections.deque([s for s in self._recent if s != seed], maxlen=self._repeat_window)
                 except Exception:
                     pass
+            # Best-effort cleanup for family tracking
+            if family is None:
+                try:
+                    family = self._infer_family_from_seed(seed)
+                except Exception:
+                    family = None
+            if family is not None:
+                self._family_pick_counts.pop(family, None)
+                if self._family_repeat_window > 0:
+                    try:
+                        self._family_recent = collections.deque(
+                            [f for f in self._family_recent if f != family],
+                            maxlen=self._family_repeat_window,
+                        )
+                    except Exception:
+                        pass
+                members = self._family_members.get(family)
+                if members is not None:
+                    members.discard(seed)
+                    if not members:
+                        self._family_members.pop(family, None)
+                # The family's pick count was reset: its remaining seeds regain weight.
+                self._refresh_family(family)
+
 def ensure_mutation_tool_built() -> Path:
     """Builds the mutation-AST tool once and returns the path to the binary."""
     logging.info("Building mutation tool (mutation-AST)...")
@@ -1076,18 +1495,45 @@ def ensure_mutation_tool_built() -> Path:
     logging.info(f"Mutation tool built successfully at {bin_path}")
     return bin_path.resolve()
 
-def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
-
+def worker_main(
+    worker_index: int,
+    total_workers: int,
+    mutation_bin_path: Path,
+    manifest_shard: Optional[List[SeedEntry]] = None,
+    scratch_owner_pid: Optional[int] = None,
+):
+
+    # Resources torn down in the `finally` below, on every exit path.
+    scratch = mutation_client = mutator_pool = case_store = selector = None
+    compiler_matrix = variant_pipeline = None
     try:
         args, config = parse_args_and_config()
         setup_logging(config, worker_index)
         _start_coverage_consumer_if_needed(worker_index, config)
 
         logging.info("Trait-Fuzzer started with config: %s", args.config)
+
+        # Transient files (temp sources, compiler out-dirs, .ttdn_out) live in a per-worker
+        # RAM-backed scratch directory, wiped on start in case a previous run crashed.
+        scratch = ScratchWorkspace.for_worker(config, worker_index, scratch_owner_pid)
+        configure_scratch(scratch)
+        logging.info("Scratch workspace: %s", scratch.dir)
         coverage_enabled = _cfg_bool(config.get("coverage", {}).get("enable", False))
+        # How long a worker blocks on a full coverage queue before queueing anyway.
+        coverage_backpressure_max_wait = float(config.get("coverage", {}).get("backpressure_max_wait_sec", 60.0))
         
         # Initialize components
         compiler_cfg = config.get("compiler", {})
+        # All compiler processes of all workers share one slot pool (reset by the parent).
+        compile_slots = CompileSlots.from_config(config)
+        configure_compile_slots(compile_slots)
+        if compile_slots is not None:
+            logging.info("Global compile slots: %d (dir=%s)", compile_slots.slots, compile_slots.slot_dir)
+        # Optional content-addressed compile cache shared by all workers.
+        compile_cache = CompileCache.from_config(config)
+        configure_compile_cache(compile_cache)
+        if compile_cache is not None:
+            logging.info("Compile cache enabled (db=%s, max=%.0f MB)", compile_cache.db_path, compile_cache.max_bytes / (1024 * 1024))
         compiler = RustCompiler(
             timeout=config["fuzzer"]["max_time_per_case_sec"],
             rustc_cmd=compiler_cfg.get("rustc_cmd"),
@@ -1096,13 +1542,19 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
         llm_connector = LLMConnector(config)
         
         # LLM Agents
-        extractor = ExtractorAgent(llm_connector)
-        injector = InjectorAgent(llm_connector)
         revision = RevisionAgent(llm_connector)
         trait_rewriter = TraitRewriterAgent(llm_connector)
 
+        # One long-lived mutation-ast server per worker: parses each seed once and
+        # serves all of its mutants (and TTDN metrics) over a line-delimited JSON pipe.
+        mutation_client = MutationServerClient(
+            mutation_bin_path,
+            cwd=Path("mutation/mutation-AST"),
+            timeout_sec=float(config["fuzzer"].get("mutation_tool_timeout_sec", 12)),
+        )
+
         # Unified TTDN model (Rust syn-based extractor via mutation-ast --mode ttdn_metrics)
-        ttdn_model = TTDNModel()
+        ttdn_model = TTDNModel(client=mutation_client)
 
         # Option: run only structural AST mutators.
         # This is useful for stabilizing runs and focusing on trait/topology evolution.
@@ -1117,6 +1569,33 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
         gccrs_results_dir = results_dir / "gccrs"
         enable_gccrs = bool(compiler_cfg.get("enable_gccrs", False))
 
+        run_cfg = config.get("run", {})
+        results_catalog = None
+        if _cfg_bool(run_cfg.get("results_catalog", True)):
+            try:
+                results_catalog = ResultsCatalog.for_results(results_dir)
+            except Exception as e:
+                logging.warning("Results catalog unavailable, falling back to directory scans: %s", e)
+        catalog_reconcile_sec = float(run_cfg.get("results_catalog_reconcile_sec", _CATALOG_RECONCILE_SEC))
+
+        # Optional packed storage for high-volume statuses; everything else stays one directory per case.
+        case_store = None
+        packed_statuses = set()
+        if str(run_cfg.get("case_storage", "dirs")).lower() == "packed":
+            try:
+                case_store = PackedCaseStore.for_results(results_dir, writer=f"w{worker_index}")
+                packed_statuses = {str(x) for x in run_cfg.get("case_storage_packed_statuses", ["success", "error"])}
+            except Exception as e:
+                logging.warning("Packed case store unavailable, writing case directories: %s", e)
+
+        def _catalog_case(case_dir: Path):
+            if results_catalog is None:
+                return
+            try:
+                results_catalog.record(case_dir)
+            except Exception as e:
+                logging.warning("Results catalog update failed for %s: %s", case_dir, e)
+
         def _enforce_all_results_limits() -> bool:
             if not enforce_results_limits(
                 rustc_results_dir,
@@ -1127,6 +1606,9 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                 keep_error_cases=args.keep_error_cases,
                 keep_fate_cases=args.keep_fate_cases,
                 keep_rewritten_cases=args.keep_rewritten_cases,
+                catalog=results_catalog,
+                reconcile_sec=catalog_reconcile_sec,
+                case_store=case_store,
             ):
                 return False
             if enable_gccrs:
@@ -1139,11 +1621,33 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                     keep_error_cases=-1,
                     keep_fate_cases=args.keep_fate_cases,
                     keep_rewritten_cases=args.keep_rewritten_cases,
+                    catalog=results_catalog,
+                    reconcile_sec=catalog_reconcile_sec,
+                    case_store=case_store,
                 ):
                     return False
             return True
         
-        selector = SeedSelector(seeds_dir, fuzzer_cfg=config.get("fuzzer", {}), promoted_prefix=args.new_seeds_prefix, shard_index=worker_index, num_shards=total_workers)
+        seed_index = None
+        parse_tool = None
+        if _cfg_bool(config["fuzzer"].get("seed_index_enable", True)):
+            seed_index = SeedIndex(Path(config["paths"].get("seed_index", seeds_dir / ".index")))
+            try:
+                parse_tool = tool_identity(mutation_bin_path)
+            except OSError as e:
+                logging.warning("Cannot identify mutation-ast binary, parse status not shared: %s", e)
+
+        selector = SeedSelector(
+            seeds_dir,
+            fuzzer_cfg=config.get("fuzzer", {}),
+            promoted_prefix=args.new_seeds_prefix,
+            shard_index=worker_index,
+            num_shards=total_workers,
+            ttdn_model=ttdn_model,
+            seed_index=seed_index,
+            manifest_shard=manifest_shard,
+            parse_tool=parse_tool,
+        )
 
         if not selector.seeds:
             logging.warning("No seeds found in %s", seeds_dir)
@@ -1172,6 +1676,76 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
         promotions_by_seed: Dict[Path, int] = {}
         logged_promotion_cap: set = set()
 
+        # Coverage feedback: the consumer reports, per queued case, how many new counters
+        # it hit. Cases this worker queued are remembered (bounded) so a record can be
+        # traced back to its strategy, parent seed and source.
+        coverage_cfg = config.get("coverage", {})
+        coverage_feedback = coverage_enabled and _cfg_bool(coverage_cfg.get("feedback", True))
+        feedback_reader = (
+            FeedbackReader(Path("utils/coverage/live_reports") / FEEDBACK_FILENAME) if coverage_feedback else None
+        )
+        feedback_window = max(1, int(coverage_cfg.get("feedback_window", 4096)))
+        queued_variants: "collections.OrderedDict[str, Dict[str, object]]" = collections.OrderedDict()
+
+        def _apply_coverage_feedback():
+            nonlocal promoted_dir
+            for rec in feedback_reader.poll():
+                if int(rec.get("worker", -1)) != worker_index:
+                    continue
+                queued = queued_variants.pop(str(rec.get("variant_id", "")), None)
+                if queued is None:
+                    continue
+                new_coverage = int(rec.get("new_counters", 0) or 0) > 0
+                promoted = False
+                if new_coverage:
+                    parent = queued["parent"]
+                    selector.boost_seed(parent)
+                    # A mutant that compiles and reaches new coverage is worth mutating
+                    # further even though SUCCESS alone would not promote it; the
+                    # per-parent cap of the SUCCESS path applies here too.
+                    parent_key = Path(parent).resolve()
+                    promoted_so_far = int(promotions_by_seed.get(parent_key, 0))
+                    if rec.get("rustc_exit") == 0 and promoted_so_far >= max_promotions_per_seed:
+                        if parent_key not in logged_promotion_cap:
+                            logging.info(
+                                "[%s] Skip coverage promote (seed cap reached: %d/%d): %s",
+                                rec.get("variant_id"),
+                                promoted_so_far,
+                                max_promotions_per_seed,
+                                Path(parent).name,
+                            )
+                            logged_promotion_cap.add(parent_key)
+                    elif rec.get("rustc_exit") == 0:
+                        try:
+                            if promoted_dir is None:
+                                promoted_dir = pick_next_new_seed_dir(seeds_dir, prefix=args.new_seeds_prefix)
+                            promoted_dir = maybe_roll_promoted_dir(
+                                promoted_dir,
+                                seeds_dir,
+                                args.new_seeds_prefix,
+                                args.new_seeds_max,
+                            )
+                            out_path = promoted_seed_path(promoted_dir, f"seed_{rec['variant_id']}_cov")
+                            out_path.write_text(str(queued["content"]), encoding="utf-8", errors="ignore")
+                            selector.add_seed(out_path, family_id=queued["family"])
+                            promotions_by_seed[parent_key] = promoted_so_far + 1
+                            promoted = True
+                        except Exception as e:
+                            logging.warning("Failed to promote coverage seed %s: %s", rec.get("variant_id"), e)
+                    logging.info(
+                        "[%s] new coverage: %s counters (parent %s boosted%s)",
+                        rec.get("variant_id"),
+                        rec.get("new_counters"),
+                        Path(parent).name,
+                        ", mutant promoted" if promoted else "",
+                    )
+                mutator_pool.update_weights({
+                    "strategy": queued["strategy"],
+                    "cost_sec": float(rec.get("compile_sec", 0.0) or 0.0),
+                    "new_coverage": new_coverage,
+                    "promoted": promoted,
+                })
+
         enable_next_solver = bool(compiler_cfg.get("enable_next_trait_solver", False))
         # If we enable next-solver, we almost always also want a plain nightly compile for comparison.
         enable_nightly_compile = bool(compiler_cfg.get("enable_nightly_compile", enable_next_solver))
@@ -1257,6 +1831,81 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
         if parallel_compile:
             logging.info("Parallel compile enabled (workers=%d)", parallel_workers)
 
+        # Oracle modes: stable once, +nightly once, +nightly with -Z next-solver once, gccrs once.
+        # Built once per worker; the matrix also owns the long-lived per-worker compile executor.
+        # Verdict policy: cancel sibling compiles once the outcome is decided
+        # (e.g. "next_needs_nightly" skips next-solver unless nightly succeeded or crashed).
+        compiler_matrix = CompilerMatrix(
+            parallel=parallel_compile,
+            max_workers=parallel_workers,
+            verdict_policy=str(compiler_cfg.get("verdict_policy", "wait_all")),
+            # Tiered compile: type-check first (`--emit=metadata` / `-Zno-codegen`),
+            # escalate to full codegen on request or for a sampled fraction.
+            tiered=str(compiler_cfg.get("compile_tier", "full")).strip().lower() == "tiered",
+            codegen_coverage=_cfg_bool(compiler_cfg.get("codegen_coverage", False)),
+            codegen_sample_rate=float(compiler_cfg.get("codegen_sample_rate", 0.0)),
+        )
+        if compiler_matrix.tiered:
+            logging.info(
+                "Tiered compile enabled (codegen_coverage=%s, codegen_sample_rate=%.2f)",
+                compiler_matrix.codegen_coverage,
+                compiler_matrix.codegen_sample_rate,
+            )
+        if compiler_matrix.verdict_policy_name != "wait_all":
+            logging.info("Compile verdict policy: %s", compiler_matrix.verdict_policy_name)
+        compiler_matrix.add_mode("stable", compiler, check_args=["--emit=metadata"])
+        if enable_nightly_compile:
+            compiler_matrix.add_mode(
+                "nightly",
+                RustCompiler(timeout=config["fuzzer"]["max_time_per_case_sec"], rustc_cmd=nightly_rustc_cmd),
+                check_args=["-Zno-codegen"],
+            )
+        if enable_next_solver:
+            compiler_matrix.add_mode(
+                "next",
+                RustCompiler(timeout=config["fuzzer"]["max_time_per_case_sec"], rustc_cmd=nightly_rustc_cmd),
+                [next_solver_flag],
+                check_args=["-Zno-codegen"],
+            )
+        if enable_gccrs:
+            compiler_matrix.add_mode(
+                "gccrs",
+                RustCompiler(
+                    timeout=config["fuzzer"]["max_time_per_case_sec"],
+                    rustc_cmd=gccrs_cmd,
+                    working_dir=gccrs_work_dir,
+                    env=gccrs_env,
+                    auto_no_core=gccrs_auto_no_core,
+                ),
+                gccrs_extra_args,
+            )
+
+        def _compile_variant(planned: PlannedVariant) -> Optional[Dict[str, object]]:
+            """Compile stage: write temp_{variant_id}.rs and run every enabled mode on it."""
+            if coverage_enabled:
+                # Coverage mode only queues cases; the classifier writes them out.
+                return None
+            temp_src = scratch.path(f"temp_{planned.variant_id}.rs")
+            with open(temp_src, 'w') as f:
+                f.write(planned.content)
+            return compiler_matrix.compile_all(temp_src)
+
+        def _discard_variant(planned: PlannedVariant, _results):
+            # Variants compiled ahead of a kill-fate/early exit are dropped unclassified.
+            temp_src = scratch.path(f"temp_{planned.variant_id}.rs")
+            if temp_src.exists():
+                temp_src.unlink()
+
+        # Per-worker pipeline: mutation batches are produced on one thread, compiled on
+        # `pipeline_compile_workers` threads, and classified in variant order on this one.
+        variant_pipeline = VariantPipeline(
+            _compile_variant,
+            compile_workers=int(config["fuzzer"].get("pipeline_compile_workers", 1)),
+            max_pending=int(config["fuzzer"].get("pipeline_depth", 4)),
+            discard_fn=_discard_variant,
+            name=f"pipeline-w{worker_index}",
+        )
+
         # Config Parameters
         iterations = config["fuzzer"]["iterations"]
         mutations_per_seed = int(config["fuzzer"].get("mutations_per_seed", 1))
@@ -1269,12 +1918,13 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
         structural_mutations_per_round = int(
             config["fuzzer"].get("structural_mutations_per_round", 1)
         )
-        mutation_max_retries = int(config["fuzzer"].get("mutation_max_retries", 10))
-        choice_pick_tries = int(config["fuzzer"].get("choice_pick_tries", 20))
         seed_strategy = config["fuzzer"].get("seed_selection_strategy", "random")
 
         # Fuzzing Loop
         for i in range(iterations):
+            if feedback_reader is not None:
+                _apply_coverage_feedback()
+
             # 1. Select Seed
             seed_path = selector.select(seed_strategy)
             while seed_path is not None and seed_path in bad_seeds and selector.seeds:
@@ -1349,46 +1999,14 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                         # original seed is NOT bug under the same compiler namespace,
                         # save it under results/<compiler>/rewrite and skip rewritten pass.
                         rewrite_bug = False
-                        rewrite_probe = Path(f"temp_rewrite_probe_w{worker_index}_{i+1}.rs")
-                        original_probe = Path(f"temp_original_probe_w{worker_index}_{i+1}.rs")
+                        rewrite_probe = scratch.path(f"temp_rewrite_probe_w{worker_index}_{i+1}.rs")
+                        original_probe = scratch.path(f"temp_original_probe_w{worker_index}_{i+1}.rs")
                         try:
                             original_probe.write_text(current_seed_content, encoding="utf-8", errors="ignore")
                             rewrite_probe.write_text(rewritten_code, encoding="utf-8", errors="ignore")
 
-                            def _compile_all_modes(src_path: Path) -> Dict[str, object]:
-                                out: Dict[str, object] = {}
-                                out["stable"] = compiler.compile(src_path)
-
-                                if enable_nightly_compile:
-                                    compiler_nightly = RustCompiler(
-                                        timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                        rustc_cmd=nightly_rustc_cmd,
-                                    )
-                                    out["nightly"] = compiler_nightly.compile(src_path)
-
-                                if enable_next_solver:
-                                    compiler_next = RustCompiler(
-                                        timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                        rustc_cmd=nightly_rustc_cmd,
-                                    )
-                                    out["next"] = compiler_next.compile(src_path, extra_args=[next_solver_flag])
-
-                                if enable_gccrs:
-                                    compiler_gccrs_probe = RustCompiler(
-                                        timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                        rustc_cmd=gccrs_cmd,
-                                        working_dir=gccrs_work_dir,
-                                        env=gccrs_env,
-                                        auto_no_core=gccrs_auto_no_core,
-                                    )
-                                    out["gccrs"] = compiler_gccrs_probe.compile(
-                                        src_path,
-                                        extra_args=gccrs_extra_args,
-                                    )
-                                return out
-
-                            original_results = _compile_all_modes(original_probe)
-                            rewrite_results = _compile_all_modes(rewrite_probe)
+                            original_results = compiler_matrix.compile_all(original_probe, apply_policy=False)
+                            rewrite_results = compiler_matrix.compile_all(rewrite_probe, apply_policy=False)
 
                             def _is_bug(st) -> bool:
                                 return st in (CompilationStatus.CRASH, CompilationStatus.HANG)
@@ -1452,6 +2070,7 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                                             f.write("Original gccrs status: %s\n" % gccrs_org.status.value)
                                         if gccrs_rew is not None:
                                             f.write("Rewrite gccrs status: %s\n" % gccrs_rew.status.value)
+                                    _catalog_case(dest_case)
 
                                 logging.warning(
                                     "Rewrite preflight triggered new bug by rewrite (targets=%s); saved under results/<compiler>/rewrite and skipping rewritten fuzz pass.",
@@ -1495,40 +2114,12 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                     if seed_baseline_results is not None:
                         return seed_baseline_results
     
-                    baseline_src = Path(f"temp_seed_baseline_w{worker_index}_iter_{i+1}.rs")
+                    baseline_src = scratch.path(f"temp_seed_baseline_w{worker_index}_iter_{i+1}.rs")
                     with open(baseline_src, "w") as f:
                         f.write(current_seed_content)
     
                     try:
-                        base_stable = compiler.compile(baseline_src)
-                        out: Dict[str, object] = {"stable": base_stable}
-    
-                        if enable_nightly_compile:
-                            compiler_nightly = RustCompiler(
-                                timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                rustc_cmd=nightly_rustc_cmd,
-                            )
-                            out["nightly"] = compiler_nightly.compile(baseline_src)
-    
-                        if enable_next_solver:
-                            compiler_next = RustCompiler(
-                                timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                rustc_cmd=nightly_rustc_cmd,
-                            )
-                            out["next"] = compiler_next.compile(baseline_src, extra_args=[next_solver_flag])
-
-                        if enable_gccrs:
-                            compiler_gccrs = RustCompiler(
-                                timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                rustc_cmd=gccrs_cmd,
-                                working_dir=gccrs_work_dir,
-                                env=gccrs_env,
-                                auto_no_core=gccrs_auto_no_core,
-                            )
-                            out["gccrs"] = compiler_gccrs.compile(
-                                baseline_src,
-                                extra_args=gccrs_extra_args,
-                            )
+                        out: Dict[str, object] = compiler_matrix.compile_all(baseline_src, apply_policy=False)
     
                         seed_baseline_results = out
                         return out
@@ -1618,22 +2209,10 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                     rel_s = str(seed_path)
                 logging.info(f"Iteration {i+1}/{iterations}: Selected seed {rel_s}")
     
-                # Deduplicate identical mutations produced from the same seed.
-                # Keyed by mutator strategy name; values are sha256 hashes of mutated content.
-                # This is per selected seed (per outer iteration) to keep memory bounded.
-                seen_mutations_by_strategy: Dict[str, set] = {}
-    
-                # Note: mutation-point/constraint consumption is reset per round (see inside round loop).
-    
-                def _pick_structural_op() -> Optional[str]:
-                    ops = list(getattr(mutator_pool, "structural_ops", []))
-                    if not ops:
-                        return None
-                    subw = getattr(mutator_pool, "structural_subweights", {}) or {}
-                    weights = [float(subw.get(op, 0.0)) for op in ops]
-                    if not any(w > 0 for w in weights):
-                        weights = [1.0] * len(ops)
-                    return random.choices(ops, weights=weights, k=1)[0]
+                # Indices already drawn from mutation-ast batches for the current base content.
+                # Keyed by strategy; passed back as `exclude` so later rounds on the same base
+                # never re-plan a consumed (site, choice). Reset when MutationⅠ chains a new base.
+                consumed_choices_by_strategy: Dict[str, set] = {}
     
                 # 2. Variants Loop: each seed runs `mutations_per_seed` rounds.
                 # Each round: N constraint_injection, then one structural mutation(s).
@@ -1647,23 +2226,14 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                     
                     # Update variant_id to include pass_name to avoid collisions
                     # e.g. w0_iter_1_original_var_1 vs w0_iter_1_rewritten_var_1
-                    # Avoid repeatedly sampling the same mutation *point* inside the AST mutators (per round).
-                    # Keyed by mutator strategy name; values are 0-based candidate indices already tried.
-                    used_indices_by_strategy: Dict[str, set] = {}
-                    # Keyed by strategy name; values are total candidate count reported by mutation-AST.
-                    known_candidate_counts: Dict[str, int] = {}
-                    # Constraint candidate counts per site for constraint_injection (per round).
-                    known_constraint_counts: Dict[int, int] = {}
-                    used_constraints_by_site: Dict[int, set] = {}
                     # Leaf strategies that have no remaining mutation points for this round.
-                    exhausted_strategies: set = set()
                     exhausted_in_round: set = set()
                     logged_strategy_start: set = set()
                     round_seed_content = current_seed_content
                     round_seed_path = seed_path
                     round_seed_temp: Optional[Path] = None
                     if round_seed_content != seed_content:
-                        round_seed_temp = Path(f"temp_round_seed_w{worker_index}_iter_{i+1}_round_{_round+1}.rs")
+                        round_seed_temp = scratch.path(f"temp_round_seed_w{worker_index}_iter_{i+1}_round_{_round+1}.rs")
                         round_seed_temp.write_text(round_seed_content, encoding="utf-8", errors="ignore")
                         round_seed_path = round_seed_temp
                     logging.info("-" * 60)
@@ -1717,463 +2287,172 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                     outlive_mutations_per_round = int(config["fuzzer"].get("outlive_mutations_per_round", 20))
                     structural_mutations_per_round = int(config["fuzzer"].get("structural_mutations_per_round", 1))
     
-                    # `exhausted_strategies` is reset per seed (outer loop).
-                    # `exhausted_in_round` is reset per round (inner loop).
-                    # The original code used `exhausted_strategies` for per-seed exhaustion,
-                    # but it was reset per round due to its placement.
-                    # Let's keep the existing logic for `exhausted_strategies` (reset per round)
-                    # and add `exhausted_in_round` for clarity if needed, but for now,
-                    # `exhausted_strategies` effectively serves as per-round exhaustion.
-                    # The user's change implies `exhausted_strategies` is defined outside this block,
-                    # but the provided snippet re-initializes it here. I will follow the snippet.
-                    exhausted_strategies = set() # This re-initializes it per round, matching the user's snippet.
-                    exhausted_in_round = set() # This is a new variable, also reset per round.
-    
-                    planned_strategies: List[str] = []
+                    # Static counts per strategy; with an adaptive scheduler (fuzzer.strategy_scheduler)
+                    # the same number of slots is redistributed by the bandit.
+                    leaf_budget: Dict[str, int] = {}
                     if not args.structural_only:
-                        if injection_mutations_per_round > 0:
-                            for _ in range(injection_mutations_per_round):
-                                planned_strategies.append("constraint_injection")
-                        if projection_mutations_per_round > 0:
-                            for _ in range(projection_mutations_per_round):
-                                planned_strategies.append("projection_rewrite")
-                        if lifetime_mutations_per_round > 0:
-                            for _ in range(lifetime_mutations_per_round):
-                                planned_strategies.append("lifetime_obfuscation")
-                        if outlive_mutations_per_round > 0:
-                            for _ in range(outlive_mutations_per_round):
-                                planned_strategies.append("lifetime_outlive")
-                    
-                    if structural_mutations_per_round > 0:
-                        for _ in range(structural_mutations_per_round):
-                            s = _pick_structural_op()
-                            if s is not None:
-                                planned_strategies.append(s)
-    
-                    for planned in planned_strategies:
-                        if skip_seed_due_to_parse:
-                            break
-                        if planned in exhausted_in_round:
-                            continue
-                        variant_index += 1
-                        variant_id = f"w{worker_index}_iter_{i+1}_{pass_name}_var_{variant_index}"
-    
-    
-                        # ------------------------------------------------------------------
-                        # Robust Mutation & Compilation Loop
-                        # ------------------------------------------------------------------
-                        max_retries = mutation_max_retries
-                        mutated_content = None
-                        current_strategy = None
-                        inapplicable_retries = 0
-                        skip_iteration_due_to_inapplicable = False
-                        skip_inapplicable_reason = None
-    
-                        def _is_duplicate_mutation(strategy: str, content: str) -> bool:
-                            if not strategy or content is None:
-                                return False
-                            h = hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()
-                            seen = seen_mutations_by_strategy.setdefault(strategy, set())
-                            if h in seen:
-                                return True
-                            seen.add(h)
-                            return False
-    
-                        # A. Mutation Retry Loop
-                        logged_retry: set = set()
-                        for attempt in range(max_retries):
-                            try:
-                                current_strategy = planned
-                                if current_strategy is None:
-                                    logging.warning(
-                                        f"[{variant_id}] No planned strategy available; stopping further variants."
-                                    )
-                                    skip_iteration_due_to_inapplicable = True
-                                    break
-    
-                                # Log strategy (once per variant)
-                                if attempt == 0:
-                                    is_injection = current_strategy == "constraint_injection"
-                                    is_projection = current_strategy == "projection_rewrite"
-                                    is_lifetime = current_strategy == "lifetime_obfuscation"
-                                    is_outlive = current_strategy == "lifetime_outlive"
-    
-                                    if is_injection and "constraint_injection" not in logged_strategy_start:
-                                        logged_strategy_start.add("constraint_injection")
-                                        color = "\033[38;5;217m"  # light pink
-                                        reset = "\033[0m"
-                                        logging.info(f"{color}MutationⅡ started{reset}")
-    
-                                    if is_projection and "projection_rewrite" not in logged_strategy_start:
-                                        logged_strategy_start.add("projection_rewrite")
-                                        color = "\033[33m"  # yellow
-                                        reset = "\033[0m"
-                                        logging.info(f"{color}MutationⅢ started{reset}")
-                                    
-                                    if is_lifetime and "lifetime_obfuscation" not in logged_strategy_start:
-                                        logged_strategy_start.add("lifetime_obfuscation")
-                                        color = "\033[36m"  # Cyan
-                                        reset = "\033[0m"
-                                        logging.info(f"{color}MutationⅣ started{reset}")
-                                    
-                                    if is_outlive and "lifetime_outlive" not in logged_strategy_start:
-                                        logged_strategy_start.add("lifetime_outlive")
-                                        color = "\033[35m"  # Magenta
-                                        reset = "\033[0m"
-                                        logging.info(f"{color}MutationⅤ started{reset}")
-    
-                                    if not is_injection and not is_projection and not is_lifetime and not is_outlive:
-                                        mutation_label = "MutationⅠ"
-                                        color = "\033[34m"
-                                        reset = "\033[0m"
-                                        logging.info(
-                                            f"{color}{mutation_label}{reset} -> Variant {variant_index}: Strategy {current_strategy}"
-                                        )
-    
-                                # 2. Perform Mutation
-                                if current_strategy == "llm_injection":
-                                    topology = extractor.extract_topology(round_seed_content)
-                                    mutated_content = injector.inject_topology(round_seed_content, topology)
-                                    if mutated_content is not None and _is_duplicate_mutation(current_strategy, mutated_content):
-                                        logging.info(
-                                            f"    [Dup] Strategy {current_strategy} produced identical mutant; skipping this variant."
-                                        )
-                                        mutated_content = None
-                                        inapplicable_retries += 1
-                                        if inapplicable_retries >= max_retries:
-                                            logging.warning(
-                                                f"[{variant_id}] Duplicate mutant hit max retries ({max_retries}); skipping this iteration."
-                                            )
-                                            skip_iteration_due_to_inapplicable = True
-                                            break
-                                        continue
-                                    break
-    
-                                else:
-                                    # Rust AST Mutation
-                                    rust_mode = current_strategy
-                                    bin_dir = Path("mutation/mutation-AST")
-                                    with tempfile.TemporaryDirectory(prefix=f"trait_fuzzer_mut_{variant_id}_") as td:
-                                        output_temp = Path(td) / "mutant.rs"
-    
-                                        # If we already know this mutator's candidate count for this seed,
-                                        # pick an unseen index to avoid re-sampling the same mutation point.
-                                        forced_index = None
-                                        cand_count = known_candidate_counts.get(current_strategy)
-                                        if cand_count is not None:
-                                            if cand_count <= 0:
-                                                exhausted_strategies.add(current_strategy)
-                                                exhausted_in_round.add(current_strategy)
-                                                logging.info(
-                                                    "    [Exhausted] Strategy %s has no remaining mutation points (count=%d); skipping",
-                                                    current_strategy,
-                                                    cand_count,
-                                                )
-                                                skip_iteration_due_to_inapplicable = True
-                                                break
-                                            used = used_indices_by_strategy.setdefault(current_strategy, set())
-                                            if len(used) >= cand_count:
-                                                exhausted_strategies.add(current_strategy)
-                                                exhausted_in_round.add(current_strategy)
-                                                inapplicable_retries += 1
-                                                key = (variant_id, current_strategy, "exhausted")
-                                                if key not in logged_retry:
-                                                    action = "skipping" if current_strategy in ("constraint_injection", "add_trait", "add_impl") else "retrying"
-                                                    logging.info(
-                                                        f"    [Exhausted] Strategy {current_strategy} has no remaining mutation points (count={cand_count}); {action}..."
-                                                    )
-                                                    logged_retry.add(key)
-                                                if current_strategy in ("constraint_injection", "add_trait", "add_impl"):
-                                                    skip_iteration_due_to_inapplicable = True
-                                                    skip_inapplicable_reason = "exhausted"
-                                                    break
-                                                if inapplicable_retries >= max_retries:
-                                                    logging.warning(
-                                                        f"[{variant_id}] Strategy inapplicable hit max retries ({max_retries}); skipping this iteration."
-                                                    )
-                                                    skip_iteration_due_to_inapplicable = True
-                                                    break
-                                                continue
-    
-                                            # Choose a random unused index.
-                                            for _ in range(choice_pick_tries):
-                                                idx = random.randrange(cand_count)
-                                                if idx not in used:
-                                                    forced_index = idx
-                                                    break
-                                            if forced_index is None:
-                                                remaining = [k for k in range(cand_count) if k not in used]
-                                                forced_index = random.choice(remaining)
-    
-                                        cmd = [
-                                            str(mutation_bin_path),
-                                            "--input", str(round_seed_path.absolute()),
-                                            "--output", str(output_temp.absolute()),
-                                            "--mode", rust_mode,
-                                            "--emit-choice",
-                                        ]
-    
-                                        # If constraint_injection, use global choice index.
-                                        if current_strategy == "constraint_injection" and forced_index is not None:
-                                            cmd.extend(["--constraint-index", str(forced_index)])
-    
-                                        # If projection_rewrite, use global choice index.
-                                        if current_strategy == "projection_rewrite" and forced_index is not None:
-                                            cmd.extend(["--choice-index", str(forced_index)])
-    
-                                        if forced_index is not None and current_strategy not in (
-                                            "constraint_injection",
-                                            "projection_rewrite",
-                                        ):
-                                            cmd.extend(["--index", str(forced_index)])
-    
-                                        proc = subprocess.run(
-                                            cmd,
-                                            cwd=str(bin_dir.absolute()),
-                                            check=True,         # Will raise CalledProcessError on non-zero exit
-                                            capture_output=True,
-                                            text=True,
-                                            encoding="utf-8",
-                                            errors="replace",
-                                        )
-    
-                                        # Record which mutation point was actually sampled.
-                                        try:
-                                            m = re.search(
-                                                r"MUTATION_CHOICE\s+mode=(\S+)\s+count=(\d+)\s+index=(\d+)\s+mutated=(\d+)",
-                                                proc.stderr,
-                                            )
-                                            if m is not None:
-                                                count = int(m.group(2))
-                                                index = int(m.group(3))
-                                                if current_strategy not in ("constraint_injection", "projection_rewrite"):
-                                                    known_candidate_counts[current_strategy] = count
-                                                    used_set = used_indices_by_strategy.setdefault(current_strategy, set())
-                                                    used_set.add(index)
-                                                    if count > 0 and len(used_set) >= count:
-                                                        exhausted_strategies.add(current_strategy)
-                                            # Parse choice_count/choice_index if present.
-                                            if current_strategy == "constraint_injection":
-                                                m2 = re.search(
-                                                    r"choice_count=(\d+)\s+choice_index=(\d+)",
-                                                    proc.stderr,
-                                                )
-                                                if m2 is not None:
-                                                    ccount = int(m2.group(1))
-                                                    cidx = int(m2.group(2))
-                                                    known_candidate_counts[current_strategy] = ccount
-                                                    used_indices_by_strategy.setdefault(current_strategy, set()).add(cidx)
-                                            # Parse choice_count/choice_index if present (projection_rewrite).
-                                            if current_strategy == "projection_rewrite":
-                                                m3 = re.search(
-                                                    r"choice_count=(\d+)\s+choice_index=(\d+)",
-                                                    proc.stderr,
-                                                )
-                                                if m3 is not None:
-                                                    pcount = int(m3.group(1))
-                                                    pidx = int(m3.group(2))
-                                                    known_candidate_counts[current_strategy] = pcount
-                                                    used_indices_by_strategy.setdefault(current_strategy, set()).add(pidx)
-                                        except Exception:
-                                            # Best-effort only; falling back to hash-based dedup is fine.
-                                            pass
-    
-                                        
-                                        # If syn cannot parse this seed, blacklist it and move on.
-                                        if "Parse failed:" in proc.stderr:
-                                            logging.warning(
-                                                f"[{variant_id}] Seed not parseable by syn; skipping: {round_seed_path.name}"
-                                            )
-                                            if round_seed_path == seed_path:
-                                                bad_seeds.add(seed_path)
-                                                selector.remove_seed(seed_path)
-                                            mutated_content = None
-                                            skip_seed_due_to_parse = True
-                                            skip_iteration_due_to_inapplicable = True
-                                            break
-    
-                                        # Check for No-Op
-                                        if "No mutation performed" in proc.stderr:
-                                            if current_strategy in ("add_trait", "add_impl", "constraint_injection"):
-                                                exhausted_in_round.add(current_strategy)
-                                                logging.info(
-                                                    f"    [No-Op] Strategy {current_strategy} produced no mutation; skipping without retry."
-                                                )
-                                                skip_iteration_due_to_inapplicable = True
-                                                skip_inapplicable_reason = "noop"
-                                                break
-                                            inapplicable_retries += 1
-                                            key = (variant_id, current_strategy, "noop")
-                                            if key not in logged_retry:
-                                                logging.info(
-                                                    f"    [No-Op] Strategy {current_strategy} inapplicable. Retrying..."
-                                                )
-                                                logged_retry.add(key)
-                                            if inapplicable_retries >= max_retries:
-                                                logging.warning(
-                                                    f"[{variant_id}] Strategy inapplicable hit max retries ({max_retries}); skipping this iteration."
-                                                )
-                                                skip_iteration_due_to_inapplicable = True
-                                                break
-                                            continue  # Retry loop
-    
-                                        # Success case
-                                        if output_temp.exists():
-                                            with open(output_temp, 'r') as f:
-                                                mutated_content = f.read()
-    
-                                            if mutated_content is not None and _is_duplicate_mutation(current_strategy, mutated_content):
-                                                logging.info(
-                                                    f"    [Dup] Strategy {current_strategy} produced identical mutant; skipping this variant."
-                                                )
-                                                mutated_content = None
-                                                inapplicable_retries += 1
-                                                if inapplicable_retries >= max_retries:
-                                                    logging.warning(
-                                                        f"[{variant_id}] Duplicate mutant hit max retries ({max_retries}); skipping this iteration."
-                                                    )
-                                                    skip_iteration_due_to_inapplicable = True
-                                                    break
-                                                continue
-                                            break  # Mutated successfully
-                                        else:
-                                            logging.error(f"[{variant_id}] Rust mutation tool produced no output")
-                                            continue
-    
-                                # If we blacklisted the seed, stop trying more strategies for it.
-                                if seed_path in bad_seeds:
-                                    break
+                        leaf_budget = {
+                            "constraint_injection": injection_mutations_per_round,
+                            "projection_rewrite": projection_mutations_per_round,
+                            "lifetime_obfuscation": lifetime_mutations_per_round,
+                            "lifetime_outlive": outlive_mutations_per_round,
+                        }
+                    planned_strategies: List[str] = mutator_pool.plan_round(
+                        leaf_budget,
+                        structural_mutations_per_round,
+                    )
     
-                            except subprocess.CalledProcessError as e:
-                                logging.error(f"[{variant_id}] Mutation tool failed: {e.stderr}")
-                                continue # Retry
-                            except Exception as e:
-                                logging.error(f"[{variant_id}] Unexpected error during mutation: {e}")
+                    # Producer stage (runs on the pipeline's producer thread): one mutation-ast
+                    # batch per leaf strategy returns N distinct mutants (with their site/choice
+                    # indices) from one parse; variant ids are assigned in planned order.
+                    round_state = {"parse_failed": False}
+
+                    def _produce(
+                        base_index=variant_index,
+                        consumed=consumed_choices_by_strategy,
+                        round_seed_path=round_seed_path,
+                        planned_strategies=planned_strategies,
+                    ):
+                        next_index = base_index
+                        round_plan: Dict[str, collections.deque] = {}
+                        for planned in planned_strategies:
+                            if planned in exhausted_in_round:
                                 continue
-    
-                        if skip_iteration_due_to_inapplicable:
-                            if skip_inapplicable_reason != "exhausted":
-                                logging.info(
-                                    "[%s] Strategy inapplicable; skipping this strategy and continuing",
-                                    variant_id,
+                            if planned not in round_plan:
+                                wanted = planned_strategies.count(planned)
+                                round_plan[planned] = collections.deque()
+                                try:
+                                    batch = mutation_client.mutate_batch(
+                                        round_seed_path,
+                                        planned,
+                                        wanted,
+                                        distinct=True,
+                                        exclude=consumed.get(planned, ()),
+                                    )
+                                except MutationToolError as e:
+                                    logging.error("Mutation tool failed (strategy=%s): %s", planned, e)
+                                    exhausted_in_round.add(planned)
+                                    continue
+
+                                if batch.parse_failed:
+                                    round_state["parse_failed"] = True
+                                    return
+
+                                round_plan[planned].extend(batch.mutants)
+                                consumed.setdefault(planned, set()).update(
+                                    m.choice_index for m in batch.mutants
                                 )
-                            continue
-    
-                        # B. Compilation & Analysis (Outside Retry Loop)
-                        if mutated_content is None:
-                            logging.warning(f"[{variant_id}] Failed to produce mutation after {max_retries} attempts.")
-                            continue
+                                if len(batch.mutants) < wanted:
+                                    logging.info(
+                                        "    [Exhausted] Strategy %s yielded %d/%d distinct mutants (count=%d, choices=%d)",
+                                        planned,
+                                        len(batch.mutants),
+                                        wanted,
+                                        batch.count,
+                                        batch.choice_count,
+                                    )
+
+                            pending = round_plan[planned]
+                            if not pending:
+                                exhausted_in_round.add(planned)
+                                continue
+                            next_index += 1
+                            yield PlannedVariant(
+                                variant_id=f"w{worker_index}_iter_{i+1}_{pass_name}_var_{next_index}",
+                                variant_index=next_index,
+                                strategy=planned,
+                                content=pending.popleft().output,
+                            )
+
+                    # Compile stage runs on the pipeline's pool; classification/persistence
+                    # below stays on this thread, strictly in variant order.
+                    for planned, compiled, compile_error in variant_pipeline.run(_produce):
+                        variant_index = planned.variant_index
+                        variant_id = planned.variant_id
+
+                        current_strategy = planned.strategy
+                        mutated_content = planned.content
+
+                        is_injection = current_strategy == "constraint_injection"
+                        is_projection = current_strategy == "projection_rewrite"
+                        is_lifetime = current_strategy == "lifetime_obfuscation"
+                        is_outlive = current_strategy == "lifetime_outlive"
+
+                        if is_injection and "constraint_injection" not in logged_strategy_start:
+                            logged_strategy_start.add("constraint_injection")
+                            color = "\033[38;5;217m"  # light pink
+                            reset = "\033[0m"
+                            logging.info(f"{color}MutationⅡ started{reset}")
+
+                        if is_projection and "projection_rewrite" not in logged_strategy_start:
+                            logged_strategy_start.add("projection_rewrite")
+                            color = "\033[33m"  # yellow
+                            reset = "\033[0m"
+                            logging.info(f"{color}MutationⅢ started{reset}")
+
+                        if is_lifetime and "lifetime_obfuscation" not in logged_strategy_start:
+                            logged_strategy_start.add("lifetime_obfuscation")
+                            color = "\033[36m"  # Cyan
+                            reset = "\033[0m"
+                            logging.info(f"{color}MutationⅣ started{reset}")
+
+                        if is_outlive and "lifetime_outlive" not in logged_strategy_start:
+                            logged_strategy_start.add("lifetime_outlive")
+                            color = "\033[35m"  # Magenta
+                            reset = "\033[0m"
+                            logging.info(f"{color}MutationⅤ started{reset}")
+
+                        if not is_injection and not is_projection and not is_lifetime and not is_outlive:
+                            mutation_label = "MutationⅠ"
+                            color = "\033[34m"
+                            reset = "\033[0m"
+                            logging.info(
+                                f"{color}{mutation_label}{reset} -> Variant {variant_index}: Strategy {current_strategy}"
+                            )
+
+                        # B. Compilation & Analysis
 
                         if coverage_enabled:
                             try:
                                 case_dir = Path("utils/coverage/case")
                                 case_dir.mkdir(parents=True, exist_ok=True)
+                                waited = wait_for_queue_room(case_dir, coverage_backpressure_max_wait)
+                                if waited >= 1.0:
+                                    logging.info("[%s] coverage queue full, waited %.1fs", variant_id, waited)
                                 case_path = case_dir / f"case_w{worker_index}_{variant_id}_{int(time.time() * 1000)}.rs"
                                 case_path.write_text(mutated_content, encoding="utf-8", errors="ignore")
                                 logging.info("[%s] queued coverage case: %s", variant_id, case_path)
+                                if feedback_reader is not None:
+                                    queued_variants[variant_id] = {
+                                        "parent": seed_path,
+                                        "family": ancestor_family,
+                                        "strategy": current_strategy,
+                                        "content": mutated_content,
+                                    }
+                                    while len(queued_variants) > feedback_window:
+                                        queued_variants.popitem(last=False)
                             except Exception as e:
                                 logging.warning("[%s] failed to queue coverage case: %s", variant_id, e)
                                 continue
 
                             if current_strategy in getattr(mutator_pool, "structural_ops", []):
                                 current_seed_content = mutated_content
-                                used_indices_by_strategy = {}
-                                known_candidate_counts = {}
-                                exhausted_strategies = set()
-                                seen_mutations_by_strategy = {}
+                                consumed_choices_by_strategy = {}
                             continue
     
                         kill_fate_now = False
-                        temp_src = None
+                        temp_src = scratch.path(f"temp_{variant_id}.rs")
+                        # Scheduler feedback for this variant (see MutatorPool.update_weights).
+                        variant_new_crash = False
+                        variant_promoted = False
                         try:
-                            # 3. Save & Compile
-                            temp_src = Path(f"temp_{variant_id}.rs")
-                            with open(temp_src, 'w') as f:
-                                f.write(mutated_content)
-    
-                            # 3. Compile (oracle): stable once, +nightly once, +nightly with -Z next-solver once.
-                            def _compile_with(rustc_cmd, extra_args=None):
-                                use_gccrs_context = _is_gccrs_cmd(rustc_cmd)
-                                comp = RustCompiler(
-                                    timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                    rustc_cmd=rustc_cmd,
-                                    working_dir=gccrs_work_dir if use_gccrs_context else None,
-                                    env=gccrs_env if use_gccrs_context else None,
-                                    auto_no_core=gccrs_auto_no_core if use_gccrs_context else False,
-                                )
-                                return comp.compile(temp_src, extra_args=extra_args)
-    
-                            result_stable = None
-                            result_nightly = None
-                            result_next = None
-                            result_gccrs = None
-    
-                            should_run_extras = (enable_nightly_compile or enable_next_solver or enable_gccrs)
-    
-                            if parallel_compile and should_run_extras:
-                                with ThreadPoolExecutor(max_workers=parallel_workers) as ex:
-                                    futures = {}
-                                    futures["stable"] = ex.submit(
-                                        _compile_with,
-                                        compiler_cfg.get("rustc_cmd"),
-                                        None,
-                                    )
-                                    if enable_nightly_compile:
-                                        futures["nightly"] = ex.submit(
-                                            _compile_with,
-                                            nightly_rustc_cmd,
-                                            None,
-                                        )
-                                    if enable_next_solver:
-                                        futures["next"] = ex.submit(
-                                            _compile_with,
-                                            nightly_rustc_cmd,
-                                            [next_solver_flag],
-                                        )
-                                    if enable_gccrs:
-                                        futures["gccrs"] = ex.submit(
-                                            _compile_with,
-                                            gccrs_cmd,
-                                            gccrs_extra_args,
-                                        )
-    
-                                    result_stable = futures["stable"].result()
-                                    if "nightly" in futures:
-                                        result_nightly = futures["nightly"].result()
-                                    if "next" in futures:
-                                        result_next = futures["next"].result()
-                                    if "gccrs" in futures:
-                                        result_gccrs = futures["gccrs"].result()
-                            else:
-                                result_stable = compiler.compile(temp_src)
-    
-                                if enable_nightly_compile:
-                                    compiler_nightly = RustCompiler(
-                                        timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                        rustc_cmd=nightly_rustc_cmd,
-                                    )
-                                    result_nightly = compiler_nightly.compile(temp_src)
-    
-                                if enable_next_solver:
-                                    compiler_next = RustCompiler(
-                                        timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                        rustc_cmd=nightly_rustc_cmd,
-                                    )
-                                    result_next = compiler_next.compile(temp_src, extra_args=[next_solver_flag])
-
-                                if enable_gccrs:
-                                    compiler_gccrs = RustCompiler(
-                                        timeout=config["fuzzer"]["max_time_per_case_sec"],
-                                        rustc_cmd=gccrs_cmd,
-                                        working_dir=gccrs_work_dir,
-                                        env=gccrs_env,
-                                        auto_no_core=gccrs_auto_no_core,
-                                    )
-                                    result_gccrs = compiler_gccrs.compile(
-                                        temp_src,
-                                        extra_args=gccrs_extra_args,
-                                    )
-    
+                            if compile_error is not None:
+                                raise compile_error
+                            result_stable = compiled["stable"]
+                            result_nightly = compiled.get("nightly")
+                            result_next = compiled.get("next")
+                            result_gccrs = compiled.get("gccrs")
+
                             def _rank(status: CompilationStatus) -> int:
                                 order = {
                                     CompilationStatus.CRASH: 4,
@@ -2291,6 +2570,7 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
     
                             dest_cases: List[Path] = []
                             dest_case_meta: Dict[Path, Dict[str, str]] = {}
+                            packed_cases: List[Dict[str, str]] = []
                             if dest_targets:
                                 # Per-case safety check: prune prunable categories before we write more.
                                 if not _enforce_all_results_limits():
@@ -2313,6 +2593,7 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                                             compiler_ns=compiler_ns,
                                             status_name=ds,
                                             stderr=crash_stderr,
+                                            case_id=variant_id,
                                         )
                                         if duplicated:
                                             logging.info(
@@ -2321,6 +2602,18 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                                                 compiler_ns,
                                                 bug_location,
                                             )
+                                        else:
+                                            variant_new_crash = True
+
+                                    if case_store is not None and effective_status in packed_statuses:
+                                        packed_cases.append({
+                                            "compiler": str(compiler_ns),
+                                            "stored_status": str(effective_status),
+                                            "bug_location": str(bug_location or ""),
+                                            "before": round_seed_path.read_text(encoding="utf-8", errors="surrogateescape"),
+                                            "after": temp_src.read_text(encoding="utf-8", errors="surrogateescape"),
+                                        })
+                                        continue
 
                                     dest_dir = results_dir / compiler_ns / effective_status
                                     dest_case = dest_dir / f"case_{variant_id}"
@@ -2348,7 +2641,7 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                                     constraint_choice_sum,
                                 )
     
-                            if dest_cases:
+                            if dest_cases or packed_cases:
                                 # Build a summary string for the status, e.g. "Stable:HANG, Nightly:ICE"
                                 status_details = []
                                 # Also track which specific versions match the final reported status (the "culprits")
@@ -2409,61 +2702,53 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                                 except Exception:
                                     root_rel = str(ancestor_family)
 
+                                sections = [_detail_section("rustc (stable)", compiler.rustc_cmd, result_stable)]
+                                if result_nightly is not None:
+                                    sections.append(_detail_section("rustc (+nightly)", nightly_rustc_cmd, result_nightly))
+                                if result_next is not None:
+                                    sections.append(_detail_section(
+                                        "rustc (-Z next trait-solver)", nightly_rustc_cmd + [next_solver_flag], result_next
+                                    ))
+                                if result_gccrs is not None:
+                                    sections.append(_detail_section("gccrs", gccrs_cmd + gccrs_extra_args, result_gccrs))
+
+                                def _case_header(meta: Dict[str, str]) -> List[tuple]:
+                                    header = [("Seed", seed_rel), ("Root", root_rel)]
+                                    if meta.get("compiler"):
+                                        header.append(("Compiler", meta.get("compiler")))
+                                    header.append(("Strategy", current_strategy))
+                                    header.append(("Status", result.status.value))
+                                    if meta.get("stored_status"):
+                                        header.append(("Stored Status", meta.get("stored_status")))
+                                    if meta.get("bug_location"):
+                                        header.append(("Bug Location", meta.get("bug_location")))
+                                    header.append(("Version", version_str))
+                                    header.append(("Status Breakdown", status_summary))
+                                    if miscompilation and result_nightly is not None and result_next is not None:
+                                        header.append(("Miscompilation", "nightly vs next-solver mismatch"))
+                                        header.append(("Nightly", result_nightly.status.value))
+                                        header.append(("Next", result_next.status.value))
+                                    header.append(("Constraint Sites", constraint_sites))
+                                    header.append(("Constraint Choice Sum", constraint_choice_sum))
+                                    return header
+
                                 for dc in dest_cases:
-                                    meta = dest_case_meta.get(dc, {})
                                     with open(dc / "detail.log", 'w') as f:
-                                        f.write(f"Seed: {seed_rel}\n")
-                                        f.write(f"Root: {root_rel}\n")
-                                        if meta.get("compiler"):
-                                            f.write(f"Compiler: {meta.get('compiler')}\n")
-                                        f.write(f"Strategy: {current_strategy}\n")
-                                        f.write(f"Status: {result.status.value}\n")
-                                        if meta.get("stored_status"):
-                                            f.write(f"Stored Status: {meta.get('stored_status')}\n")
-                                        if meta.get("bug_location"):
-                                            f.write(f"Bug Location: {meta.get('bug_location')}\n")
-                                        f.write(f"Version: {version_str}\n")
-                                        f.write(f"Status Breakdown: {status_summary}\n")
-                                        if miscompilation and result_nightly is not None and result_next is not None:
-                                            f.write("Miscompilation: nightly vs next-solver mismatch\n")
-                                            f.write(f"Nightly: {result_nightly.status.value}\n")
-                                            f.write(f"Next: {result_next.status.value}\n")
-                                        f.write(f"Constraint Sites: {constraint_sites}\n")
-                                        f.write(f"Constraint Choice Sum: {constraint_choice_sum}\n")
-                                        f.write("\n=== rustc (stable) ===\n")
-                                        f.write(f"Command: {' '.join(map(str, compiler.rustc_cmd))}\n")
-                                        f.write(f"Status: {result_stable.status.value}\n")
-                                        f.write(f"Duration: {result_stable.duration:.4f}s\n")
-                                        f.write(f"Return code: {result_stable.return_code}\n")
-                                        f.write(f"Stdout:\n{result_stable.stdout}\n")
-                                        f.write(f"Stderr:\n{result_stable.stderr}\n")
-
-                                        if result_nightly is not None:
-                                            f.write("\n=== rustc (+nightly) ===\n")
-                                            f.write(f"Command: {' '.join(map(str, nightly_rustc_cmd))}\n")
-                                            f.write(f"Status: {result_nightly.status.value}\n")
-                                            f.write(f"Duration: {result_nightly.duration:.4f}s\n")
-                                            f.write(f"Return code: {result_nightly.return_code}\n")
-                                            f.write(f"Stdout:\n{result_nightly.stdout}\n")
-                                            f.write(f"Stderr:\n{result_nightly.stderr}\n")
-
-                                        if result_next is not None:
-                                            f.write("\n=== rustc (-Z next trait-solver) ===\n")
-                                            f.write(f"Command: {' '.join(map(str, nightly_rustc_cmd + [next_solver_flag]))}\n")
-                                            f.write(f"Status: {result_next.status.value}\n")
-                                            f.write(f"Duration: {result_next.duration:.4f}s\n")
-                                            f.write(f"Return code: {result_next.return_code}\n")
-                                            f.write(f"Stdout:\n{result_next.stdout}\n")
-                                            f.write(f"Stderr:\n{result_next.stderr}\n")
-
-                                        if result_gccrs is not None:
-                                            f.write("\n=== gccrs ===\n")
-                                            f.write(f"Command: {' '.join(map(str, gccrs_cmd + gccrs_extra_args))}\n")
-                                            f.write(f"Status: {result_gccrs.status.value}\n")
-                                            f.write(f"Duration: {result_gccrs.duration:.4f}s\n")
-                                            f.write(f"Return code: {result_gccrs.return_code}\n")
-                                            f.write(f"Stdout:\n{result_gccrs.stdout}\n")
-                                            f.write(f"Stderr:\n{result_gccrs.stderr}\n")
+                                        f.write(render_detail_log(_case_header(dest_case_meta.get(dc, {})), sections))
+                                    _catalog_case(dc)
+                                for pc in packed_cases:
+                                    try:
+                                        case_store.put(
+                                            variant_id,
+                                            pc["stored_status"],
+                                            pc["compiler"],
+                                            pc["before"],
+                                            pc["after"],
+                                            _case_header(pc),
+                                            sections,
+                                        )
+                                    except Exception as e:
+                                        logging.warning("[%s] Packed case store write failed: %s", variant_id, e)
     
                             logging.info(
                                 "[%s] Result summary: rustc=%s%s",
@@ -2479,10 +2764,7 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                             if current_strategy in getattr(mutator_pool, "structural_ops", []):
                                 current_seed_content = mutated_content
                                 # New structure: reset mutation-point tracking for the next round
-                                used_indices_by_strategy = {}
-                                known_candidate_counts = {}
-                                exhausted_strategies = set()
-                                seen_mutations_by_strategy = {}
+                                consumed_choices_by_strategy = {}
     
                             # Promote SUCCESS mutants into seeds/newN (rolling cap)
                             # Only MutationⅡ (constraint_injection) is eligible when promotion is enabled.
@@ -2517,9 +2799,7 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                                         args.new_seeds_max,
                                     )
     
-                                    out_path = promoted_dir / f"seed_{variant_id}.rs"
-                                    if out_path.exists():
-                                        out_path = promoted_dir / f"seed_{variant_id}_{int(time.time())}.rs"
+                                    out_path = promoted_seed_path(promoted_dir, f"seed_{variant_id}")
                                     out_path.write_text(mutated_content, encoding='utf-8', errors='ignore')
                                     # Make the newly promoted seed immediately eligible for selection.
                                     try:
@@ -2528,12 +2808,19 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                                         pass
     
                                     promotions_by_seed[parent_key] = promoted_so_far + 1
+                                    variant_promoted = True
                                 except Exception as e:
                                     logging.warning("Failed to promote seed %s: %s", variant_id, e)
     
                         except Exception as e:
                             logging.error(f"[{variant_id}] Variant compilation/analysis failed: {e}")
                         finally:
+                            mutator_pool.update_weights({
+                                "strategy": current_strategy,
+                                "cost_sec": sum(float(getattr(r, "duration", 0.0)) for r in (compiled or {}).values()),
+                                "new_crash": variant_new_crash,
+                                "promoted": variant_promoted,
+                            })
                             try:
                                 if temp_src is not None and temp_src.exists():
                                     temp_src.unlink()
@@ -2542,6 +2829,19 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
     
                         if kill_fate_now:
                             break
+
+                    # If syn cannot parse this seed, blacklist it and move on.
+                    if round_state["parse_failed"]:
+                        logging.warning(
+                            "Seed not parseable by syn; skipping: %s",
+                            round_seed_path.name,
+                        )
+                        if round_seed_path == seed_path:
+                            bad_seeds.add(seed_path)
+                            selector.remove_seed(seed_path)
+                            if seed_index is not None and parse_tool:
+                                seed_index.record_parse(seed_path, parse_tool, False, "Parse failed")
+                        skip_seed_due_to_parse = True
     
                     if round_seed_temp is not None:
                         try:
@@ -2550,15 +2850,45 @@ def worker_main(worker_index: int, total_workers: int, mutation_bin_path: Path):
                         except Exception:
                             pass
     
+            variant_pipeline.log_stats(f"iter {i+1}")
+            if mutator_pool.bandit is not None:
+                logging.info(mutator_pool.summary())
+            if compiler_matrix.verdict_policy_name != "wait_all" or compiler_matrix.tiered:
+                logging.info(compiler_matrix.format_stats())
+            if compile_cache is not None:
+                logging.info(compile_cache.format_stats())
+
             # End of one outer iteration (one selected seed): prune prunable categories.
             if not _enforce_all_results_limits():
                 return
 
+        if compile_slots is not None:
+            logging.info(compile_slots.format_utilization())
+        if compile_cache is not None:
+            logging.info(compile_cache.format_stats())
         logging.info("Trait-Fuzzer finished.")
         
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        # Also reached through the early returns: no usable seeds (the normal end with
+        # seed_max_picks_per_seed=1), the disk-limit stops and errors.
+        for resource, method in (
+            (variant_pipeline, "close"),
+            (selector, "close"),
+            (case_store, "close"),
+            (mutator_pool, "save_state"),
+            (compiler_matrix, "close"),
+            (mutation_client, "close"),
+            (scratch, "cleanup"),
+        ):
+            if resource is None:
+                continue
+            try:
+                getattr(resource, method)()
+            except Exception as e:
+                logging.warning("Teardown %s.%s failed: %s", type(resource).__name__, method, e)
 
 def main():
     # Parse config to find out how many workers we need
@@ -2572,13 +2902,54 @@ def main():
         print(f"Critical error building mutation tool: {e}")
         sys.exit(1)
 
+    # Drop scratch directories left behind by crashed or killed earlier runs; this
+    # campaign's workers share a directory owned by this process.
+    ScratchWorkspace.purge_root(ScratchWorkspace.root_from_config(config))
+    scratch_owner_pid = os.getpid()
+
+    # Cross-process compile-slot pool: start every run with fresh slot counters.
+    compile_slots = CompileSlots.from_config(config)
+    if compile_slots is not None:
+        compile_slots.reset()
+        print(f"Global compile slots: {compile_slots.slots} (dir={compile_slots.slot_dir})")
+
+    # Scan the corpus once here; each worker only gets its shard of the manifest.
+    manifest: Optional[SeedManifest] = None
+    fuzzer_cfg = config.get("fuzzer", {})
+    if _cfg_bool(fuzzer_cfg.get("seed_manifest", True)):
+        seeds_dir = Path(config["paths"]["seeds"])
+        index = None
+        if _cfg_bool(fuzzer_cfg.get("seed_index_enable", True)):
+            index = SeedIndex(Path(config["paths"].get("seed_index", seeds_dir / ".index")))
+        tool = tool_identity(mutation_bin_path) if index is not None else None
+        manifest = SeedManifest.build(
+            seeds_dir,
+            index=index,
+            jobs=int(fuzzer_cfg.get("seed_manifest_jobs", 8)),
+            tool=tool,
+        )
+        if index is not None:
+            if _cfg_bool(fuzzer_cfg.get("seed_preparse", True)):
+                # One bulk mutation-ast pass over seeds this build has never parsed.
+                start = time.time()
+                filled = manifest.preparse(index, tool, TTDNModel(bin_path=mutation_bin_path))
+                print(f"Pre-parsed {filled} seeds in {time.time() - start:.1f}s")
+            index.close()
+        print(manifest.summary())
+
+    def _shard(i: int, n: int) -> Optional[List[SeedEntry]]:
+        return manifest.shard(i, n) if manifest is not None else None
+
     if num_workers <= 1:
-        worker_main(0, 1, mutation_bin_path)
+        worker_main(0, 1, mutation_bin_path, _shard(0, 1), scratch_owner_pid)
     else:
         print(f"Spawning {num_workers} parallel workers...")
         processes = []
         for i in range(num_workers):
-            p = multiprocessing.Process(target=worker_main, args=(i, num_workers, mutation_bin_path))
+            p = multiprocessing.Process(
+                target=worker_main,
+                args=(i, num_workers, mutation_bin_path, _shard(i, num_workers), scratch_owner_pid),
+            )
             p.start()
             processes.append(p)
         
@@ -2592,12 +2963,21 @@ def main():
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
 
+        report_sec = float(config.get("compiler", {}).get("compile_slots_report_sec", 300))
+        last_report = time.time()
         try:
             for p in processes:
-                p.join()
+                while p.is_alive():
+                    p.join(timeout=5)
+                    if compile_slots is not None and report_sec > 0 and time.time() - last_report >= report_sec:
+                        print(compile_slots.format_utilization())
+                        last_report = time.time()
         except KeyboardInterrupt:
             signal_handler(None, None)
 
+        if compile_slots is not None:
+            print(compile_slots.format_utilization())
+
 if __name__ == "__main__":
     # Windows support for multiprocessing
     multiprocessing.freeze_support()
@@ -0,0 +1,127 @@
+// =========================================================================
+// BULK METRICS MODE (`--mode ttdn_metrics_bulk`)
+// =========================================================================
+// Scores a whole corpus in one process: `--input` is either a directory
+// (searched recursively for `*.rs`, skipping dot-directories) or a text file
+// with one path per line. Files are parsed and scored in parallel (`--jobs`
+// scoped std threads pulling from a shared index, default one per core; no
+// extra crates) and one JSON object per file is
+// streamed to stdout as soon as it is ready (completion order, not input order):
+//
+//   {"path": "seeds/a.rs", "parse_failed": false, "metrics": {...ttdn_metrics payload...}}
+//   {"path": "seeds/b.rs", "parse_failed": true, "error": "<syn error>"}
+//   {"path": "seeds/c.rs", "parse_failed": false, "error": "<read error / panic>"}
+//
+// A final summary line goes to stderr.
+use std::fs;
+use std::io::{self, Write};
+use std::path::{Path, PathBuf};
+use std::sync::atomic::{AtomicUsize, Ordering};
+
+use serde_json::{json, Value};
+use syn::parse_file;
+
+fn collect_dir(dir: &Path, out: &mut Vec<PathBuf>) {
+    let entries = match fs::read_dir(dir) {
+        Ok(e) => e,
+        Err(e) => {
+            eprintln!("Cannot read {}: {}", dir.display(), e);
+            return;
+        }
+    };
+    for entry in entries.flatten() {
+        let path = entry.path();
+        let hidden = path
+            .file_name()
+            .and_then(|n| n.to_str())
+            .map(|n| n.starts_with('.'))
+            .unwrap_or(false);
+        match entry.file_type() {
+            Ok(t) if t.is_dir() && !hidden => collect_dir(&path, out),
+            Ok(t) if t.is_file() && path.extension().map(|e| e == "rs").unwrap_or(false) => out.push(path),
+            _ => {}
+        }
+    }
+}
+
+/// Files named by `input`: a directory tree, a single `.rs` file, or a path list.
+fn collect_inputs(input: &Path) -> Vec<PathBuf> {
+    let mut files = Vec::new();
+    if input.is_dir() {
+        collect_dir(input, &mut files);
+        files.sort();
+    } else if input.extension().map(|e| e == "rs").unwrap_or(false) {
+        files.push(input.to_path_buf());
+    } else {
+        let list = fs::read_to_string(input).expect("Failed to read file list");
+        files.extend(
+            list.lines()
+                .map(str::trim)
+                .filter(|l| !l.is_empty())
+                .map(PathBuf::from),
+        );
+    }
+    files
+}
+
+fn score_one(path: &Path) -> Value {
+    let shown = path.display().to_string();
+    let content = match fs::read_to_string(path) {
+        Ok(c) => c,
+        Err(e) => return json!({"path": shown, "parse_failed": false, "error": e.to_string()}),
+    };
+    let tree = match parse_file(&content) {
+        Ok(t) => t,
+        Err(e) => return json!({"path": shown, "parse_failed": true, "error": e.to_string()}),
+    };
+    // A panic in one extractor must not take down the whole corpus run.
+    match std::panic::catch_unwind(std::panic::AssertUnwindSafe(|| {
+        let info = crate::ttdn::TtdnInfo::from_file(&tree);
+        crate::ttdn_metrics_payload(&tree, &info)
+    })) {
+        Ok(metrics) => json!({"path": shown, "parse_failed": false, "metrics": metrics}),
+        Err(_) => json!({"path": shown, "parse_failed": false, "error": "metrics extraction panicked"}),
+    }
+}
+
+pub fn run(input: &Path, jobs: Option<usize>) {
+    let files = collect_inputs(input);
+    let threads = jobs
+        .filter(|n| *n > 0)
+        .unwrap_or_else(|| std::thread::available_parallelism().map(|n| n.get()).unwrap_or(1))
+        .min(files.len().max(1));
+
+    let prev_hook = std::panic::take_hook();
+    std::panic::set_hook(Box::new(|_| {}));
+
+    let next = AtomicUsize::new(0);
+    let parse_failed = AtomicUsize::new(0);
+    let errors = AtomicUsize::new(0);
+    let stdout = io::stdout();
+    std::thread::scope(|scope| {
+        for _ in 0..threads {
+            scope.spawn(|| loop {
+                let i = next.fetch_add(1, Ordering::Relaxed);
+                let Some(path) = files.get(i) else { break };
+                let line = score_one(path);
+                if line["parse_failed"] == Value::Bool(true) {
+                    parse_failed.fetch_add(1, Ordering::Relaxed);
+                } else if line.get("error").is_some() {
+                    errors.fetch_add(1, Ordering::Relaxed);
+                }
+                let mut out = stdout.lock();
+                let _ = writeln!(out, "{}", line);
+            });
+        }
+    });
+    let _ = stdout.lock().flush();
+
+    std::panic::set_hook(prev_hook);
+    eprintln!(
+        "ttdn_metrics_bulk: files={} parse_failed={} errors={} threads={}",
+        files.len(),
+        parse_failed.load(Ordering::Relaxed),
+        errors.load(Ordering::Relaxed),
+        threads,
+    );
+}
@@ -1,10 +1,14 @@
 use clap::Parser;
 use quote::quote;
+use rand::seq::SliceRandom;
+use std::collections::HashSet;
 use std::fs;
 use std::path::PathBuf;
 use syn::{parse_file, File};
 
+mod bulk;
 mod mutators;
+mod serve;
 mod ttdn;
 use mutators::Mutation_1::*;
 use mutators::Mutation_2::*;
@@ -16,11 +20,14 @@ use mutators::framework::Mutator;
 #[derive(Parser, Debug)]
 #[command(author, version, about, long_about = None)]
 struct Args {
+    /// Required for every mode except `serve`. For `ttdn_metrics_bulk`: a directory or a
+    /// file listing one path per line.
     #[arg(short, long)]
-    input: PathBuf,
+    input: Option<PathBuf>,
 
+    /// Required for every mode except `serve` and `ttdn_metrics_bulk`.
     #[arg(short, long)]
-    output: PathBuf,
+    output: Option<PathBuf>,
 
     #[arg(short, long)]
     mode: String,
@@ -46,12 +53,223 @@ struct Args {
     /// Force a particular trait pattern (0=Basic, 1=Assoc, 2=GAT, 3=AssocConst).
     #[arg(long)]
     pattern_index: Option<usize>,
+
+    /// Batch mode: generate up to N mutants of `--mode` from one parse and print them
+    /// (with their site/choice indices) as one JSON object on stdout.
+    #[arg(long)]
+    batch: Option<usize>,
+
+    /// Batch mode: drop mutants whose rendered source equals an earlier one in the batch.
+    #[arg(long, default_value_t = false)]
+    distinct: bool,
+
+    /// Batch mode: choice indices (comma-separated) already consumed by the caller.
+    #[arg(long, value_delimiter = ',')]
+    exclude: Vec<usize>,
+
+    /// `ttdn_metrics_bulk`: worker threads (default: one per core).
+    #[arg(long)]
+    jobs: Option<usize>,
+}
+
+/// Applies one mutation of `mode` to `syntax_tree`.
+///
+/// Returns (mutated, chosen_index, candidate_count, choice_count, chosen_choice_index),
+/// or None for an unknown mode. `ttdn` may carry a `TtdnInfo` already extracted from
+/// the unmutated tree; injection/projection reuse it instead of re-extracting.
+fn apply_mode(
+    syntax_tree: &mut File,
+    mode: &str,
+    ttdn: Option<&crate::ttdn::TtdnInfo>,
+    index: Option<usize>,
+    constraint_index: Option<usize>,
+    choice_index: Option<usize>,
+    pattern_index: Option<usize>,
+) -> Option<(bool, usize, usize, usize, usize)> {
+    let out = match mode {
+        // Structural
+        "add_trait" => {
+            let mut mutator = AddTraitMutator { force_pattern: pattern_index };
+            let (m, i, c) = mutator.run_with_meta(syntax_tree, index);
+            (m, i, c, 0, 0)
+        }
+        "add_impl" => {
+            let (m, i, c) = AddImplMutator.run_with_meta(syntax_tree, index);
+            (m, i, c, 0, 0)
+        }
+
+        // Injection
+        "constraint_injection" => match ttdn {
+            Some(info) => ConstraintInjectionMutator::run_with_meta_and_constraint_ttdn(
+                syntax_tree,
+                info,
+                index,
+                constraint_index,
+            ),
+            None => ConstraintInjectionMutator::run_with_meta_and_constraint(
+                syntax_tree,
+                index,
+                constraint_index,
+            ),
+        },
+        "projection_rewrite" => match ttdn {
+            Some(info) => ProjectionRewriteMutator::run_with_meta_and_choice_ttdn(
+                syntax_tree,
+                info,
+                index,
+                choice_index,
+            ),
+            None => ProjectionRewriteMutator::run_with_meta_and_choice(
+                syntax_tree,
+                index,
+                choice_index,
+            ),
+        },
+
+        // Lifetime
+        "lifetime_obfuscation" => {
+            let (m, i, c) = LifetimeMutator.run_with_meta(syntax_tree, index);
+            (m, i, c, 0, 0)
+        }
+        "lifetime_outlive" => {
+            let (m, i, c) = OutliveMutator.run_with_meta(syntax_tree, index);
+            (m, i, c, 0, 0)
+        }
+
+        _ => return None,
+    };
+    Some(out)
+}
+
+/// Generates up to `n` mutants of `mode` from one parsed tree (`--batch`, serve `mutate_batch`).
+///
+/// Indices are drawn without replacement from the mutator's index space: the global
+/// choice index for constraint_injection/projection_rewrite, the candidate index
+/// otherwise. Each mutant reports `site_index` and `choice_index` (the drawn index), so
+/// the caller can pass consumed indices back via `exclude` in a later batch.
+/// Returns None for an unknown mode.
+fn batch_payload(
+    syntax_tree: &File,
+    ttdn: &crate::ttdn::TtdnInfo,
+    mode: &str,
+    n: usize,
+    distinct: bool,
+    exclude: &[usize],
+    pattern_index: Option<usize>,
+) -> Option<serde_json::Value> {
+    let uses_choice = matches!(mode, "constraint_injection" | "projection_rewrite");
+
+    // Probe once on a scratch copy to learn the size of the index space.
+    let mut probe = syntax_tree.clone();
+    let (_, _, count, choice_count, _) = apply_mode(&mut probe, mode, Some(ttdn), None, None, None, pattern_index)?;
+    let space = if uses_choice { choice_count } else { count };
+
+    let excluded: HashSet<usize> = exclude.iter().copied().collect();
+    let mut order: Vec<usize> = (0..space).filter(|i| !excluded.contains(i)).collect();
+    order.shuffle(&mut rand::thread_rng());
+
+    let mut seen: HashSet<String> = HashSet::new();
+    let mut mutants = Vec::new();
+    let mut tried = 0usize;
+    for idx in order {
+        if mutants.len() >= n {
+            break;
+        }
+        tried += 1;
+        let mut tree = syntax_tree.clone();
+        let (mutated, site_index, _, _, _) = apply_mode(
+            &mut tree,
+            mode,
+            Some(ttdn),
+            if uses_choice { None } else { Some(idx) },
+            if mode == "constraint_injection" { Some(idx) } else { None },
+            if mode == "projection_rewrite" { Some(idx) } else { None },
+            pattern_index,
+        )?;
+        if !mutated {
+            continue;
+        }
+        let output = render_file(&tree);
+        if distinct && !seen.insert(output.clone()) {
+            continue;
+        }
+        mutants.push(serde_json::json!({
+            "site_index": site_index,
+            "choice_index": idx,
+            "output": output,
+        }));
+    }
+
+    Some(serde_json::json!({
+        "mode": mode,
+        "count": count,
+        "choice_count": choice_count,
+        "requested": n,
+        "tried": tried,
+        "mutants": mutants,
+    }))
+}
+
+/// JSON payload of `--mode ttdn_metrics` (also served by `--mode serve`).
+fn ttdn_metrics_payload(syntax_tree: &File, info: &crate::ttdn::TtdnInfo) -> serde_json::Value {
+    let c = crate::ttdn::ConstraintChoiceMetrics::from_file(syntax_tree);
+    let p = ProjectionRewriteMutator::projection_choice_metrics(syntax_tree);
+    serde_json::json!({
+        "constraint_sites": c.constraint_sites,
+        "constraint_choice_sum": c.constraint_choice_sum,
+        "lifetime_sites": c.lifetime_sites,
+        "rewrite_sites": p.rewrite_sites,
+        "rewrite_choice_sum": p.rewrite_choice_sum,
+        "traits": info.traits.len(),
+        "types": info.types.len(),
+        "impl_edges": info.impl_edges.len(),
+        "supertrait_edges": info.supertrait_edges.len(),
+        "trait_assoc_types": info.trait_assoc_types.len(),
+        "impl_assoc_bindings": info.impl_assoc_bindings.len(),
+    })
+}
+
+/// Pretty-print the tree, falling back to token-based output.
+///
+/// prettyplease can panic on newer/unsupported `syn` nodes (e.g. TypeParamBound::Verbatim).
+/// Don't let formatting crash the whole mutation tool.
+/// Note: even if we catch_unwind, the default panic hook prints to stderr; temporarily silence it.
+fn render_file(syntax_tree: &File) -> String {
+    let prev_hook = std::panic::take_hook();
+    std::panic::set_hook(Box::new(|_| {}));
+    let rendered = match std::panic::catch_unwind(std::panic::AssertUnwindSafe(|| {
+        prettyplease::unparse(syntax_tree)
+    })) {
+        Ok(s) => s,
+        Err(_) => {
+            eprintln!("prettyplease panicked; falling back to token-based output");
+            quote!(#syntax_tree).to_string()
+        }
+    };
+    std::panic::set_hook(prev_hook);
+    rendered
 }
 
 fn main() {
     let args = Args::parse();
-    
-    let content = fs::read_to_string(&args.input).expect("Failed to read input file");
+
+    // Long-lived mode: line-delimited JSON requests on stdin, one response per line on stdout.
+    if args.mode.as_str() == "serve" {
+        serve::run();
+        return;
+    }
+
+    // Corpus scoring: one JSON line per file on stdout, files scored in parallel.
+    if args.mode.as_str() == "ttdn_metrics_bulk" {
+        let input = args.input.clone().expect("--input is required for this mode");
+        bulk::run(&input, args.jobs);
+        return;
+    }
+
+    let input = args.input.clone().expect("--input is required for this mode");
+    let output = args.output.clone().expect("--output is required for this mode");
+
+    let content = fs::read_to_string(&input).expect("Failed to read input file");
     let mut syntax_tree: File = match parse_file(&content) {
         Ok(f) => f,
         Err(e) => {
@@ -59,32 +277,34 @@ fn main() {
             // but `syn` may not yet parse. Don't panic; let the driver skip.
             eprintln!("Parse failed: {}", e);
             eprintln!("No mutation performed.");
-            fs::write(&args.output, content).expect("Failed to write output file");
+            if args.batch.is_some() {
+                println!("{}", serde_json::json!({"parse_failed": true, "mutants": []}));
+            }
+            fs::write(&output, content).expect("Failed to write output file");
             return;
         }
     };
 
+    if let Some(n) = args.batch {
+        let info = crate::ttdn::TtdnInfo::from_file(&syntax_tree);
+        match batch_payload(&syntax_tree, &info, args.mode.as_str(), n, args.distinct, &args.exclude, args.pattern_index) {
+            Some(mut payload) => {
+                payload["parse_failed"] = serde_json::Value::Bool(false);
+                println!("{}", payload);
+            }
+            None => eprintln!("Unknown mode: {}", args.mode),
+        }
+        fs::write(&output, content).expect("Failed to write output file");
+        return;
+    }
+
     // Unified TTDN metrics mode: emit JSON for the Python driver (seed selection/stagnation).
     // Keeps the same CLI contract (input/output/mode) to avoid changing callers.
     if args.mode.as_str() == "ttdn_metrics" {
         let info = crate::ttdn::TtdnInfo::from_file(&syntax_tree);
-        let c = crate::ttdn::ConstraintChoiceMetrics::from_file(&syntax_tree);
-        let p = ProjectionRewriteMutator::projection_choice_metrics(&syntax_tree);
-        let payload = serde_json::json!({
-            "constraint_sites": c.constraint_sites,
-            "constraint_choice_sum": c.constraint_choice_sum,
-            "lifetime_sites": c.lifetime_sites,
-            "rewrite_sites": p.rewrite_sites,
-            "rewrite_choice_sum": p.rewrite_choice_sum,
-            "traits": info.traits.len(),
-            "types": info.types.len(),
-            "impl_edges": info.impl_edges.len(),
-            "supertrait_edges": info.supertrait_edges.len(),
-            "trait_assoc_types": info.trait_assoc_types.len(),
-            "impl_assoc_bindings": info.impl_assoc_bindings.len(),
-        });
+        let payload = ttdn_metrics_payload(&syntax_tree, &info);
         println!("{}", payload.to_string());
-        fs::write(&args.output, content).expect("Failed to write output file");
+        fs::write(&output, content).expect("Failed to write output file");
         return;
     }
 
@@ -110,14 +330,14 @@ fn main() {
                 .collect::<Vec<_>>(),
         });
         println!("{}", payload.to_string());
-        fs::write(&args.output, content).expect("Failed to write output file");
+        fs::write(&output, content).expect("Failed to write output file");
         return;
     }
 
     if args.mode.as_str() == "constraint_debug" {
         let sites = ConstraintInjectionMutator::collect_sites_with_candidates(&syntax_tree);
         println!("{}", serde_json::to_string(&sites).unwrap_or("[]".to_string()));
-        fs::write(&args.output, content).expect("Failed to write output file");
+        fs::write(&output, content).expect("Failed to write output file");
         return;
     }
 
@@ -131,7 +351,7 @@ fn main() {
             }
             println!();
         }
-        fs::write(&args.output, content).expect("Failed to write output file");
+        fs::write(&output, content).expect("Failed to write output file");
         return;
     }
 
@@ -145,45 +365,21 @@ fn main() {
             }
             println!();
         }
-        fs::write(&args.output, content).expect("Failed to write output file");
+        fs::write(&output, content).expect("Failed to write output file");
         return;
     }
 
-    let (mutated, chosen_index, candidate_count, constraint_count, chosen_constraint_index) = match args.mode.as_str() {
-        // Structural
-        "add_trait" => {
-            let mut mutator = AddTraitMutator { force_pattern: args.pattern_index };
-            let (m, i, c) = mutator.run_with_meta(&mut syntax_tree, args.index);
-            (m, i, c, 0, 0)
-        }
-        "add_impl" => {
-            let (m, i, c) = AddImplMutator.run_with_meta(&mut syntax_tree, args.index);
-            (m, i, c, 0, 0)
-        }
-        
-        // Injection
-        "constraint_injection" => ConstraintInjectionMutator::run_with_meta_and_constraint(
-            &mut syntax_tree,
-            args.index,
-            args.constraint_index,
-        ),
-        "projection_rewrite" => ProjectionRewriteMutator::run_with_meta_and_choice(
-            &mut syntax_tree,
-            args.index,
-            args.choice_index,
-        ),
-        
-        // Lifetime
-        "lifetime_obfuscation" => {
-            let (m, i, c) = LifetimeMutator.run_with_meta(&mut syntax_tree, args.index);
-            (m, i, c, 0, 0)
-        }
-        "lifetime_outlive" => {
-            let (m, i, c) = OutliveMutator.run_with_meta(&mut syntax_tree, args.index);
-            (m, i, c, 0, 0)
-        }
-        
-        _ => {
+    let (mutated, chosen_index, candidate_count, constraint_count, chosen_constraint_index) = match apply_mode(
+        &mut syntax_tree,
+        args.mode.as_str(),
+        None,
+        args.index,
+        args.constraint_index,
+        args.choice_index,
+        args.pattern_index,
+    ) {
+        Some(out) => out,
+        None => {
             eprintln!("Unknown mode: {}", args.mode);
             (false, 0, 0, 0, 0)
         }
@@ -228,20 +424,6 @@ fn main() {
         eprintln!("No mutation performed.");
     }
 
-    // prettyplease can panic on newer/unsupported `syn` nodes (e.g. TypeParamBound::Verbatim).
-    // Don't let formatting crash the whole mutation tool; fall back to token-based printing.
-    // Note: even if we catch_unwind, the default panic hook prints to stderr; temporarily silence it.
-    let prev_hook = std::panic::take_hook();
-    std::panic::set_hook(Box::new(|_| {}));
-    let mutated_content = match std::panic::catch_unwind(std::panic::AssertUnwindSafe(|| {
-        prettyplease::unparse(&syntax_tree)
-    })) {
-        Ok(s) => s,
-        Err(_) => {
-            eprintln!("prettyplease panicked; falling back to token-based output");
-            quote!(#syntax_tree).to_string()
-        }
-    };
-    std::panic::set_hook(prev_hook);
-    fs::write(&args.output, mutated_content).expect("Failed to write output file");
+    let mutated_content = render_file(&syntax_tree);
+    fs::write(&output, mutated_content).expect("Failed to write output file");
 }
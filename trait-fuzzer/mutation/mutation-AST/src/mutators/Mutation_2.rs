@@ -992,6 +992,18 @@ impl ConstraintInjectionMutator {
         ast: &mut syn::File,
         forced_index: Option<usize>,
         constraint_index: Option<usize>,
+    ) -> (bool, usize, usize, usize, usize) {
+        let ttdn = TtdnInfo::from_file(&*ast);
+        Self::run_with_meta_and_constraint_ttdn(ast, &ttdn, forced_index, constraint_index)
+    }
+
+    /// Same as `run_with_meta_and_constraint`, but reuses a `TtdnInfo` that was
+    /// already extracted from the unmutated `ast` (e.g. cached by `--mode serve`).
+    pub fn run_with_meta_and_constraint_ttdn(
+        ast: &mut syn::File,
+        ttdn: &TtdnInfo,
+        forced_index: Option<usize>,
+        constraint_index: Option<usize>,
     ) -> (bool, usize, usize, usize, usize) {
         let mut m = ConstraintInjectionMutator;
         let site_count = m.collect(ast);
@@ -999,12 +1011,11 @@ impl ConstraintInjectionMutator {
             return (false, 0, 0, 0, 0);
         }
 
-        let ttdn = TtdnInfo::from_file(&*ast);
         let a = ConstraintInjectionApplier {
             target: 0,
             current: 0,
             mutated: false,
-            ttdn,
+            ttdn: ttdn.clone(),
             constraint_index: None,
             constraint_count: 0,
             chosen_constraint_index: 0,
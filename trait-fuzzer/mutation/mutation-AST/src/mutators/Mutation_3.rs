@@ -419,9 +419,7 @@ impl ProjectionRewriteMutator {
         c.out
     }
 
-    fn collect_choice_entries(ast: &syn::File) -> Vec<RewriteChoiceEntry> {
-        let ttdn = TtdnInfo::from_file(ast);
-        let map = build_replacement_map(&ttdn);
+    fn collect_choice_entries(ast: &syn::File, map: HashMap<String, Vec<ProjectionCandidate>>) -> Vec<RewriteChoiceEntry> {
         if map.is_empty() {
             return Vec::new();
         }
@@ -511,13 +509,37 @@ impl ProjectionRewriteMutator {
         forced_index: Option<usize>,
         choice_index: Option<usize>,
     ) -> (bool, usize, usize, usize, usize) {
-        let mut m = ProjectionRewriteMutator;
-        let site_count = m.collect(ast);
+        let ttdn = TtdnInfo::from_file(&*ast);
+        Self::run_with_meta_and_choice_ttdn(ast, &ttdn, forced_index, choice_index)
+    }
+
+    /// Same as `run_with_meta_and_choice`, but reuses a `TtdnInfo` that was
+    /// already extracted from the unmutated `ast` (e.g. cached by `--mode serve`).
+    /// The replacement map is built once and shared by the collect/choice/apply steps.
+    pub fn run_with_meta_and_choice_ttdn(
+        ast: &mut syn::File,
+        ttdn: &TtdnInfo,
+        forced_index: Option<usize>,
+        choice_index: Option<usize>,
+    ) -> (bool, usize, usize, usize, usize) {
+        let map = build_replacement_map(ttdn);
+        if map.is_empty() {
+            return (false, 0, 0, 0, 0);
+        }
+        let mut c = ProjectionRewriteCollector {
+            count: 0,
+            map: map.clone(),
+            current_impl_self: None,
+            current_impl_trait: None,
+            current_impl_assoc: None,
+        };
+        c.visit_file(ast);
+        let site_count = c.count;
         if site_count == 0 {
             return (false, 0, 0, 0, 0);
         }
 
-        let flat = Self::collect_choice_entries(ast);
+        let flat = Self::collect_choice_entries(ast, map.clone());
         let choice_count = flat.len();
         if choice_count == 0 {
             return (false, 0, site_count, 0, 0);
@@ -532,12 +554,6 @@ impl ProjectionRewriteMutator {
         };
 
         let entry = flat[idx];
-        let ttdn = TtdnInfo::from_file(&*ast);
-        let map = build_replacement_map(&ttdn);
-        if map.is_empty() {
-            return (false, entry.site_index, site_count, choice_count, idx);
-        }
-
         let mut a = ProjectionRewriteApplier {
             target: entry.site_index,
             current: 0,
@@ -0,0 +1,266 @@
+// =========================================================================
+// SERVE MODE (`--mode serve`)
+// =========================================================================
+// Long-lived mutation server for the Python driver. Instead of one process
+// (and one `syn::parse_file`) per mutant, the driver keeps one server per
+// worker and talks line-delimited JSON over stdin/stdout.
+//
+// Request (one JSON object per line):
+//   {"id": 1, "op": "mutate", "input": "/abs/seed.rs", "mode": "constraint_injection",
+//    "index": null, "constraint_index": 3, "choice_index": null, "pattern_index": null}
+//   {"id": 2, "op": "ttdn_metrics", "input": "/abs/file.rs"}      // or "source": "<text>"
+//   {"id": 4, "op": "mutate_batch", "input": "/abs/seed.rs", "mode": "constraint_injection",
+//    "batch": 15, "distinct": true, "exclude": [3, 7]}
+//   {"id": 3, "op": "stats"} / {"op": "ping"} / {"op": "shutdown"}
+//
+// Response (one JSON object per line, `id` echoed back):
+//   {"id": 1, "ok": true, "parse_failed": false, "mutated": true, "count": 4, "index": 1,
+//    "choice_count": 17, "choice_index": 3, "output": "<mutated source>"}
+//   {"id": 2, "ok": true, "parse_failed": false, "metrics": {...ttdn_metrics payload...}}
+//   {"id": 4, "ok": true, "parse_failed": false, "count": 4, "choice_count": 17, "tried": 15,
+//    "mutants": [{"site_index": 1, "choice_index": 3, "output": "<source>"}, ...]}
+//   {"id": 9, "ok": false, "error": "..."}
+//
+// Parsed trees and their `TtdnInfo` are cached per seed content hash, so N
+// mutations of the same seed cost one parse + one TTDN extraction.
+use std::collections::hash_map::DefaultHasher;
+use std::collections::{HashMap, VecDeque};
+use std::fs;
+use std::hash::{Hash, Hasher};
+use std::io::{self, BufRead, Write};
+
+use serde::Deserialize;
+use serde_json::{json, Value};
+use syn::{parse_file, File};
+
+use crate::ttdn::TtdnInfo;
+
+/// Number of distinct seed contents kept parsed in memory (oldest evicted first).
+const MAX_CACHED_SEEDS: usize = 64;
+
+#[derive(Debug, Deserialize)]
+struct Request {
+    #[serde(default)]
+    id: Option<Value>,
+    op: String,
+    #[serde(default)]
+    input: Option<String>,
+    #[serde(default)]
+    source: Option<String>,
+    #[serde(default)]
+    mode: Option<String>,
+    #[serde(default)]
+    index: Option<usize>,
+    #[serde(default)]
+    constraint_index: Option<usize>,
+    #[serde(default)]
+    choice_index: Option<usize>,
+    #[serde(default)]
+    pattern_index: Option<usize>,
+    #[serde(default)]
+    batch: Option<usize>,
+    #[serde(default)]
+    distinct: bool,
+    #[serde(default)]
+    exclude: Vec<usize>,
+}
+
+struct CachedSeed {
+    /// None if `syn` could not parse the content.
+    tree: Option<File>,
+    parse_error: String,
+    ttdn: TtdnInfo,
+    metrics: Option<Value>,
+}
+
+#[derive(Default)]
+struct SeedCache {
+    entries: HashMap<String, CachedSeed>,
+    order: VecDeque<String>,
+    hits: u64,
+    misses: u64,
+}
+
+fn seed_key(content: &str) -> String {
+    let mut h = DefaultHasher::new();
+    content.hash(&mut h);
+    format!("{:016x}:{}", h.finish(), content.len())
+}
+
+impl SeedCache {
+    fn lookup(&mut self, content: &str) -> &mut CachedSeed {
+        let key = seed_key(content);
+        if self.entries.contains_key(&key) {
+            self.hits += 1;
+            if let Some(pos) = self.order.iter().position(|k| k == &key) {
+                self.order.remove(pos);
+            }
+        } else {
+            self.misses += 1;
+            let seed = match parse_file(content) {
+                Ok(tree) => {
+                    let ttdn = TtdnInfo::from_file(&tree);
+                    CachedSeed { tree: Some(tree), parse_error: String::new(), ttdn, metrics: None }
+                }
+                Err(e) => CachedSeed {
+                    tree: None,
+                    parse_error: e.to_string(),
+                    ttdn: TtdnInfo::default(),
+                    metrics: None,
+                },
+            };
+            self.entries.insert(key.clone(), seed);
+            while self.order.len() >= MAX_CACHED_SEEDS {
+                if let Some(old) = self.order.pop_front() {
+                    self.entries.remove(&old);
+                }
+            }
+        }
+        self.order.push_back(key.clone());
+        self.entries.get_mut(&key).expect("seed cache entry just inserted")
+    }
+}
+
+fn load_content(req: &Request) -> Result<String, String> {
+    if let Some(src) = &req.source {
+        return Ok(src.clone());
+    }
+    match &req.input {
+        Some(path) => fs::read_to_string(path).map_err(|e| format!("Failed to read input file {}: {}", path, e)),
+        None => Err("request needs `input` or `source`".to_string()),
+    }
+}
+
+fn handle(cache: &mut SeedCache, req: &Request) -> Value {
+    match req.op.as_str() {
+        "ping" | "shutdown" => json!({"ok": true}),
+        "stats" => json!({
+            "ok": true,
+            "cached": cache.entries.len(),
+            "hits": cache.hits,
+            "misses": cache.misses,
+        }),
+        "ttdn_metrics" => {
+            let content = match load_content(req) {
+                Ok(c) => c,
+                Err(e) => return json!({"ok": false, "error": e}),
+            };
+            let seed = cache.lookup(&content);
+            let tree = match &seed.tree {
+                Some(t) => t,
+                None => return json!({"ok": true, "parse_failed": true, "error": seed.parse_error}),
+            };
+            if seed.metrics.is_none() {
+                seed.metrics = Some(crate::ttdn_metrics_payload(tree, &seed.ttdn));
+            }
+            json!({"ok": true, "parse_failed": false, "metrics": seed.metrics})
+        }
+        "mutate" => {
+            let mode = match &req.mode {
+                Some(m) => m.as_str(),
+                None => return json!({"ok": false, "error": "mutate request needs `mode`"}),
+            };
+            let content = match load_content(req) {
+                Ok(c) => c,
+                Err(e) => return json!({"ok": false, "error": e}),
+            };
+            let seed = cache.lookup(&content);
+            let mut tree = match &seed.tree {
+                Some(t) => t.clone(),
+                None => return json!({"ok": true, "parse_failed": true, "mutated": false, "error": seed.parse_error}),
+            };
+            let applied = crate::apply_mode(
+                &mut tree,
+                mode,
+                Some(&seed.ttdn),
+                req.index,
+                req.constraint_index,
+                req.choice_index,
+                req.pattern_index,
+            );
+            match applied {
+                None => json!({"ok": false, "error": format!("Unknown mode: {}", mode)}),
+                Some((mutated, index, count, choice_count, choice_index)) => {
+                    let output = if mutated { Some(crate::render_file(&tree)) } else { None };
+                    json!({
+                        "ok": true,
+                        "parse_failed": false,
+                        "mutated": mutated,
+                        "count": count,
+                        "index": index,
+                        "choice_count": choice_count,
+                        "choice_index": choice_index,
+                        "output": output,
+                    })
+                }
+            }
+        }
+        "mutate_batch" => {
+            let mode = match &req.mode {
+                Some(m) => m.as_str(),
+                None => return json!({"ok": false, "error": "mutate_batch request needs `mode`"}),
+            };
+            let content = match load_content(req) {
+                Ok(c) => c,
+                Err(e) => return json!({"ok": false, "error": e}),
+            };
+            let seed = cache.lookup(&content);
+            let tree = match &seed.tree {
+                Some(t) => t,
+                None => return json!({"ok": true, "parse_failed": true, "mutants": [], "error": seed.parse_error}),
+            };
+            let n = req.batch.unwrap_or(1);
+            match crate::batch_payload(tree, &seed.ttdn, mode, n, req.distinct, &req.exclude, req.pattern_index) {
+                None => json!({"ok": false, "error": format!("Unknown mode: {}", mode)}),
+                Some(mut payload) => {
+                    payload["ok"] = Value::Bool(true);
+                    payload["parse_failed"] = Value::Bool(false);
+                    payload
+                }
+            }
+        }
+        other => json!({"ok": false, "error": format!("Unknown op: {}", other)}),
+    }
+}
+
+pub fn run() {
+    // A panicking mutator must not take the whole server down; the request gets an
+    // error response instead. Silence the default hook so stderr stays quiet.
+    std::panic::set_hook(Box::new(|_| {}));
+
+    let mut cache = SeedCache::default();
+    let stdin = io::stdin();
+    let stdout = io::stdout();
+    for line in stdin.lock().lines() {
+        let line = match line {
+            Ok(l) => l,
+            Err(_) => break,
+        };
+        if line.trim().is_empty() {
+            continue;
+        }
+
+        let (id, resp, shutdown) = match serde_json::from_str::<Request>(&line) {
+            Ok(req) => {
+                let resp = match std::panic::catch_unwind(std::panic::AssertUnwindSafe(|| handle(&mut cache, &req))) {
+                    Ok(v) => v,
+                    Err(_) => json!({"ok": false, "error": "mutator panicked"}),
+                };
+                (req.id.clone(), resp, req.op == "shutdown")
+            }
+            Err(e) => (None, json!({"ok": false, "error": format!("Bad request: {}", e)}), false),
+        };
+        let mut resp = resp;
+        if let Some(obj) = resp.as_object_mut() {
+            obj.insert("id".to_string(), id.unwrap_or(Value::Null));
+        }
+
+        let mut out = stdout.lock();
+        if writeln!(out, "{}", resp).is_err() || out.flush().is_err() {
+            break;
+        }
+        if shutdown {
+            break;
+        }
+    }
+}
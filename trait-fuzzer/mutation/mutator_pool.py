@@ -1,7 +1,194 @@
+import json
+import math
+import os
 import random
-from typing import Dict
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
 import logging
 
+try:
+    import fcntl
+except ImportError:  # non-POSIX: state file is written without a lock
+    fcntl = None
+
+
+# Leaf strategies the adaptive scheduler chooses between. The last two are
+# MutationⅠ (structural) ops, which chain a new base seed and stay at the end of a round.
+LEAF_STRATEGIES = [
+    "constraint_injection",
+    "projection_rewrite",
+    "lifetime_obfuscation",
+    "lifetime_outlive",
+    "add_trait",
+    "add_impl",
+]
+
+DEFAULT_BANDIT_REWARDS = {
+    "new_crash": 1.0,
+    "new_coverage": 0.5,
+    "promoted": 0.2,
+}
+
+
+class StrategyBandit:
+    """Thompson sampling / EXP3 over leaf strategies, rewards per compile-second.
+
+    Each pull reports a reward in [0, 1] (new crash location, new coverage,
+    promoted SUCCESS, weighted by `rewards`) and its wall-clock cost.
+
+    - thompson: Beta(alpha, beta) per arm, alpha += r, beta += 1 - r; an arm's
+      score is a posterior draw divided by its mean cost.
+    - exp3: exponential weights over cost-normalized rewards (reward scaled by
+      mean cost across arms / this pull's cost, clipped to 1).
+
+    Statistics persist in a JSON file shared by all workers: each save merges
+    this process's increments into the file under an exclusive lock.
+    """
+
+    SAVE_EVERY = 50
+
+    def __init__(
+        self,
+        arms: List[str],
+        algorithm: str = "thompson",
+        state_path: Optional[Path] = None,
+        rewards: Optional[Dict[str, float]] = None,
+        exp3_gamma: float = 0.1,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.arms = list(arms)
+        self.algorithm = algorithm if algorithm in ("thompson", "exp3") else "thompson"
+        self.state_path = Path(state_path) if state_path else None
+        self.rewards = dict(DEFAULT_BANDIT_REWARDS)
+        self.rewards.update(rewards or {})
+        self.exp3_gamma = min(1.0, max(1e-3, float(exp3_gamma)))
+
+        # Persisted totals (as last read from disk) and this process's unsaved deltas.
+        self._base: Dict[str, Dict[str, float]] = {}
+        self._delta: Dict[str, Dict[str, float]] = {}
+        self._updates_since_save = 0
+        self.load()
+
+    @staticmethod
+    def _empty() -> Dict[str, float]:
+        # reward: sum of rewards, pulls, cost: total seconds, log_w: EXP3 log-weight
+        return {"reward": 0.0, "pulls": 0.0, "cost": 0.0, "log_w": 0.0}
+
+    def _stat(self, arm: str) -> Dict[str, float]:
+        base = self._base.get(arm, {})
+        delta = self._delta.get(arm, {})
+        out = self._empty()
+        for k in out:
+            out[k] = float(base.get(k, 0.0)) + float(delta.get(k, 0.0))
+        return out
+
+    def _mean_cost(self, arm: str) -> float:
+        st = self._stat(arm)
+        return (st["cost"] / st["pulls"]) if st["pulls"] > 0 else 1.0
+
+    def _probabilities(self, arms: List[str]) -> Dict[str, float]:
+        log_w = [self._stat(a)["log_w"] for a in arms]
+        top = max(log_w)
+        w = [math.exp(x - top) for x in log_w]
+        total = sum(w)
+        k = len(arms)
+        return {a: (1 - self.exp3_gamma) * wi / total + self.exp3_gamma / k for a, wi in zip(arms, w)}
+
+    def choose(self, arms: List[str]) -> str:
+        arms = [a for a in arms if a in self.arms] or list(arms)
+        if self.algorithm == "exp3":
+            probs = self._probabilities(arms)
+            return random.choices(arms, weights=[probs[a] for a in arms], k=1)[0]
+        best, best_score = arms[0], -1.0
+        for a in arms:
+            st = self._stat(a)
+            theta = random.betavariate(1.0 + st["reward"], 1.0 + max(0.0, st["pulls"] - st["reward"]))
+            score = theta / max(1e-3, self._mean_cost(a))
+            if score > best_score:
+                best, best_score = a, score
+        return best
+
+    def reward_for(self, feedback: Dict) -> float:
+        r = 0.0
+        for key, weight in self.rewards.items():
+            if feedback.get(key):
+                r += float(weight)
+        return min(1.0, max(0.0, r))
+
+    def update(self, arm: str, reward: float, cost_sec: float):
+        if arm not in self.arms:
+            return
+        d = self._delta.setdefault(arm, self._empty())
+        cost_sec = max(1e-3, float(cost_sec))
+        if self.algorithm == "exp3":
+            eligible = self.arms
+            probs = self._probabilities(eligible)
+            ref_cost = sum(self._mean_cost(a) for a in eligible) / len(eligible)
+            x = min(1.0, reward * ref_cost / cost_sec)
+            d["log_w"] += self.exp3_gamma * (x / probs[arm]) / len(eligible)
+        d["reward"] += reward
+        d["pulls"] += 1
+        d["cost"] += cost_sec
+        self._updates_since_save += 1
+        if self._updates_since_save >= self.SAVE_EVERY:
+            self.save()
+
+    def load(self):
+        if self.state_path is None or not self.state_path.exists():
+            return
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8") or "{}")
+            arms = data.get(self.algorithm, {})
+            if isinstance(arms, dict):
+                self._base = {a: dict(v) for a, v in arms.items() if isinstance(v, dict)}
+        except Exception as e:
+            self.logger.warning("Failed to load bandit state %s: %s", self.state_path, e)
+
+    def save(self):
+        """Merge unsaved increments into the shared state file."""
+        self._updates_since_save = 0
+        if self.state_path is None or not self._delta:
+            return
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_path, "a+", encoding="utf-8") as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    data = json.loads(f.read() or "{}")
+                except ValueError:
+                    data = {}
+                arms = data.setdefault(self.algorithm, {})
+                for arm, delta in self._delta.items():
+                    cur = arms.setdefault(arm, self._empty())
+                    for k, v in delta.items():
+                        cur[k] = float(cur.get(k, 0.0)) + float(v)
+                data["updated"] = time.time()
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(data, indent=2, sort_keys=True))
+                f.flush()
+                os.fsync(f.fileno())
+            self._base = {a: dict(v) for a, v in arms.items()}
+            self._delta = {}
+        except Exception as e:
+            self.logger.warning("Failed to save bandit state %s: %s", self.state_path, e)
+
+    def summary(self) -> str:
+        parts = []
+        for a in self.arms:
+            st = self._stat(a)
+            if st["pulls"] <= 0:
+                continue
+            parts.append(
+                f"{a}: pulls={int(st['pulls'])} reward={st['reward']:.1f} "
+                f"cost={self._mean_cost(a):.2f}s/pull rate={st['reward'] / max(1e-3, st['cost']) * 3600:.2f}/h"
+            )
+        return f"bandit[{self.algorithm}] " + ("; ".join(parts) if parts else "no pulls yet")
+
+
 class MutatorPool:
     def __init__(self, config: Dict):
         self.logger = logging.getLogger(__name__)
@@ -27,13 +214,31 @@ class MutatorPool:
             default_structural_subweights,
         )
 
+        # Adaptive scheduler over leaf strategies ("static" keeps the fixed per-round counts).
+        scheduler = str(fuzzer_cfg.get("strategy_scheduler", "static")).strip().lower()
+        self.bandit: Optional[StrategyBandit] = None
+        if scheduler in ("thompson", "exp3"):
+            state_path = fuzzer_cfg.get(
+                "strategy_scheduler_state",
+                str(Path(config.get("paths", {}).get("logs", "logs")) / "strategy_bandit.json"),
+            )
+            self.bandit = StrategyBandit(
+                LEAF_STRATEGIES,
+                algorithm=scheduler,
+                state_path=Path(state_path) if state_path else None,
+                rewards=fuzzer_cfg.get("strategy_scheduler_rewards"),
+                exp3_gamma=float(fuzzer_cfg.get("strategy_scheduler_exp3_gamma", 0.1)),
+            )
+        elif scheduler != "static":
+            self.logger.warning("Unknown strategy_scheduler %r; using static", scheduler)
+
     def select_strategy(self) -> str:
         """
         Selects a mutation strategy based on configured weights.
         """
         # Top level selection
         strategy = random.choices(self.strategies, weights=self.probs, k=1)[0]
-        
+
         # Sub-selection for AST
         if strategy == "ast_structural":
             weights = [float(self.structural_subweights.get(op, 0.0)) for op in self.structural_ops]
@@ -43,12 +248,62 @@ class MutatorPool:
             return random.choices(self.structural_ops, weights=weights, k=1)[0]
         if strategy == "ast_injection":
             return "constraint_injection"
-            
+
         return strategy
 
+    def plan_round(self, leaf_budget: Dict[str, int], structural_slots: int) -> List[str]:
+        """Strategies for one round: non-structural slots first, structural ops last.
+
+        `leaf_budget` is the static per-round count of each non-structural strategy;
+        with a bandit the total number of slots is kept but redistributed across
+        the enabled (count > 0) strategies. Structural slots draw from the
+        structural ops (bandit or `structural_subweights`).
+        """
+        planned: List[str] = []
+        enabled = [s for s, n in leaf_budget.items() if n > 0]
+        if self.bandit is None:
+            for s in enabled:
+                planned.extend([s] * int(leaf_budget[s]))
+        elif enabled:
+            picks = [self.bandit.choose(enabled) for _ in range(sum(int(leaf_budget[s]) for s in enabled))]
+            # Keep strategies grouped (one mutation-ast batch each) in the usual order.
+            planned.extend(sorted(picks, key=enabled.index))
+
+        for _ in range(max(0, int(structural_slots))):
+            op = self._pick_structural_op()
+            if op is not None:
+                planned.append(op)
+        return planned
+
+    def _pick_structural_op(self) -> Optional[str]:
+        ops = list(self.structural_ops)
+        if not ops:
+            return None
+        if self.bandit is not None:
+            return self.bandit.choose(ops)
+        weights = [float(self.structural_subweights.get(op, 0.0)) for op in ops]
+        if not any(w > 0 for w in weights):
+            weights = [1.0] * len(ops)
+        return random.choices(ops, weights=weights, k=1)[0]
+
     def update_weights(self, feedback: Dict):
         """
-        Dynamic weight adjustment based on feedback (e.g., success rate, complexity gain).
-        TODO: Implement Multi-Armed Bandit or similar adaptive logic.
+        Dynamic weight adjustment based on feedback for one classified variant.
+
+        feedback: {"strategy": str, "cost_sec": float, "new_crash": bool,
+                   "new_coverage": bool, "promoted": bool}
+        No-op with the static scheduler.
         """
-        pass
+        if self.bandit is None:
+            return
+        strategy = feedback.get("strategy")
+        if not strategy:
+            return
+        self.bandit.update(strategy, self.bandit.reward_for(feedback), float(feedback.get("cost_sec", 0.0)))
+
+    def save_state(self):
+        if self.bandit is not None:
+            self.bandit.save()
+
+    def summary(self) -> str:
+        return self.bandit.summary() if self.bandit is not None else ""
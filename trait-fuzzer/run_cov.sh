@@ -159,6 +159,11 @@ if [[ -n "$CLEAN_FLAG" ]]; then
   CMD+=("$CLEAN_FLAG")
 fi
 
+# COV_JOBS=N: 分片到 N 个进程并行跑，最后树形合并 profdata
+if [[ -n "${COV_JOBS:-}" ]]; then
+  CMD+=(--jobs "$COV_JOBS")
+fi
+
 case "$RUN_STYLE" in
   --bg|bg|"")
     RUN_STYLE="--bg"
@@ -0,0 +1,74 @@
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Micro-benchmark: per-variant driver overhead of the compile oracle.
+#   before: fresh ThreadPoolExecutor + fresh RustCompiler objects per variant
+#   after : one CompilerMatrix (pre-built compilers, long-lived executor) per worker
+# By default the "compiler" is `true`, so the numbers are pure driver overhead
+# (process spawn + tempdir + thread/object setup). Pass --rustc to time real compiles.
+
+script_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, str(script_dir.parent))
+
+from utils.compiler import RustCompiler, CompilerMatrix  # noqa: E402
+
+MODES = ("stable", "nightly", "next", "gccrs")
+
+
+def _before(src: Path, cmd, workers: int):
+    def _compile_with(rustc_cmd, extra_args=None):
+        comp = RustCompiler(timeout=15, rustc_cmd=rustc_cmd)
+        return comp.compile(src, extra_args=extra_args)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {m: ex.submit(_compile_with, cmd, None) for m in MODES}
+        return {m: f.result() for m, f in futures.items()}
+
+
+def _run(label: str, fn, n: int):
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    print(
+        f"{label:<8} n={n} mean={statistics.mean(samples):.2f}ms "
+        f"median={statistics.median(samples):.2f}ms p90={sorted(samples)[int(0.9 * (n - 1))]:.2f}ms"
+    )
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-variant compile overhead: per-variant pool vs CompilerMatrix.")
+    parser.add_argument("-n", type=int, default=200, help="Variants per measurement")
+    parser.add_argument("--workers", type=int, default=3, help="parallel_workers")
+    parser.add_argument("--rustc", default=None, help="Real compiler command (default: `true`)")
+    args = parser.parse_args()
+
+    cmd = args.rustc.split() if args.rustc else ["true"]
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "bench.rs"
+        src.write_text("fn main() {}\n", encoding="utf-8")
+
+        matrix = CompilerMatrix(parallel=True, max_workers=args.workers)
+        for m in MODES:
+            matrix.add_mode(m, RustCompiler(timeout=15, rustc_cmd=cmd))
+
+        # Warm up both paths (first fork, imports, page cache).
+        _before(src, cmd, args.workers)
+        matrix.compile_all(src)
+
+        before = _run("before", lambda: _before(src, cmd, args.workers), args.n)
+        after = _run("after", lambda: matrix.compile_all(src), args.n)
+        matrix.close()
+
+    print(f"per-variant overhead saved: {before - after:.2f}ms ({(1 - after / before) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Throughput of each compile tier over a corpus of .rs files:
+#   full  : plain rustc (codegen into a temp --out-dir), the pre-tiering behaviour
+#   check : `--emit=metadata` (stable) / `-Zno-codegen` (nightly), type-check only
+#   tiered: check first, escalate to full for `--sample-rate` of the passing files
+
+script_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, str(script_dir.parent))
+
+from utils.compiler import RustCompiler, CompilerMatrix, CompilationStatus  # noqa: E402
+
+
+def _bench(label: str, matrix: CompilerMatrix, files):
+    statuses = {}
+    t0 = time.perf_counter()
+    for f in files:
+        r = matrix.compile("stable", f)
+        statuses[r.status.name] = statuses.get(r.status.name, 0) + 1
+    elapsed = time.perf_counter() - t0
+    tiers = ", ".join(f"{t}={st['compiles']}" for t, st in sorted(matrix.tier_stats().items()))
+    print(
+        f"{label:<7} files={len(files)} {len(files) / elapsed:.2f} files/s "
+        f"({elapsed:.1f}s) tiers[{tiers}] statuses={statuses}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile throughput per tier (full / check / tiered).")
+    parser.add_argument("corpus", type=Path, help="Directory of .rs files")
+    parser.add_argument("--limit", type=int, default=50, help="Max files to compile")
+    parser.add_argument("--rustc", default="rustc", help="Compiler command")
+    parser.add_argument("--check-arg", default="--emit=metadata", help="Check-tier flag (-Zno-codegen on nightly)")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="Escalation fraction for the tiered run")
+    parser.add_argument("--timeout", type=int, default=15)
+    args = parser.parse_args()
+
+    files = sorted(args.corpus.glob("*.rs"))[: args.limit]
+    if not files:
+        print(f"No .rs files under {args.corpus}")
+        sys.exit(1)
+
+    cmd = args.rustc.split()
+    runs = (
+        ("full", dict(tiered=False)),
+        ("check", dict(tiered=True, codegen_sample_rate=0.0)),
+        ("tiered", dict(tiered=True, codegen_sample_rate=args.sample_rate)),
+    )
+    for label, kwargs in runs:
+        matrix = CompilerMatrix(**kwargs)
+        matrix.add_mode("stable", RustCompiler(timeout=args.timeout, rustc_cmd=cmd), check_args=[args.check_arg])
+        _bench(label, matrix, files)
+
+    # Verdict agreement between check-only and full on this corpus.
+    full = CompilerMatrix(tiered=False)
+    full.add_mode("stable", RustCompiler(timeout=args.timeout, rustc_cmd=cmd))
+    check = CompilerMatrix(tiered=True)
+    check.add_mode("stable", RustCompiler(timeout=args.timeout, rustc_cmd=cmd), check_args=[args.check_arg])
+    disagree = [
+        f.name
+        for f in files
+        if (full.compile("stable", f).status == CompilationStatus.SUCCESS)
+        != (check.compile("stable", f).status == CompilationStatus.SUCCESS)
+    ]
+    print(f"check vs full SUCCESS disagreements: {len(disagree)}/{len(files)} {disagree[:10]}")
+
+
+if __name__ == "__main__":
+    main()
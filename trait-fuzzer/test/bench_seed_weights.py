@@ -0,0 +1,94 @@
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+# Seed-selection cost per operation at growing pool sizes:
+#   list   : the pre-Fenwick SeedSelector path (rebuild the eligible list and
+#            every weight on each pick, `in`/`remove` over a Python list)
+#   fenwick: WeightedSampler (O(log n) pick / reweight / insert / remove)
+
+script_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, str(script_dir.parent))
+
+from utils.seed_weights import WeightedSampler  # noqa: E402
+
+
+def _weight(score: float, picks: int) -> float:
+    # Same shape as SeedSelector._weight_for_seed (temperature 2, decay beta 1).
+    return max(1.0, math.pow(max(1.0, score), 0.5) / (1.0 + picks))
+
+
+def _bench_list(n: int, picks: int, churn: int):
+    seeds = [f"seed{i}.rs" for i in range(n)]
+    scores = {s: random.randint(1, 500) for s in seeds}
+    counts = {}
+
+    t0 = time.perf_counter()
+    for _ in range(picks):
+        eligible = [s for s in seeds if counts.get(s, 0) < 1_000_000]
+        weights = [_weight(scores[s], counts.get(s, 0)) for s in eligible]
+        picked = random.choices(eligible, weights=weights, k=1)[0]
+        counts[picked] = counts.get(picked, 0) + 1
+    pick_us = (time.perf_counter() - t0) / picks * 1e6
+
+    t0 = time.perf_counter()
+    for i in range(churn):
+        s = f"new{i}.rs"
+        if s not in seeds:
+            seeds.append(s)
+            scores[s] = 10
+    for i in range(churn):
+        seeds.remove(f"new{i}.rs")
+    churn_us = (time.perf_counter() - t0) / (2 * churn) * 1e6
+    return pick_us, churn_us
+
+
+def _bench_fenwick(n: int, picks: int, churn: int):
+    seeds = [f"seed{i}.rs" for i in range(n)]
+    scores = {s: random.randint(1, 500) for s in seeds}
+    counts = {}
+
+    t0 = time.perf_counter()
+    sampler = WeightedSampler()
+    sampler.add_many((s, _weight(scores[s], 0)) for s in seeds)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(picks):
+        picked = sampler.sample()
+        counts[picked] = counts.get(picked, 0) + 1
+        sampler.set_weight(picked, _weight(scores[picked], counts[picked]))
+    pick_us = (time.perf_counter() - t0) / picks * 1e6
+
+    t0 = time.perf_counter()
+    for i in range(churn):
+        sampler.add(f"new{i}.rs", _weight(10, 0))
+    for i in range(churn):
+        sampler.remove(f"new{i}.rs")
+    churn_us = (time.perf_counter() - t0) / (2 * churn) * 1e6
+    return build_s, pick_us, churn_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed selection cost: list rebuild vs Fenwick tree.")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated pool sizes")
+    parser.add_argument("--picks", type=int, default=2000, help="Picks per size (Fenwick)")
+    parser.add_argument("--list-picks", type=int, default=20, help="Picks per size (list baseline)")
+    parser.add_argument("--churn", type=int, default=200, help="Inserts (then removes) per size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(f"{'seeds':>9} {'impl':>8} {'build s':>8} {'pick+reweight us':>17} {'insert/remove us':>17}")
+    for n in (int(x) for x in args.sizes.split(",") if x.strip()):
+        pick_us, churn_us = _bench_list(n, args.list_picks, args.churn)
+        print(f"{n:>9} {'list':>8} {'-':>8} {pick_us:>17.1f} {churn_us:>17.1f}")
+        build_s, pick_us, churn_us = _bench_fenwick(n, args.picks, args.churn)
+        print(f"{n:>9} {'fenwick':>8} {build_s:>8.2f} {pick_us:>17.1f} {churn_us:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class BugLocationIndex:
+    """Shared crash-dedup index: one row per (compiler namespace, bug location).
+
+    SQLite in WAL mode under the results root, shared by every worker.
+    `check_and_insert` is one IMMEDIATE transaction, so two workers hitting
+    the same new location concurrently get exactly one "new". Each row keeps
+    a hit counter, first/last-seen timestamps and the first case that hit it.
+
+    The legacy `<ns>/crash/.bug_locations.txt` is imported once per namespace.
+    Its entries and rows written before crash signatures are `file:line` keys,
+    while current keys are stack-signature buckets (`site | frame | frame [query]`).
+    Callers pass the old-format key as an alias so those crashes stay `dup`;
+    aliases only match rows flagged `legacy` (imported, or present when the
+    flag was introduced), never rows keyed by signature, so a bare panic site
+    cannot swallow later crashes at that site with a different stack.
+    Running `signature.py rebucket <results> --reindex` once after upgrading
+    rebuilds the index in the new format.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._imported_ns = set()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS locations ("
+            " ns TEXT NOT NULL,"
+            " location TEXT NOT NULL,"
+            " hits INTEGER NOT NULL,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " first_case TEXT NOT NULL,"
+            " legacy INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (ns, location))"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(locations)")}
+        if "legacy" not in columns:
+            # Indexes from before crash signatures: every existing row is a file:line key.
+            conn.execute("ALTER TABLE locations ADD COLUMN legacy INTEGER NOT NULL DEFAULT 1")
+        conn.execute("CREATE TABLE IF NOT EXISTS imported (ns TEXT PRIMARY KEY, imported REAL NOT NULL)")
+
+    @classmethod
+    def for_results(cls, results_root: Path) -> "BugLocationIndex":
+        return cls(Path(results_root) / ".bug_locations.sqlite3")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def import_legacy(self, ns: str, index_file: Path):
+        """Seed `ns` from an old one-location-per-line file (first call per namespace only)."""
+        if ns in self._imported_ns:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM imported WHERE ns = ?", (ns,)).fetchone() is None:
+                now = time.time()
+                if index_file.exists():
+                    lines = index_file.read_text(encoding="utf-8", errors="ignore").splitlines()
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO locations"
+                        " (ns, location, hits, first_seen, last_seen, first_case, legacy)"
+                        " VALUES (?, ?, 1, ?, ?, '', 1)",
+                        [(ns, ln.strip(), now, now) for ln in lines if ln.strip()],
+                    )
+                conn.execute("INSERT INTO imported (ns, imported) VALUES (?, ?)", (ns, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._imported_ns.add(ns)
+
+    def check_and_insert(
+        self,
+        ns: str,
+        location: str,
+        case_id: str = "",
+        aliases: Sequence[str] = (),
+    ) -> Tuple[bool, int]:
+        """Record one hit of `location`; returns (first time seen, total hits).
+
+        A `location` not seen yet still counts as known when one of `aliases`
+        (older key formats of the same crash) is a legacy row; it is then added
+        under the new key, inheriting that row's first-seen time and case.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute(
+                "UPDATE locations SET hits = hits + 1, last_seen = ? WHERE ns = ? AND location = ?",
+                (now, ns, location),
+            )
+            if cur.rowcount:
+                hits = int(conn.execute(
+                    "SELECT hits FROM locations WHERE ns = ? AND location = ?", (ns, location)
+                ).fetchone()[0])
+                is_new = False
+            else:
+                known = None
+                for alias in aliases:
+                    known = conn.execute(
+                        "SELECT first_seen, first_case FROM locations"
+                        " WHERE ns = ? AND location = ? AND legacy = 1",
+                        (ns, alias),
+                    ).fetchone()
+                    if known is not None:
+                        break
+                first_seen, first_case = known if known is not None else (now, str(case_id or ""))
+                conn.execute(
+                    "INSERT INTO locations (ns, location, hits, first_seen, last_seen, first_case, legacy)"
+                    " VALUES (?, ?, 1, ?, ?, ?, 0)",
+                    (ns, location, first_seen, now, first_case),
+                )
+                hits = 1
+                is_new = known is None
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return is_new, hits
+
+    def replace_namespace(self, ns: str, rows: List[Tuple[str, int, float, float, str]]):
+        """Swap all of `ns` for (location, hits, first_seen, last_seen, first_case) rows.
+
+        Used after re-bucketing existing cases; also marks `ns` as imported so
+        the legacy text file is not merged back in.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM locations WHERE ns = ?", (ns,))
+            conn.executemany(
+                "INSERT INTO locations (ns, location, hits, first_seen, last_seen, first_case, legacy)"
+                " VALUES (?, ?, ?, ?, ?, ?, 0)",
+                [(ns, loc, int(hits), first, last, str(case or "")) for loc, hits, first, last, case in rows],
+            )
+            conn.execute("INSERT OR REPLACE INTO imported (ns, imported) VALUES (?, ?)", (ns, time.time()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._imported_ns.add(ns)
+
+    def get(self, ns: str, location: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT hits, first_seen, last_seen, first_case FROM locations WHERE ns = ? AND location = ?",
+            (ns, location),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"hits": int(row[0]), "first_seen": row[1], "last_seen": row[2], "first_case": row[3]}
+
+    def top(self, ns: str, limit: int = 20) -> List[Tuple[str, int]]:
+        rows = self._conn().execute(
+            "SELECT location, hits FROM locations WHERE ns = ? ORDER BY hits DESC LIMIT ?",
+            (ns, int(limit)),
+        ).fetchall()
+        return [(str(loc), int(hits)) for loc, hits in rows]
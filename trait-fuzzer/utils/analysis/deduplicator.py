@@ -2,9 +2,15 @@ import hashlib
 import json
 import logging
 import re
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from utils.analysis.signature import signature_from_detail
+
 class Deduplicator:
     def __init__(self, results_dir: Path):
         self.results_dir = results_dir
@@ -45,6 +51,13 @@ class Deduplicator:
         comp = str(compiler_ns or "").lower()
         cat = str(category or "").lower()
 
+        if cat == "crash":
+            sig = signature_from_detail(content, comp)
+            if sig is not None:
+                key = sig.bucket_key()
+                if key:
+                    return key
+
         if comp == "gccrs":
             section = self._extract_section(content, "gccrs")
             stderr = self._extract_stderr(section)
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""Crash signatures: parse compiler crash output into normalized frames and bucket it.
+
+Understands:
+- rustc panics: `thread 'rustc' panicked at <file>:<line>:<col>:` (and the
+  older `panicked at '<msg>', <file>:<line>:<col>`), the `stack backtrace:`
+  frames, and the `query stack during panic:` section.
+- rustc ICE headers: `error: internal compiler error: <file>:<line>:<col>: <msg>`.
+- gccrs ICE headers: `internal compiler error: in <fn>, at <file>:<line>`, followed
+  by `0x<addr> <fn>(<args>)` / `\t<file>:<line>` backtrace pairs.
+
+The bucket key is the panic site followed by the top-K non-runtime frames plus
+the innermost query name; the panic message is kept for display only, so panics
+whose messages embed types or DefIds still land in one bucket.
+
+Bulk re-bucket of existing result trees:
+  python utils/analysis/signature.py rebucket results --out buckets.json
+  python utils/analysis/signature.py rebucket results --reindex   # rebuild results/.bug_locations.sqlite3
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+DEFAULT_TOP_K = 3
+
+# Crash output beyond this is backtrace tail (thread start, main loop) and never reaches the key.
+_MAX_SCAN_CHARS = 256 * 1024
+
+_PANIC_NEW_RE = re.compile(r"panicked at ([^\s:][^\n]*?):(\d+):(\d+):\s*$", re.MULTILINE)
+_PANIC_OLD_RE = re.compile(r"panicked at '((?:[^'\\]|\\.)*)', ([^\n]+?):(\d+):(\d+)")
+_RUSTC_ICE_RE = re.compile(r"error: internal compiler error: (?:([^\s:][^\n]*?):(\d+):(\d+): )?([^\n]*)")
+_DELAYED_AT_RE = re.compile(r"delayed at ([^\s:][^\n]*?):(\d+):(\d+)")
+_GCCRS_ICE_RE = re.compile(
+    r"internal compiler error:\s*in\s*([^,\n]+),\s*at\s*([^\n]+?):(\d+)",
+    re.IGNORECASE,
+)
+_GCCRS_ICE_ANY_RE = re.compile(r"internal compiler error:\s*([^\n]+)", re.IGNORECASE)
+_RUST_FRAME_RE = re.compile(r"^\s*\d+:\s+(?:0x[0-9a-fA-F]+ - )?(.+?)\s*$")
+_GCC_FRAME_RE = re.compile(r"^0x[0-9a-fA-F]+\s+(.+?)\s*$")
+_GCC_FRAME_LOC_RE = re.compile(r"^\s+([^\s:]+):(\d+)\s*$")
+_QUERY_RE = re.compile(r"^#(\d+) \[([A-Za-z0-9_]+)\]")
+
+_CRATE_HASH_RE = re.compile(r"\[[0-9a-f]{1,16}\]")
+_SYMBOL_HASH_RE = re.compile(r"::h[0-9a-f]{16}$")
+_LLVM_SUFFIX_RE = re.compile(r"\.llvm\.\d+|\.cold(?:\.\d+)?$|\.part\.\d+|\.isra\.\d+|\.constprop\.\d+")
+_CLOSURE_RE = re.compile(r"\{\{?closure(?:#\d+)?\}?\}")
+_SHIM_RE = re.compile(r"::\{shim:[^}]*\}")
+_RUSTC_SRC_PREFIX_RE = re.compile(r"^.*?/rustc(?:-dev)?/[0-9a-f]{7,40}/")
+_GCC_SRC_PREFIX_RE = re.compile(r"^(?:\.\./)+(?:gcc/)?")
+_MSG_LITERAL_RE = re.compile(r"`[^`]*`|DefId\([^)]*\)|\b0x[0-9a-fA-F]+\b|\d+")
+
+# Panic/ICE plumbing: never part of a signature.
+_SKIP_FRAME_PREFIXES = (
+    "std::", "core::", "alloc::", "__rust", "__rustc::", "rust_begin_unwind", "rust_panic",
+    "rustc_errors::", "rustc_middle::util::bug::", "rustc_middle::ty::context::tls::",
+    "rustc_query_impl::", "rustc_query_system::", "rustc_data_structures::stack::",
+    "stacker::", "psm::", "rustc_driver_impl::", "rustc_interface::util::",
+    "rustc_interface::interface::run_compiler", "rustc_span::",
+    "start_thread", "clone", "__libc_start", "_start", "<unknown>", "main",
+)
+_SKIP_GCC_FRAMES = (
+    "internal_error", "fancy_abort", "diagnostic_", "rust_internal_error_at", "rust_fatal_error",
+    "crash_signal", "toplev::main", "main", "__libc_start", "_start",
+)
+
+
+@dataclass
+class CrashSignature:
+    kind: str  # "rustc-panic" | "rustc-ice" | "gccrs-ice"
+    location: str = ""  # normalized file:line of the panic/ICE site (no column)
+    message: str = ""  # first line of the panic message, literals masked; display only
+    query: str = ""  # innermost query from `query stack during panic`
+    queries: List[str] = field(default_factory=list)
+    frames: List[str] = field(default_factory=list)  # innermost first, runtime plumbing removed
+    function: str = ""  # gccrs header `in <fn>`
+
+    def top_frames(self, top_k: int = DEFAULT_TOP_K) -> List[str]:
+        head = []
+        if self.kind == "gccrs-ice" and self.function:
+            head.append(f"{self.function}@{self.location}")
+        elif self.location:
+            head.append(self.location)
+        frames = [f for f in self.frames if f != self.function] if self.function else self.frames
+        return (head + frames)[:max(1, int(top_k))]
+
+    def bucket_key(self, top_k: int = DEFAULT_TOP_K) -> str:
+        parts = self.top_frames(top_k)
+        if not parts:
+            return ""
+        key = " | ".join(parts)
+        if self.query:
+            key += f" [{self.query}]"
+        if self.kind == "gccrs-ice":
+            # Header-only gccrs keys match the pre-signature "ICE::fn@loc" format.
+            return f"ICE::{key}"
+        return key
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "location": self.location,
+            "message": self.message,
+            "query": self.query,
+            "queries": list(self.queries),
+            "frames": list(self.frames),
+            "function": self.function,
+        }
+
+
+def normalize_source_path(path: str) -> str:
+    """Strip toolchain-specific prefixes: `/rustc-dev/<sha>/compiler/..` -> `compiler/..`."""
+    p = str(path or "").strip().replace("\\", "/")
+    p = _RUSTC_SRC_PREFIX_RE.sub("", p)
+    p = _GCC_SRC_PREFIX_RE.sub("", p)
+    return p
+
+
+def _strip_generics(s: str) -> str:
+    out = []
+    depth = 0
+    for ch in s:
+        if ch == "<":
+            depth += 1
+        elif ch == ">":
+            if depth:
+                depth -= 1
+        elif depth == 0:
+            out.append(ch)
+    return "".join(out)
+
+
+def _split_qualified(s: str) -> Optional[Tuple[str, str]]:
+    """`<Self as Trait>::rest` -> (Self, rest); None if `s` is not a qualified path."""
+    if not s.startswith("<"):
+        return None
+    depth = 0
+    as_at = -1
+    for i, ch in enumerate(s):
+        if ch == "<":
+            depth += 1
+        elif ch == ">":
+            depth -= 1
+            if depth == 0:
+                self_ty = s[1:as_at] if as_at > 0 else s[1:i]
+                return self_ty, s[i + 1:].lstrip(":")
+        elif depth == 1 and as_at < 0 and s.startswith(" as ", i):
+            as_at = i
+    return None
+
+
+def normalize_rust_frame(symbol: str) -> str:
+    """`<rustc_x[abc]::Foo<T> as Trait>::bar::h0123..` -> `rustc_x::Foo::bar`."""
+    s = _CRATE_HASH_RE.sub("", symbol.strip())
+    s = _SYMBOL_HASH_RE.sub("", s)
+    s = _LLVM_SUFFIX_RE.sub("", s)
+    s = _CLOSURE_RE.sub("{closure}", s)
+    s = _SHIM_RE.sub("", s)
+    qualified = _split_qualified(s)
+    if qualified is not None:
+        self_ty, rest = qualified
+        self_ty = normalize_rust_frame(self_ty)
+        s = f"{self_ty}::{rest}" if rest else self_ty
+    s = _strip_generics(s)
+    s = s.replace("::::", "::").strip(": ")
+    return s
+
+
+def normalize_gcc_frame(symbol: str) -> str:
+    """`Rust::Resolver::Foo::bar(Rust::AST::Item&) [clone .cold]` -> `Rust::Resolver::Foo::bar`."""
+    s = symbol.strip()
+    s = re.sub(r"\s*\[clone [^\]]*\]", "", s)
+    s = _LLVM_SUFFIX_RE.sub("", s)
+    depth = 0
+    for i, ch in enumerate(s):
+        if ch == "<":
+            depth += 1
+        elif ch == ">":
+            depth = max(0, depth - 1)
+        elif ch == "(" and depth == 0 and i > 0:
+            s = s[:i + 2] if s[:i].endswith("operator") and s[i:i + 2] == "()" else s[:i]
+            break
+    return _strip_generics(s).strip()
+
+
+def _mask_message(msg: str) -> str:
+    return _MSG_LITERAL_RE.sub("_", str(msg or "").strip())[:200]
+
+
+def _rust_frames(text: str) -> List[str]:
+    start = text.find("stack backtrace:")
+    if start < 0:
+        return []
+    frames: List[str] = []
+    for line in text[start:].splitlines()[1:]:
+        if not line.strip():
+            break
+        if line.lstrip().startswith("at "):
+            continue
+        m = _RUST_FRAME_RE.match(line)
+        if not m:
+            if frames or not line.startswith(" "):
+                break
+            continue
+        name = normalize_rust_frame(m.group(1))
+        if not name or name.startswith(_SKIP_FRAME_PREFIXES):
+            continue
+        if frames and frames[-1] == name:
+            continue
+        frames.append(name)
+    return frames
+
+
+def _queries(text: str) -> List[str]:
+    start = text.find("query stack during panic:")
+    if start < 0:
+        return []
+    out = []
+    for line in text[start:].splitlines()[1:]:
+        m = _QUERY_RE.match(line)
+        if not m:
+            break
+        out.append(m.group(2))
+    return out
+
+
+def _gcc_frames(text: str, start: int) -> Tuple[List[str], str]:
+    frames: List[str] = []
+    first_loc = ""
+    for line in text[start:].splitlines()[1:]:
+        m = _GCC_FRAME_RE.match(line)
+        if m:
+            name = normalize_gcc_frame(m.group(1))
+            if name and not name.startswith(_SKIP_GCC_FRAMES) and (not frames or frames[-1] != name):
+                frames.append(name)
+            continue
+        loc = _GCC_FRAME_LOC_RE.match(line)
+        if loc:
+            if not first_loc and frames:
+                first_loc = f"{normalize_source_path(loc.group(1))}:{loc.group(2)}"
+            continue
+        if line.strip():
+            break
+    return frames, first_loc
+
+
+def parse_crash(stderr: str) -> Optional[CrashSignature]:
+    """Signature of one compiler's crash output; None if it does not look like a crash."""
+    text = str(stderr or "")
+    if "panicked at" not in text and "internal compiler error" not in text:
+        return None
+    if len(text) > _MAX_SCAN_CHARS:
+        # Keep the head (panic/ICE header, backtrace) and the tail (query stack).
+        text = text[:_MAX_SCAN_CHARS // 2] + "\n\n" + text[-_MAX_SCAN_CHARS // 2:]
+
+    gcc = _GCCRS_ICE_RE.search(text)
+    if gcc:
+        frames, _ = _gcc_frames(text, gcc.start())
+        return CrashSignature(
+            kind="gccrs-ice",
+            location=f"{normalize_source_path(gcc.group(2))}:{gcc.group(3)}",
+            function=gcc.group(1).strip(),
+            frames=frames,
+        )
+
+    queries = _queries(text)
+    sig = CrashSignature(kind="rustc-panic", queries=queries, query=queries[0] if queries else "")
+    ice = _RUSTC_ICE_RE.search(text)
+    panic = _PANIC_NEW_RE.search(text)
+    old = None if panic else _PANIC_OLD_RE.search(text)
+    if ice and ice.group(1):
+        sig.kind = "rustc-ice"
+        sig.location = f"{normalize_source_path(ice.group(1))}:{ice.group(2)}"
+        sig.message = _mask_message(ice.group(4))
+    elif panic:
+        sig.location = f"{normalize_source_path(panic.group(1))}:{panic.group(2)}"
+        rest = text[panic.end():].lstrip("\n").split("\n", 1)[0]
+        sig.message = _mask_message(rest)
+    elif old:
+        sig.location = f"{normalize_source_path(old.group(2))}:{old.group(3)}"
+        sig.message = _mask_message(old.group(1))
+    elif ice:
+        # Delayed bug: the header has no site, the "delayed at" note does.
+        sig.kind = "rustc-ice"
+        sig.message = _mask_message(ice.group(4))
+        delayed = _DELAYED_AT_RE.search(text)
+        if delayed:
+            sig.location = f"{normalize_source_path(delayed.group(1))}:{delayed.group(2)}"
+    else:
+        any_ice = _GCCRS_ICE_ANY_RE.search(text)
+        if not any_ice:
+            return None
+        # gccrs ICE without an "in fn, at loc" header (e.g. a segfault): first frame is the site.
+        frames, first_loc = _gcc_frames(text, any_ice.start())
+        if not frames:
+            return None
+        return CrashSignature(
+            kind="gccrs-ice",
+            location=first_loc,
+            function=frames[0],
+            message=_mask_message(any_ice.group(1)),
+            frames=frames[1:],
+        )
+    sig.frames = _rust_frames(text)
+    if not sig.location and not sig.frames:
+        return None
+    return sig
+
+
+def bucket_key(stderr: str, top_k: int = DEFAULT_TOP_K) -> Optional[str]:
+    sig = parse_crash(stderr)
+    if sig is None:
+        return None
+    return sig.bucket_key(top_k) or None
+
+
+# --- detail.log helpers ---------------------------------------------------
+
+_SECTIONS = {
+    "rustc": ("rustc (stable)", "rustc (+nightly)", "rustc (-Z next trait-solver)"),
+    "gccrs": ("gccrs",),
+}
+
+
+def detail_section_stderr(content: str, header: str) -> str:
+    marker = f"=== {header} ==="
+    start = content.find(marker)
+    if start < 0:
+        return ""
+    rest = content[start + len(marker):]
+    end = rest.find("\n=== ")
+    if end >= 0:
+        rest = rest[:end]
+    return rest.split("Stderr:", 1)[1] if "Stderr:" in rest else rest
+
+
+def signature_from_detail(content: str, compiler_ns: str) -> Optional[CrashSignature]:
+    """First crash signature among the sections of `compiler_ns` in a case's detail.log."""
+    headers = _SECTIONS.get(str(compiler_ns or "").lower())
+    if headers is None:
+        headers = _SECTIONS["rustc"] + _SECTIONS["gccrs"]
+    found_section = False
+    for header in headers:
+        stderr = detail_section_stderr(content, header)
+        found_section = found_section or bool(stderr)
+        sig = parse_crash(stderr)
+        if sig is not None:
+            return sig
+    # Other layouts (e.g. mutation_crossfeature's baseline/mutated sections): whole log.
+    return None if found_section else parse_crash(content)
+
+
+def rebucket(
+    results_root: Path,
+    statuses=("crash", "dup"),
+    top_k: int = DEFAULT_TOP_K,
+) -> Dict[str, Dict[str, Dict]]:
+    """Bucket every existing case under `results_root/<ns>/<status>/case_*`.
+
+    Returns {ns: {bucket_key: {"count", "cases", "kind", "location", "query", "message"}}};
+    cases with no recognizable crash go under the "" key.
+    """
+    results_root = Path(results_root)
+    out: Dict[str, Dict[str, Dict]] = {}
+    for ns_dir in sorted(p for p in results_root.iterdir() if p.is_dir() and not p.name.startswith(".")):
+        buckets: Dict[str, Dict] = defaultdict(lambda: {"count": 0, "cases": []})
+        for status in statuses:
+            status_dir = ns_dir / status
+            if not status_dir.is_dir():
+                continue
+            for case_dir in sorted(status_dir.iterdir()):
+                detail = case_dir / "detail.log"
+                if not detail.is_file():
+                    continue
+                try:
+                    content = detail.read_text(encoding="utf-8", errors="ignore")
+                    mtime = detail.stat().st_mtime
+                except OSError:
+                    continue
+                sig = signature_from_detail(content, ns_dir.name)
+                key = sig.bucket_key(top_k) if sig is not None else ""
+                b = buckets[key]
+                b["count"] += 1
+                b["cases"].append({"case": f"{status}/{case_dir.name}", "mtime": mtime})
+                if sig is not None and "kind" not in b:
+                    b.update(kind=sig.kind, location=sig.location, query=sig.query, message=sig.message)
+        if buckets:
+            for b in buckets.values():
+                b["cases"].sort(key=lambda c: c["mtime"])
+            out[ns_dir.name] = dict(buckets)
+    return out
+
+
+def _reindex(results_root: Path, report: Dict[str, Dict[str, Dict]]) -> int:
+    from utils.analysis.bug_index import BugLocationIndex
+
+    index = BugLocationIndex.for_results(results_root)
+    written = 0
+    for ns, buckets in report.items():
+        rows = []
+        for key, b in buckets.items():
+            if not key:
+                continue
+            cases = b["cases"]
+            first_case = cases[0]["case"].split("/", 1)[-1]
+            if first_case.startswith("case_"):
+                first_case = first_case[len("case_"):]  # same id check_and_insert records
+            rows.append((key, len(cases), cases[0]["mtime"], cases[-1]["mtime"], first_case))
+        index.replace_namespace(ns, rows)
+        written += len(rows)
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Crash signature bucketing for existing result trees.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rb = sub.add_parser("rebucket", help="Re-bucket results/<ns>/{crash,dup}/case_* by crash signature")
+    rb.add_argument("results", type=Path, help="Results root (contains rustc/, gccrs/, ...)")
+    rb.add_argument("--statuses", default="crash,dup", help="Comma-separated status dirs to scan")
+    rb.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Frames per bucket key")
+    rb.add_argument("--out", type=Path, default=None, help="Write the bucket report as JSON here")
+    rb.add_argument("--reindex", action="store_true", help="Rebuild the crash dedup index from the new buckets")
+
+    sg = sub.add_parser("sig", help="Print the signature of one stderr file (or detail.log)")
+    sg.add_argument("file", type=Path)
+    sg.add_argument("--compiler", default="", help="Compiler section to read from a detail.log")
+    sg.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "sig":
+        content = args.file.read_text(encoding="utf-8", errors="ignore")
+        sig = signature_from_detail(content, args.compiler) if "=== " in content else parse_crash(content)
+        if sig is None:
+            print("no crash signature")
+            return 1
+        print(json.dumps({"key": sig.bucket_key(args.top_k), **sig.to_dict()}, indent=2))
+        return 0
+
+    statuses = tuple(s.strip() for s in args.statuses.split(",") if s.strip())
+    report = rebucket(args.results, statuses=statuses, top_k=args.top_k)
+    for ns, buckets in report.items():
+        cases = sum(b["count"] for b in buckets.values())
+        unknown = buckets.get("", {}).get("count", 0)
+        print(f"{ns}: {cases} cases -> {len(buckets) - (1 if unknown else 0)} buckets ({unknown} without a signature)")
+        for key, b in sorted(buckets.items(), key=lambda kv: -kv[1]["count"]):
+            if key:
+                print(f"  {b['count']:>5}  {key}")
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {args.out}")
+    if args.reindex:
+        print(f"Reindexed {_reindex(args.results, report)} buckets into {args.results / '.bug_locations.sqlite3'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""Packed case storage: one append-only segment stream per worker plus a shared index.
+
+Layout under `<results>/.packed/`:
+  seg_<writer>_<n>.tfc   append-only frames (header + compressed payload)
+  index.sqlite3          records(compiler, status, variant_id -> segment, offset, length)
+                         blobs(sha256 -> segment, offset, length)
+                         record_blobs(compiler, status, variant_id, sha256): blob references
+
+A case record keeps the detail.log header fields, one entry per compiler run,
+`before.rs` as a blob reference and `after.rs` as line ops against it. Seed
+sources and compiler stdout/stderr go through the blob table, so the same text
+is stored once no matter how many cases repeat it.
+
+Frames are compressed with zstd when the `zstandard` package is installed and
+zlib otherwise; the codec is recorded per frame.
+
+Retention: `evict_oldest` drops index rows oldest-first (the results limits
+call it with the same keep/max-cases/max-results-gb policy as case
+directories), and `compact` reclaims the space. A sealed segment (one that
+reached `segment_bytes`, so no writer appends to it again) is deleted once
+nothing references it, or rewritten into the current segment once less than
+half of it is live.
+
+  python utils/case_store.py results stats
+  python utils/case_store.py results compact
+  python utils/case_store.py results list --status error
+  python utils/case_store.py results export --status error --out /tmp/cases [VARIANT_ID ...]
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zlib frames only
+    zstandard = None
+
+PACKED_DIRNAME = ".packed"
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+_MAGIC = b"TFC1"
+_FRAME_HEADER = struct.Struct("<4sBBI")  # magic, codec, kind, payload length
+_CODEC_ZLIB = 0
+_CODEC_ZSTD = 1
+_KIND_RECORD = 0
+_KIND_BLOB = 1
+
+
+def render_detail_log(header: Sequence[Tuple[str, object]], sections: Sequence[Dict]) -> str:
+    """The detail.log text for a case: `Key: value` header lines, then one block per compiler run."""
+    out = [f"{key}: {value}\n" for key, value in header]
+    for sec in sections:
+        out.append(f"\n=== {sec['name']} ===\n")
+        out.append(f"Command: {sec['command']}\n")
+        out.append(f"Status: {sec['status']}\n")
+        out.append(f"Duration: {float(sec['duration']):.4f}s\n")
+        out.append(f"Tier: {sec['tier']}\n")
+        out.append(f"Return code: {sec['return_code']}\n")
+        out.append(f"Stdout:\n{sec['stdout']}\n")
+        out.append(f"Stderr:\n{sec['stderr']}\n")
+    return "".join(out)
+
+
+def diff_ops(before: str, after: str) -> List:
+    """`after` as ops over `before`'s lines: [start, end] copies a range, a list of str inserts lines."""
+    a = before.splitlines(keepends=True)
+    b = after.splitlines(keepends=True)
+    ops: List = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(b[j1:j2])
+    return ops
+
+
+def apply_ops(before: str, ops: List) -> str:
+    a = before.splitlines(keepends=True)
+    out: List[str] = []
+    for op in ops:
+        if op and isinstance(op[0], int):
+            out.extend(a[op[0]:op[1]])
+        else:
+            out.extend(op)
+    return "".join(out)
+
+
+class PackedCaseStore:
+    """Writer and reader for the packed layout above.
+
+    Each process appends only to its own segments (`writer` names them), so no
+    file lock is needed; the index is SQLite in WAL mode shared by all writers.
+    A frame is indexed only after it has been written and flushed, so a torn
+    tail after a crash is never referenced.
+    """
+
+    def __init__(self, root: Path, writer: str = "", segment_bytes: int = DEFAULT_SEGMENT_BYTES, level: int = 3):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.writer = str(writer or f"p{os.getpid()}")
+        self.segment_bytes = int(segment_bytes)
+        self.level = int(level)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._seg_path: Optional[Path] = None
+        self._seg_file = None
+        self._readers: Dict[str, object] = {}
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " compiler TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " variant_id TEXT NOT NULL,"
+            " segment TEXT NOT NULL,"
+            " offset INTEGER NOT NULL,"
+            " length INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " PRIMARY KEY (compiler, status, variant_id))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " sha256 TEXT PRIMARY KEY,"
+            " segment TEXT NOT NULL,"
+            " offset INTEGER NOT NULL,"
+            " length INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS record_blobs ("
+            " compiler TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " variant_id TEXT NOT NULL,"
+            " sha256 TEXT NOT NULL,"
+            " PRIMARY KEY (compiler, status, variant_id, sha256))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS record_blobs_sha ON record_blobs (sha256)")
+        conn.execute("CREATE INDEX IF NOT EXISTS records_segment ON records (segment)")
+        conn.execute("CREATE INDEX IF NOT EXISTS blobs_segment ON blobs (segment)")
+        if int(conn.execute("PRAGMA user_version").fetchone()[0]) < 1:
+            self._backfill_blob_refs(conn)
+
+    def _backfill_blob_refs(self, conn: sqlite3.Connection):
+        """Stores written before record_blobs existed: rebuild the references once."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if int(conn.execute("PRAGMA user_version").fetchone()[0]) < 1:
+                rows = conn.execute("SELECT compiler, status, variant_id, segment, offset, length FROM records").fetchall()
+                for compiler, status, variant_id, seg, offset, length in rows:
+                    record = json.loads(self._read_frame(seg, offset, length))
+                    self._add_blob_refs(conn, (compiler, status, variant_id), record)
+                conn.execute("PRAGMA user_version = 1")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _add_blob_refs(conn: sqlite3.Connection, key: Tuple[str, str, str], record: Dict):
+        digests = {record.get("before", "")}
+        for sec in record.get("sections", []):
+            digests.add(sec.get("stdout", ""))
+            digests.add(sec.get("stderr", ""))
+        conn.executemany(
+            "INSERT OR IGNORE INTO record_blobs (compiler, status, variant_id, sha256) VALUES (?, ?, ?, ?)",
+            [(*key, d) for d in digests if d],
+        )
+
+    @classmethod
+    def for_results(cls, results_root: Path, writer: str = "", **kwargs) -> "PackedCaseStore":
+        return cls(Path(results_root) / PACKED_DIRNAME, writer=writer, **kwargs)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.root / "index.sqlite3"), timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- writing ---------------------------------------------------------
+
+    def _segment(self):
+        if self._seg_file is not None and self._seg_file.tell() < self.segment_bytes:
+            return self._seg_path, self._seg_file
+        if self._seg_file is not None:
+            self._seg_file.close()
+        prefix = f"seg_{self.writer}_"
+        taken = [
+            int(p.stem[len(prefix):]) for p in self.root.glob(f"{prefix}*.tfc")
+            if p.stem[len(prefix):].isdigit()
+        ]
+        n = max(taken, default=-1)
+        if n >= 0 and (self.root / f"{prefix}{n}.tfc").stat().st_size < self.segment_bytes:
+            path = self.root / f"{prefix}{n}.tfc"
+        else:
+            path = self.root / f"{prefix}{n + 1}.tfc"
+        self._seg_path = path
+        self._seg_file = open(path, "ab")
+        return self._seg_path, self._seg_file
+
+    def _compress(self, data: bytes) -> Tuple[int, bytes]:
+        if zstandard is not None:
+            return _CODEC_ZSTD, zstandard.ZstdCompressor(level=self.level).compress(data)
+        return _CODEC_ZLIB, zlib.compress(data, min(9, max(1, self.level * 2)))
+
+    def _append(self, kind: int, data: bytes) -> Tuple[str, int, int]:
+        codec, payload = self._compress(data)
+        return self._append_raw(_FRAME_HEADER.pack(_MAGIC, codec, kind, len(payload)) + payload)
+
+    def _append_raw(self, frame: bytes) -> Tuple[str, int, int]:
+        path, f = self._segment()
+        offset = f.tell()
+        f.write(frame)
+        f.flush()
+        return path.name, offset, len(frame)
+
+    def _put_blob(self, conn: sqlite3.Connection, text: str) -> str:
+        # Always asked inside the put transaction: another process may have compacted
+        # an unreferenced blob away since this one last saw it.
+        data = str(text or "").encode("utf-8", errors="surrogateescape")
+        if not data:
+            return ""
+        digest = hashlib.sha256(data).hexdigest()
+        if conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (digest,)).fetchone() is None:
+            seg, offset, length = self._append(_KIND_BLOB, data)
+            conn.execute(
+                "INSERT OR IGNORE INTO blobs (sha256, segment, offset, length) VALUES (?, ?, ?, ?)",
+                (digest, seg, offset, length),
+            )
+        return digest
+
+    def put(
+        self,
+        variant_id: str,
+        status: str,
+        compiler: str,
+        before: str,
+        after: str,
+        header: Sequence[Tuple[str, object]],
+        sections: Sequence[Dict],
+    ):
+        """Append one case; a later put with the same (compiler, status, variant_id) replaces it."""
+        with self._lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                packed_sections = []
+                for sec in sections:
+                    sec = dict(sec)
+                    sec["stdout"] = self._put_blob(conn, sec.get("stdout", ""))
+                    sec["stderr"] = self._put_blob(conn, sec.get("stderr", ""))
+                    packed_sections.append(sec)
+                record = {
+                    "variant_id": str(variant_id),
+                    "status": str(status),
+                    "compiler": str(compiler),
+                    "before": self._put_blob(conn, before),
+                    "after_ops": diff_ops(str(before or ""), str(after or "")),
+                    "header": [[str(k), str(v)] for k, v in header],
+                    "sections": packed_sections,
+                }
+                seg, offset, length = self._append(_KIND_RECORD, json.dumps(record, separators=(",", ":")).encode("utf-8"))
+                key = (str(compiler), str(status), str(variant_id))
+                conn.execute(
+                    "INSERT OR REPLACE INTO records (compiler, status, variant_id, segment, offset, length, created)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, seg, offset, length, time.time()),
+                )
+                conn.execute(
+                    "DELETE FROM record_blobs WHERE compiler = ? AND status = ? AND variant_id = ?", key
+                )
+                self._add_blob_refs(conn, key, record)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            if self._seg_file is not None:
+                self._seg_file.close()
+                self._seg_file = None
+            for f in self._readers.values():
+                f.close()
+            self._readers.clear()
+
+    # --- retention -------------------------------------------------------
+
+    def _usage_rows(self, compiler: str, statuses: Sequence[str]) -> List[Tuple[str, str, float]]:
+        """(status, variant_id, bytes) oldest first; a record's bytes are its own frame
+        plus its share of every blob it references (blob size / number of referrers)."""
+        statuses = list(statuses)
+        if not statuses:
+            return []
+        marks = ",".join("?" * len(statuses))
+        rows = self._conn().execute(
+            "WITH refs AS (SELECT sha256, COUNT(*) AS n FROM record_blobs GROUP BY sha256),"
+            " shares AS ("
+            "  SELECT rb.compiler, rb.status, rb.variant_id, SUM(b.length * 1.0 / refs.n) AS bytes"
+            "  FROM record_blobs rb JOIN blobs b ON b.sha256 = rb.sha256 JOIN refs ON refs.sha256 = rb.sha256"
+            f"  WHERE rb.compiler = ? AND rb.status IN ({marks})"
+            "  GROUP BY rb.compiler, rb.status, rb.variant_id)"
+            " SELECT r.status, r.variant_id, r.length + COALESCE(shares.bytes, 0) FROM records r"
+            " LEFT JOIN shares ON shares.compiler = r.compiler AND shares.status = r.status"
+            "  AND shares.variant_id = r.variant_id"
+            f" WHERE r.compiler = ? AND r.status IN ({marks}) ORDER BY r.created",
+            [compiler, *statuses, compiler, *statuses],
+        ).fetchall()
+        return [(str(st), str(vid), float(b)) for st, vid, b in rows]
+
+    def usage(self, compiler: str, statuses: Sequence[str]) -> Tuple[int, int]:
+        """(record count, live bytes) of `statuses` under `compiler`, as `_usage_rows` counts bytes."""
+        rows = self._usage_rows(compiler, statuses)
+        return len(rows), int(sum(b for _, _, b in rows))
+
+    def evict_oldest(
+        self,
+        compiler: str,
+        statuses: Sequence[str],
+        keep_count: Optional[int] = None,
+        free_bytes: Optional[int] = None,
+    ) -> int:
+        """Drop the oldest records of `statuses` until at most `keep_count` remain and at
+        least `free_bytes` live bytes are released; returns the number dropped.
+
+        Only index rows go here; `compact` reclaims the segment space.
+        """
+        rows = self._usage_rows(compiler, statuses)
+        n = max(0, len(rows) - keep_count) if keep_count is not None else 0
+        if free_bytes is not None:
+            freed = sum(b for _, _, b in rows[:n])
+            while n < len(rows) and freed < free_bytes:
+                freed += rows[n][2]
+                n += 1
+        if n == 0:
+            return 0
+        victims = [(compiler, st, vid) for st, vid, _ in rows[:n]]
+        with self._lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("DELETE FROM records WHERE compiler = ? AND status = ? AND variant_id = ?", victims)
+                conn.executemany(
+                    "DELETE FROM record_blobs WHERE compiler = ? AND status = ? AND variant_id = ?", victims
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return n
+
+    def compact(self, min_live_fraction: float = 0.5) -> Tuple[int, int]:
+        """Delete dead sealed segments and rewrite mostly-dead ones; returns (segments removed, bytes reclaimed).
+
+        Live frames are copied as-is into this writer's current segment. Segments
+        still below `segment_bytes` may be some writer's tail and are left alone.
+        """
+        removed = reclaimed = 0
+        with self._lock:
+            conn = self._conn()
+            current = self._seg_path.name if self._seg_file is not None else None
+            for seg_path in sorted(self.root.glob("seg_*.tfc")):
+                seg = seg_path.name
+                try:
+                    size = seg_path.stat().st_size
+                except FileNotFoundError:
+                    continue
+                if seg == current or size < self.segment_bytes:
+                    continue
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    records = conn.execute(
+                        "SELECT compiler, status, variant_id, offset, length FROM records WHERE segment = ?", (seg,)
+                    ).fetchall()
+                    blobs = conn.execute(
+                        "SELECT sha256, offset, length FROM blobs WHERE segment = ?"
+                        " AND sha256 IN (SELECT sha256 FROM record_blobs)",
+                        (seg,),
+                    ).fetchall()
+                    live = sum(r[4] for r in records) + sum(b[2] for b in blobs)
+                    if live and live >= size * min_live_fraction:
+                        conn.execute("COMMIT")
+                        continue
+                    for compiler, status, variant_id, offset, length in records:
+                        new_seg, new_off, _ = self._append_raw(self._read_raw(seg, offset, length))
+                        conn.execute(
+                            "UPDATE records SET segment = ?, offset = ?"
+                            " WHERE compiler = ? AND status = ? AND variant_id = ?",
+                            (new_seg, new_off, compiler, status, variant_id),
+                        )
+                    for digest, offset, length in blobs:
+                        new_seg, new_off, _ = self._append_raw(self._read_raw(seg, offset, length))
+                        conn.execute(
+                            "UPDATE blobs SET segment = ?, offset = ? WHERE sha256 = ?", (new_seg, new_off, digest)
+                        )
+                    # Whatever still points here is an unreferenced blob.
+                    conn.execute("DELETE FROM blobs WHERE segment = ?", (seg,))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                reader = self._readers.pop(seg, None)
+                if reader is not None:
+                    reader.close()
+                try:
+                    seg_path.unlink()
+                except FileNotFoundError:
+                    pass
+                removed += 1
+                reclaimed += size - live
+        return removed, reclaimed
+
+    # --- reading ---------------------------------------------------------
+
+    def _read_raw(self, segment: str, offset: int, length: int) -> bytes:
+        f = self._readers.get(segment)
+        if f is None:
+            f = open(self.root / segment, "rb")
+            self._readers[segment] = f
+        f.seek(offset)
+        raw = f.read(length)
+        magic, _codec, _kind, size = _FRAME_HEADER.unpack_from(raw)
+        if magic != _MAGIC or len(raw) != _FRAME_HEADER.size + size:
+            raise ValueError(f"corrupt frame at {segment}:{offset}")
+        return raw
+
+    def _read_frame(self, segment: str, offset: int, length: int) -> bytes:
+        raw = self._read_raw(segment, offset, length)
+        _magic, codec, _kind, _size = _FRAME_HEADER.unpack_from(raw)
+        payload = raw[_FRAME_HEADER.size:]
+        if codec == _CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("segment uses zstd; install the zstandard package to read it")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        return zlib.decompress(payload)
+
+    def _blob(self, digest: str) -> str:
+        if not digest:
+            return ""
+        row = self._conn().execute("SELECT segment, offset, length FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"missing blob {digest}")
+        return self._read_frame(*row).decode("utf-8", errors="surrogateescape")
+
+    def keys(self, compiler: Optional[str] = None, status: Optional[str] = None) -> Iterator[Tuple[str, str, str]]:
+        """(compiler, status, variant_id) of stored cases, oldest first."""
+        sql = "SELECT compiler, status, variant_id FROM records"
+        where, params = [], []
+        if compiler:
+            where.append("compiler = ?")
+            params.append(compiler)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        for row in self._conn().execute(sql + " ORDER BY created", params).fetchall():
+            yield str(row[0]), str(row[1]), str(row[2])
+
+    def load(self, compiler: str, status: str, variant_id: str) -> Dict[str, str]:
+        """{"before.rs", "after.rs", "detail.log"} texts of one case."""
+        row = self._conn().execute(
+            "SELECT segment, offset, length FROM records WHERE compiler = ? AND status = ? AND variant_id = ?",
+            (compiler, status, variant_id),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"{compiler}/{status}/{variant_id}")
+        with self._lock:
+            record = json.loads(self._read_frame(*row))
+            before = self._blob(record["before"])
+            sections = []
+            for sec in record["sections"]:
+                sec = dict(sec)
+                sec["stdout"] = self._blob(sec["stdout"])
+                sec["stderr"] = self._blob(sec["stderr"])
+                sections.append(sec)
+        return {
+            "before.rs": before,
+            "after.rs": apply_ops(before, record["after_ops"]),
+            "detail.log": render_detail_log(record["header"], sections),
+        }
+
+    def export(self, compiler: str, status: str, variant_id: str, results_root: Path) -> Path:
+        """Write one case in the directory layout: `<results_root>/<compiler>/<status>/case_<id>/`."""
+        files = self.load(compiler, status, variant_id)
+        case_dir = Path(results_root) / compiler / status / f"case_{variant_id}"
+        case_dir.mkdir(parents=True, exist_ok=True)
+        for name, text in files.items():
+            (case_dir / name).write_text(text, encoding="utf-8", errors="surrogateescape")
+        return case_dir
+
+    def stats(self) -> Dict:
+        conn = self._conn()
+        per_status = {
+            f"{c}/{s}": int(n)
+            for c, s, n in conn.execute("SELECT compiler, status, COUNT(*) FROM records GROUP BY compiler, status")
+        }
+        blobs = int(conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0])
+        seg_bytes = sum(p.stat().st_size for p in self.root.glob("seg_*.tfc"))
+        return {"records": per_status, "blobs": blobs, "segment_bytes": seg_bytes}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or export packed result cases.")
+    parser.add_argument("results", type=Path, help="Results root (holds .packed/)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="Record counts per compiler/status and storage size")
+    sub.add_parser("compact", help="Reclaim space of evicted records from sealed segments")
+    ls = sub.add_parser("list", help="List stored cases")
+    ls.add_argument("--compiler", default=None)
+    ls.add_argument("--status", default=None)
+    ex = sub.add_parser("export", help="Export cases to the directory layout")
+    ex.add_argument("variant_ids", nargs="*", help="Variant ids (default: all matching cases)")
+    ex.add_argument("--compiler", default=None)
+    ex.add_argument("--status", default=None)
+    ex.add_argument("--out", type=Path, required=True, help="Destination results root")
+    args = parser.parse_args(argv)
+
+    store = PackedCaseStore.for_results(args.results, writer="cli")
+    try:
+        if args.cmd == "stats":
+            print(json.dumps(store.stats(), indent=2))
+        elif args.cmd == "compact":
+            removed, reclaimed = store.compact()
+            print(f"Removed {removed} segments, reclaimed {reclaimed / (1024 * 1024):.1f} MB")
+        elif args.cmd == "list":
+            for compiler, status, vid in store.keys(args.compiler, args.status):
+                print(f"{compiler}/{status}/{vid}")
+        else:
+            wanted = set(args.variant_ids)
+            n = 0
+            for compiler, status, vid in store.keys(args.compiler, args.status):
+                if wanted and vid not in wanted:
+                    continue
+                store.export(compiler, status, vid, args.out)
+                n += 1
+            print(f"Exported {n} cases to {args.out}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
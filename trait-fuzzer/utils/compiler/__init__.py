@@ -1 +1,3 @@
-from .interface import RustCompiler, CompilationResult, CompilationStatus
+from .interface import RustCompiler, CompilationResult, CompilationStatus, CompileMode, CompilerMatrix
+from .slots import CompileSlots, configure_compile_slots, get_compile_slots
+from .cache import CompileCache, configure_compile_cache, get_compile_cache
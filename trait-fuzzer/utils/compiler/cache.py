@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+# Placeholder for the compiled source path inside cached stdout/stderr, so a hit
+# reports the caller's file name rather than the one that populated the entry.
+_SRC_PLACEHOLDER = "\x00SRC\x00"
+
+
+class CompileCache:
+    """On-disk, content-addressed cache of compile results.
+
+    Key: sha256(source bytes) + sha256(compiler identity), where the identity is
+    the resolved binary, its `--version` output, the full argument list and
+    anything else that changes the verdict (timeout, env, no_core wrapping).
+    Values: status, return code, duration and truncated stdout/stderr. HANG
+    verdicts are never stored.
+
+    Backed by one SQLite database in WAL mode so every worker process can share
+    it. Entries carry a `last_used` stamp; when the stored bytes exceed
+    `max_bytes` the least recently used entries are evicted.
+    """
+
+    EVICT_EVERY = 64
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 512 * 1024 * 1024, max_output_bytes: int = 64 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.db_path = self.cache_dir / "compile_cache.sqlite3"
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_output_bytes = max(0, int(max_output_bytes))
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._puts_since_evict = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " return_code INTEGER,"
+                " stdout TEXT NOT NULL,"
+                " stderr TEXT NOT NULL,"
+                " duration REAL NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used)")
+            # Timeouts depend on machine load, not just the key; older caches stored them.
+            conn.execute("DELETE FROM results WHERE status = 'HANG'")
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["CompileCache"]:
+        compiler_cfg = config.get("compiler", {})
+        enabled = compiler_cfg.get("compile_cache_enable", False)
+        if isinstance(enabled, str):
+            enabled = enabled.strip().lower() in {"1", "true", "yes", "on"}
+        if not enabled:
+            return None
+        cache_dir = Path(compiler_cfg.get("compile_cache_dir", ".compile_cache"))
+        max_mb = float(compiler_cfg.get("compile_cache_max_mb", 512))
+        return cls(cache_dir, max_bytes=int(max_mb * 1024 * 1024))
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread (compile modes run on pool threads).
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(source: bytes, identity: Dict) -> str:
+        ident = hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{hashlib.sha256(source).hexdigest()}:{ident}"
+
+    def _truncate(self, text: str) -> str:
+        text = text or ""
+        if len(text) > self.max_output_bytes:
+            return text[: self.max_output_bytes] + "\n...[truncated by compile cache]\n"
+        return text
+
+    def get(self, key: str, source_path: Path) -> Optional[Tuple[str, Optional[int], str, str, float]]:
+        """(status, return_code, stdout, stderr, duration) or None on a miss."""
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT status, return_code, stdout, stderr, duration FROM results WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            self.logger.warning("compile cache lookup failed: %s", e)
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        status, return_code, stdout, stderr, duration = row
+        src = str(source_path)
+        return (
+            status,
+            return_code,
+            stdout.replace(_SRC_PLACEHOLDER, src),
+            stderr.replace(_SRC_PLACEHOLDER, src),
+            float(duration),
+        )
+
+    def put(self, key: str, source_path: Path, status: str, return_code: Optional[int], stdout: str, stderr: str, duration: float):
+        src = str(source_path)
+        stdout = self._truncate(stdout).replace(src, _SRC_PLACEHOLDER)
+        stderr = self._truncate(stderr).replace(src, _SRC_PLACEHOLDER)
+        size = len(key) + len(stdout.encode("utf-8", "replace")) + len(stderr.encode("utf-8", "replace")) + 64
+        now = time.time()
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO results"
+                " (key, status, return_code, stdout, stderr, duration, size, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, status, return_code, stdout, stderr, float(duration), size, now, now),
+            )
+        except sqlite3.Error as e:
+            self.logger.warning("compile cache store failed: %s", e)
+            return
+        with self._lock:
+            self.stores += 1
+            self._puts_since_evict += 1
+            evict = self._puts_since_evict >= self.EVICT_EVERY
+            if evict:
+                self._puts_since_evict = 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache is under 90% of its cap."""
+        try:
+            conn = self._conn()
+            total = int(conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0])
+            if total <= self.max_bytes:
+                return
+            target = int(self.max_bytes * 0.9)
+            freed = 0
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used ASC"):
+                if total - freed <= target:
+                    break
+                victims.append((key,))
+                freed += int(size)
+            conn.executemany("DELETE FROM results WHERE key = ?", victims)
+            self.logger.info("compile cache: evicted %d entries (%.1f MB)", len(victims), freed / (1024 * 1024))
+        except sqlite3.Error as e:
+            self.logger.warning("compile cache eviction failed: %s", e)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def format_stats(self) -> str:
+        st = self.stats()
+        return (
+            f"compile cache: hit rate={st['hit_rate'] * 100:.1f}% "
+            f"(hits={st['hits']}, misses={st['misses']}, stores={st['stores']})"
+        )
+
+
+_active_cache: Optional[CompileCache] = None
+
+
+def configure_compile_cache(cache: Optional[CompileCache]):
+    """Install the process-wide cache consulted by every `RustCompiler.compile`."""
+    global _active_cache
+    _active_cache = cache
+
+
+def get_compile_cache() -> Optional[CompileCache]:
+    return _active_cache
@@ -1,13 +1,21 @@
 import subprocess
 import time
 import logging
-import tempfile
 import os
 import signal
+import random
+import threading
+import shutil
 from enum import Enum
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Optional, Dict
+from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional, Dict, List
+
+from utils.scratch import compile_scratch_dir
+
+from .cache import get_compile_cache
+from .slots import compile_slot
 
 class CompilationStatus(Enum):
     SUCCESS = "SUCCESS"
@@ -23,8 +31,20 @@ class CompilationResult:
     stdout: str
     stderr: str
     duration: float
+    # True when served from the compile cache (duration is the original compile's).
+    cached: bool = False
+    # True when a verdict policy killed the compile before it finished.
+    cancelled: bool = False
+    # Which compile tier produced the verdict: "check" (no codegen) or "full".
+    tier: str = "full"
+
+
+class _Cancelled(Exception):
+    pass
 
 class RustCompiler:
+    CANCEL_POLL_SEC = 0.1
+
     def __init__(
         self,
         timeout: int = 5,
@@ -44,6 +64,18 @@ class RustCompiler:
         self.working_dir = str(working_dir) if working_dir else None
         self.env = dict(env) if env else None
         self.auto_no_core = bool(auto_no_core)
+        self._run_env: Optional[Dict[str, str]] = None
+        self._version: Optional[str] = None
+
+    def _get_run_env(self) -> Dict[str, str]:
+        # Built once per compiler object: the process environment does not change
+        # during a run, and copying it per compile shows up on the hot path.
+        if self._run_env is None:
+            run_env = os.environ.copy()
+            if self.env:
+                run_env.update(self.env)
+            self._run_env = run_env
+        return self._run_env
 
     @staticmethod
     def _detect_compiler_kind(cmd: list) -> str:
@@ -71,15 +103,93 @@ class RustCompiler:
         )
         return any(marker in text for marker in ice_markers)
 
+    def identity(self, extra_args: Optional[list] = None) -> Dict:
+        """Everything besides the source text that determines a compile verdict (cache key)."""
+        if self._version is None:
+            try:
+                proc = subprocess.run(
+                    [*self.rustc_cmd, "--version"],
+                    cwd=self.working_dir,
+                    env=self._get_run_env(),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    timeout=30,
+                )
+                self._version = (proc.stdout or proc.stderr or "").strip()
+            except Exception:
+                self._version = ""
+        binary = shutil.which(str(self.rustc_cmd[0])) or str(self.rustc_cmd[0])
+        return {
+            "binary": str(Path(binary).resolve()) if Path(binary).exists() else binary,
+            "cmd": [str(c) for c in self.rustc_cmd[1:]],
+            "version": self._version,
+            "args": [str(a) for a in (*self.default_args, *(extra_args or []))],
+            "kind": self.compiler_kind,
+            "auto_no_core": self.auto_no_core,
+            "timeout": self.timeout,
+            "env": self.env or {},
+        }
+
     def compile(
         self,
         source_path: Path,
         output_path: Optional[Path] = None,
         extra_args: Optional[list] = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> CompilationResult:
         """
         Compiles the given Rust source file.
+
+        When a compile cache is configured (see `utils.compiler.cache`), results for
+        identical source + compiler identity are served from it. Explicit
+        `output_path` compiles and inconclusive results bypass the cache: UNKNOWN,
+        and HANG, which depends on machine load as much as on the source.
+
+        Setting `cancel_event` kills the compiler process tree and returns an
+        UNKNOWN result with `cancelled=True`.
         """
+        cache = get_compile_cache()
+        if cache is None or output_path is not None:
+            return self._compile_uncached(source_path, output_path, extra_args, cancel_event)
+
+        try:
+            key = cache.make_key(Path(source_path).read_bytes(), self.identity(extra_args))
+        except Exception:
+            return self._compile_uncached(source_path, output_path, extra_args, cancel_event)
+
+        hit = cache.get(key, Path(source_path).resolve())
+        if hit is not None:
+            status, return_code, stdout, stderr, duration = hit
+            return CompilationResult(
+                status=CompilationStatus(status),
+                return_code=return_code,
+                stdout=stdout,
+                stderr=stderr,
+                duration=duration,
+                cached=True,
+            )
+
+        result = self._compile_uncached(source_path, output_path, extra_args, cancel_event)
+        if result.status not in (CompilationStatus.UNKNOWN, CompilationStatus.HANG):
+            cache.put(
+                key,
+                Path(source_path).resolve(),
+                result.status.value,
+                result.return_code,
+                result.stdout,
+                result.stderr,
+                result.duration,
+            )
+        return result
+
+    def _compile_uncached(
+        self,
+        source_path: Path,
+        output_path: Optional[Path] = None,
+        extra_args: Optional[list] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> CompilationResult:
         source_path = Path(source_path).resolve()
         output_path = Path(output_path).resolve() if output_path is not None else None
 
@@ -97,17 +207,16 @@ class RustCompiler:
         if output_path:
             cmd.extend(["-o", str(output_path)])
         
-        # Add basic flags to speed up check-only builds if we don't need binaries
-        # For fuzzing we might want to just check: cmd.extend(["--emit", "metadata"])
-        # But to catch code generation bugs we might need full compilation.
-        # Let's stick to default for now, maybe add -Z mir-opt-level=0 if needed.
-        
+        # Check-only builds (`--emit=metadata` / `-Zno-codegen`) are driven by
+        # CompilerMatrix's tiered mode, which passes them through `extra_args`.
+
         start_time = time.time()
         try:
-            # Compile into a temporary directory to avoid polluting the working tree with
+            # Compile into a scratch directory (the worker's reused RAM-backed slot, or a
+            # fresh temp dir) to avoid polluting the working tree with
             # artifacts like `temp_iter_*`, `libtemp_iter_*.rlib`, `.d`, etc.
             # Using both `cwd` and `--out-dir` keeps most outputs contained.
-            with tempfile.TemporaryDirectory(prefix="trait_fuzzer_rustc_") as tmp:
+            with compile_scratch_dir() as tmp:
                 tmp_dir = Path(tmp)
                 compile_source_path = source_path
 
@@ -128,33 +237,55 @@ class RustCompiler:
                     cmd_with_outdir = cmd
 
                 run_cwd = self.working_dir or str(tmp_dir)
-                run_env = os.environ.copy()
-                if self.env:
-                    run_env.update(self.env)
+                run_env = self._get_run_env()
 
-                process = subprocess.Popen(
-                    cmd_with_outdir,
-                    cwd=run_cwd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    start_new_session=True,
-                    env=run_env,
-                )
-                try:
-                    stdout, stderr = process.communicate(timeout=self.timeout)
-                except subprocess.TimeoutExpired:
-                    self._terminate_process_tree(process.pid)
-                    self._kill_lingering_gccrs_workers(source_path)
-                    duration = time.time() - start_time
-                    self.logger.warning(f"Compilation timed out for {source_path}")
-                    return CompilationResult(
-                        status=CompilationStatus.HANG,
-                        return_code=None,
-                        stdout="",
-                        stderr="TimeoutExpired",
-                        duration=duration
+                # Every compiler process holds one global slot (shared by all workers).
+                with compile_slot():
+                    # Time the compiler itself, not the wait for a slot.
+                    start_time = time.time()
+                    if cancel_event is not None and cancel_event.is_set():
+                        return CompilationResult(
+                            status=CompilationStatus.UNKNOWN,
+                            return_code=None,
+                            stdout="",
+                            stderr="Cancelled",
+                            duration=0.0,
+                            cancelled=True,
+                        )
+                    process = subprocess.Popen(
+                        cmd_with_outdir,
+                        cwd=run_cwd,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        text=True,
+                        start_new_session=True,
+                        env=run_env,
                     )
+                    try:
+                        stdout, stderr = self._communicate(process, cancel_event)
+                    except _Cancelled:
+                        self._terminate_process_tree(process.pid)
+                        self._kill_lingering_gccrs_workers(source_path)
+                        return CompilationResult(
+                            status=CompilationStatus.UNKNOWN,
+                            return_code=None,
+                            stdout="",
+                            stderr="Cancelled",
+                            duration=time.time() - start_time,
+                            cancelled=True,
+                        )
+                    except subprocess.TimeoutExpired:
+                        self._terminate_process_tree(process.pid)
+                        self._kill_lingering_gccrs_workers(source_path)
+                        duration = time.time() - start_time
+                        self.logger.warning(f"Compilation timed out for {source_path}")
+                        return CompilationResult(
+                            status=CompilationStatus.HANG,
+                            return_code=None,
+                            stdout="",
+                            stderr="TimeoutExpired",
+                            duration=duration
+                        )
 
             duration = time.time() - start_time
 
@@ -202,6 +333,23 @@ class RustCompiler:
                 duration=duration
             )
 
+    def _communicate(self, process: subprocess.Popen, cancel_event: Optional[threading.Event]):
+        if cancel_event is None:
+            return process.communicate(timeout=self.timeout)
+        # Poll so a sibling verdict can cancel us; communicate() may be re-entered
+        # after TimeoutExpired without losing buffered output.
+        deadline = time.time() + self.timeout
+        while True:
+            if cancel_event.is_set():
+                raise _Cancelled()
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(process.args, self.timeout)
+            try:
+                return process.communicate(timeout=min(self.CANCEL_POLL_SEC, remaining))
+            except subprocess.TimeoutExpired:
+                continue
+
     def _make_no_core_variant(self, source_path: Path, tmp_dir: Path) -> Optional[Path]:
         try:
             text = source_path.read_text(encoding="utf-8", errors="ignore")
@@ -274,3 +422,262 @@ class RustCompiler:
                     continue
         except Exception:
             pass
+
+
+@dataclass
+class CompileMode:
+    name: str
+    compiler: RustCompiler
+    extra_args: List[str] = field(default_factory=list)
+    # Extra args for the check tier (e.g. ["--emit=metadata"]); None = full compile only.
+    check_args: Optional[List[str]] = None
+
+    @property
+    def command(self) -> List[str]:
+        return [*self.compiler.rustc_cmd, *self.extra_args]
+
+
+def _policy_wait_all(done: Dict[str, CompilationResult]) -> set:
+    return set()
+
+
+def _policy_next_needs_nightly(done: Dict[str, CompilationResult]) -> set:
+    # The next-solver run only adds information when plain nightly accepted the
+    # program (miscompilation oracle) or crashed (ICE triage); otherwise skip it.
+    nightly = done.get("nightly")
+    if nightly is not None and nightly.status not in (CompilationStatus.SUCCESS, CompilationStatus.CRASH):
+        return {"next"}
+    return set()
+
+
+def _policy_rustc_errors_agree(done: Dict[str, CompilationResult]) -> set:
+    # stable and nightly reject the program the same way: next-solver is noise.
+    stable = done.get("stable")
+    nightly = done.get("nightly")
+    if (
+        stable is not None
+        and nightly is not None
+        and stable.status == CompilationStatus.ERROR
+        and nightly.status == CompilationStatus.ERROR
+    ):
+        return {"next"}
+    return set()
+
+
+# Verdict policies: given the modes finished so far, return the modes whose
+# (pending or running) compiles no longer matter and can be cancelled.
+VERDICT_POLICIES = {
+    "wait_all": _policy_wait_all,
+    "next_needs_nightly": _policy_next_needs_nightly,
+    "rustc_errors_agree": _policy_rustc_errors_agree,
+}
+
+
+class CompilerMatrix:
+    """Pre-built compilers for every oracle mode (stable/nightly/next/gccrs).
+
+    Built once per worker: the per-mode `RustCompiler` objects and, when
+    `parallel` is set, one long-lived executor that runs the modes of a single
+    source concurrently. `compile_all()` is the per-variant hot path.
+    """
+
+    def __init__(
+        self,
+        parallel: bool = False,
+        max_workers: int = 3,
+        verdict_policy: str = "wait_all",
+        tiered: bool = False,
+        codegen_coverage: bool = False,
+        codegen_sample_rate: float = 0.0,
+    ):
+        self.modes: Dict[str, CompileMode] = {}
+        self.parallel = bool(parallel)
+        self.max_workers = max(1, int(max_workers))
+        # Tiered compile: modes with `check_args` are type-checked first and only
+        # escalate to full codegen when the check passes and either codegen
+        # coverage is requested or the variant falls in the sampled fraction.
+        self.tiered = bool(tiered)
+        self.codegen_coverage = bool(codegen_coverage)
+        self.codegen_sample_rate = min(1.0, max(0.0, float(codegen_sample_rate)))
+        self._tier_count: Dict[str, int] = {}
+        self._tier_time: Dict[str, float] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # compile_all() is first called concurrently from the pipeline's compile
+        # threads and the main loop; creation must not race.
+        self._executor_lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        if verdict_policy not in VERDICT_POLICIES:
+            self.logger.warning("Unknown verdict policy %r; using wait_all", verdict_policy)
+            verdict_policy = "wait_all"
+        self.verdict_policy_name = verdict_policy
+        self._policy = VERDICT_POLICIES[verdict_policy]
+
+        # Per-mode accounting for the policy: average duration of finished compiles
+        # (the estimate of what a cancelled compile would have cost), cancellations
+        # and estimated seconds saved.
+        self._stats_lock = threading.Lock()
+        self._mode_runs: Dict[str, int] = {}
+        self._mode_time: Dict[str, float] = {}
+        self._mode_cancelled: Dict[str, int] = {}
+        self._mode_saved: Dict[str, float] = {}
+
+    def add_mode(
+        self,
+        name: str,
+        compiler: RustCompiler,
+        extra_args: Optional[list] = None,
+        check_args: Optional[list] = None,
+    ):
+        self.modes[name] = CompileMode(
+            name=name,
+            compiler=compiler,
+            extra_args=list(extra_args or []),
+            check_args=list(check_args) if check_args else None,
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.modes
+
+    def command(self, name: str) -> List[str]:
+        return self.modes[name].command
+
+    def compile(self, name: str, source_path: Path, cancel_event: Optional[threading.Event] = None) -> CompilationResult:
+        mode = self.modes[name]
+        if self.tiered and mode.check_args:
+            result = mode.compiler.compile(
+                source_path,
+                extra_args=[*mode.extra_args, *mode.check_args],
+                cancel_event=cancel_event,
+            )
+            result.tier = "check"
+            self._record_tier(result)
+            escalate = self.codegen_coverage or (
+                self.codegen_sample_rate > 0 and random.random() < self.codegen_sample_rate
+            )
+            if result.status != CompilationStatus.SUCCESS or not escalate:
+                return result
+        result = mode.compiler.compile(source_path, extra_args=mode.extra_args or None, cancel_event=cancel_event)
+        result.tier = "full"
+        self._record_tier(result)
+        return result
+
+    def _record_tier(self, result: CompilationResult):
+        if result.cancelled or result.cached:
+            return
+        with self._stats_lock:
+            self._tier_count[result.tier] = self._tier_count.get(result.tier, 0) + 1
+            self._tier_time[result.tier] = self._tier_time.get(result.tier, 0.0) + float(result.duration)
+
+    def tier_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per tier: compiles, total seconds and throughput (compiles per compile-second)."""
+        with self._stats_lock:
+            return {
+                tier: {
+                    "compiles": n,
+                    "seconds": self._tier_time.get(tier, 0.0),
+                    "per_sec": n / max(1e-9, self._tier_time.get(tier, 0.0)),
+                }
+                for tier, n in self._tier_count.items()
+            }
+
+    def _expected_duration(self, name: str) -> float:
+        runs = self._mode_runs.get(name, 0)
+        return (self._mode_time.get(name, 0.0) / runs) if runs else 0.0
+
+    def _record_finished(self, name: str, result: CompilationResult):
+        if result.cancelled or result.cached:
+            return
+        with self._stats_lock:
+            self._mode_runs[name] = self._mode_runs.get(name, 0) + 1
+            self._mode_time[name] = self._mode_time.get(name, 0.0) + float(result.duration)
+
+    def _record_cancelled(self, name: str, elapsed: float, source_path: Path):
+        with self._stats_lock:
+            saved = max(0.0, self._expected_duration(name) - elapsed)
+            self._mode_cancelled[name] = self._mode_cancelled.get(name, 0) + 1
+            self._mode_saved[name] = self._mode_saved.get(name, 0.0) + saved
+        self.logger.debug(
+            "verdict policy %s: cancelled %s for %s after %.2fs (est. saved %.2fs)",
+            self.verdict_policy_name,
+            name,
+            Path(source_path).name,
+            elapsed,
+            saved,
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="compile-matrix",
+                )
+            return self._executor
+
+    def compile_all(
+        self,
+        source_path: Path,
+        modes: Optional[List[str]] = None,
+        apply_policy: bool = True,
+    ) -> Dict[str, CompilationResult]:
+        """Compile `source_path` under every mode (or `modes`), keyed by mode name.
+
+        With `apply_policy`, modes the verdict policy cancels are left out of the
+        result, exactly as if they were disabled.
+        """
+        names = [n for n in (modes if modes is not None else self.modes) if n in self.modes]
+        policy = self._policy if apply_policy else _policy_wait_all
+        done: Dict[str, CompilationResult] = {}
+
+        if not (self.parallel and len(names) > 1):
+            for n in names:
+                if n in policy(done):
+                    self._record_cancelled(n, 0.0, source_path)
+                    continue
+                done[n] = self.compile(n, source_path)
+                self._record_finished(n, done[n])
+            return done
+
+        ex = self._get_executor()
+        events = {n: threading.Event() for n in names}
+        started: Dict[str, float] = {}
+
+        def _run(n: str) -> CompilationResult:
+            started[n] = time.time()
+            return self.compile(n, source_path, cancel_event=events[n])
+
+        futures = {ex.submit(_run, n): n for n in names}
+        pending = set(futures)
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                n = futures[fut]
+                result = fut.result()
+                self._record_finished(n, result)
+                if not result.cancelled:
+                    done[n] = result
+            for n in policy(done):
+                if n in events and n not in done and not events[n].is_set():
+                    events[n].set()
+                    self._record_cancelled(n, time.time() - started.get(n, time.time()), source_path)
+        return {n: done[n] for n in names if n in done}
+
+    def format_stats(self) -> str:
+        with self._stats_lock:
+            parts = []
+            for n in self.modes:
+                parts.append(
+                    f"{n}: runs={self._mode_runs.get(n, 0)} avg={self._expected_duration(n):.2f}s "
+                    f"cancelled={self._mode_cancelled.get(n, 0)} saved={self._mode_saved.get(n, 0.0):.1f}s"
+                )
+        tiers = ", ".join(
+            f"{tier}={st['compiles']} ({st['per_sec']:.2f}/s)" for tier, st in sorted(self.tier_stats().items())
+        )
+        return f"compile matrix (policy={self.verdict_policy_name}, tiers: {tiers or '-'}): " + "; ".join(parts)
+
+    def close(self):
+        with self._executor_lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=True)
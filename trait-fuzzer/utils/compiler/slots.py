@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: slots degrade to a no-op
+    fcntl = None
+
+
+class CompileSlots:
+    """Cross-process cap on concurrently running compiler processes.
+
+    Each slot is a file `slot_<k>.json` in `slot_dir`, held with an exclusive
+    `flock` while a compiler process runs. Locks are released by the kernel if
+    the holder dies, so a crashed worker never leaks a slot. The slot file also
+    carries cumulative counters (busy seconds, acquisitions, wait seconds),
+    updated by the holder on release, which `utilization()` reads back.
+
+    The parent process calls `reset()` once before spawning workers; every
+    process then builds its own `CompileSlots` over the same directory. Slot
+    files are never unlinked: another campaign sharing the directory may hold
+    locks on them, and a fresh inode would give both campaigns the full count.
+    """
+
+    POLL_SEC = 0.05
+
+    def __init__(self, slot_dir: Path, slots: int):
+        self.slot_dir = Path(slot_dir)
+        self.slots = max(1, int(slots))
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["CompileSlots"]:
+        """`compiler.compile_slots_per_cpu` x os.cpu_count() slots; <= 0 disables the cap."""
+        per_cpu = float(config.get("compiler", {}).get("compile_slots_per_cpu", 1.0) or 0)
+        if per_cpu <= 0 or fcntl is None:
+            return None
+        slots = max(1, int(round(per_cpu * (os.cpu_count() or 1))))
+        slot_dir = Path(config.get("paths", {}).get("compile_slots", ".compile_slots"))
+        return cls(slot_dir, slots)
+
+    def _slot_path(self, k: int) -> Path:
+        return self.slot_dir / f"slot_{k}.json"
+
+    def reset(self):
+        """Zero every slot's counters in place, waiting out slots that are busy right now."""
+        self.slot_dir.mkdir(parents=True, exist_ok=True)
+        remaining = sorted(self.slot_dir.glob("slot_*.json"))
+        while remaining:
+            busy = []
+            for p in remaining:
+                try:
+                    f = open(p, "a+", encoding="utf-8")
+                except Exception:
+                    continue
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    f.close()
+                    busy.append(p)
+                    continue
+                try:
+                    f.seek(0)
+                    f.truncate()
+                    f.flush()
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    f.close()
+            remaining = busy
+            if remaining:
+                time.sleep(self.POLL_SEC)
+        (self.slot_dir / "epoch").write_text(f"{time.time():.3f}\n", encoding="utf-8")
+
+    def _epoch(self) -> Optional[float]:
+        try:
+            return float((self.slot_dir / "epoch").read_text(encoding="utf-8").strip())
+        except Exception:
+            return None
+
+    @staticmethod
+    def _read_counters(f) -> Dict[str, float]:
+        try:
+            f.seek(0)
+            data = json.loads(f.read() or "{}")
+            if isinstance(data, dict):
+                return data
+        except Exception:
+            pass
+        return {}
+
+    @contextmanager
+    def acquire(self):
+        """Block until a slot is free and hold it for the duration of the `with` body."""
+        self.slot_dir.mkdir(parents=True, exist_ok=True)
+        start = time.time()
+        # Start probing at a random slot so workers do not all contend on slot 0.
+        offset = random.randrange(self.slots)
+        handle = None
+        slot = -1
+        while handle is None:
+            for j in range(self.slots):
+                k = (offset + j) % self.slots
+                f = open(self._slot_path(k), "a+", encoding="utf-8")
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    f.close()
+                    continue
+                handle, slot = f, k
+                break
+            if handle is None:
+                time.sleep(self.POLL_SEC)
+
+        acquired = time.time()
+        try:
+            yield slot
+        finally:
+            try:
+                counters = self._read_counters(handle)
+                counters["busy_sec"] = float(counters.get("busy_sec", 0.0)) + (time.time() - acquired)
+                counters["wait_sec"] = float(counters.get("wait_sec", 0.0)) + (acquired - start)
+                counters["acquisitions"] = int(counters.get("acquisitions", 0)) + 1
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(counters))
+                handle.flush()
+            except Exception:
+                pass
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            finally:
+                handle.close()
+
+    def utilization(self) -> List[Dict[str, float]]:
+        """Per-slot counters plus `util` = busy time / time since `reset()`."""
+        epoch = self._epoch()
+        elapsed = max(1e-6, time.time() - epoch) if epoch is not None else None
+        rows = []
+        for k in range(self.slots):
+            counters: Dict[str, float] = {}
+            try:
+                with open(self._slot_path(k), "r", encoding="utf-8") as f:
+                    counters = self._read_counters(f)
+            except Exception:
+                pass
+            busy = float(counters.get("busy_sec", 0.0))
+            rows.append({
+                "slot": k,
+                "busy_sec": busy,
+                "wait_sec": float(counters.get("wait_sec", 0.0)),
+                "acquisitions": int(counters.get("acquisitions", 0)),
+                "util": (busy / elapsed) if elapsed else 0.0,
+            })
+        return rows
+
+    def format_utilization(self) -> str:
+        rows = self.utilization()
+        if not rows:
+            return "compile slots: none"
+        total_util = sum(r["util"] for r in rows) / len(rows)
+        total_acq = sum(r["acquisitions"] for r in rows)
+        total_wait = sum(r["wait_sec"] for r in rows)
+        per_slot = " ".join(f"{r['slot']}:{r['util'] * 100:.0f}%" for r in rows)
+        return (
+            f"compile slots: {len(rows)} slots, avg util={total_util * 100:.1f}%, "
+            f"compiles={total_acq}, avg wait={total_wait / max(1, total_acq):.3f}s | {per_slot}"
+        )
+
+
+_active_slots: Optional[CompileSlots] = None
+_active_lock = threading.Lock()
+
+
+def configure_compile_slots(slots: Optional[CompileSlots]):
+    """Install the process-wide scheduler that every `RustCompiler.compile` draws from."""
+    global _active_slots
+    with _active_lock:
+        _active_slots = slots
+
+
+def get_compile_slots() -> Optional[CompileSlots]:
+    return _active_slots
+
+
+@contextmanager
+def compile_slot():
+    """Hold one global compile slot (no-op when no scheduler is configured)."""
+    slots = _active_slots
+    if slots is None:
+        yield None
+        return
+    with slots.acquire() as k:
+        yield k
@@ -0,0 +1,82 @@
+"""Flow control and feedback between the fuzzing workers and the live coverage consumer.
+
+The consumer owns the flag: it touches `<case_dir>/.backpressure` on every poll
+while too many cases are queued and removes it once the queue has drained.
+Producers check it before queueing another case.
+
+Coverage flows back through `<work_dir>/coverage_feedback.jsonl`: after each
+merge the consumer appends one record per case, and every worker tails the
+file for the variants it queued.
+"""
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+BACKPRESSURE_FLAG = ".backpressure"
+# A flag older than this is left over from a consumer that died; ignore it
+# rather than stall the fuzzer.
+BACKPRESSURE_STALE_SEC = 30.0
+
+
+def backpressure_active(case_dir: Path) -> bool:
+    """True while the consumer asks producers to stop queueing cases into `case_dir`."""
+    try:
+        age = time.time() - (Path(case_dir) / BACKPRESSURE_FLAG).stat().st_mtime
+    except OSError:
+        return False
+    return age < BACKPRESSURE_STALE_SEC
+
+
+def wait_for_queue_room(case_dir: Path, max_wait_sec: float, poll_sec: float = 0.5) -> float:
+    """Block while backpressure is active, at most `max_wait_sec`; returns seconds waited."""
+    start = time.time()
+    while backpressure_active(case_dir) and time.time() - start < max_wait_sec:
+        time.sleep(poll_sec)
+    return time.time() - start
+
+
+FEEDBACK_FILENAME = "coverage_feedback.jsonl"
+
+
+def append_feedback(path: Path, records: Iterable[Dict]) -> None:
+    """Append per-case records ({"worker", "variant_id", "rustc_exit", "new_counters", ...})."""
+    lines = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+    if lines:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class FeedbackReader:
+    """Tails the feedback file; starts at its current end, so old runs are not replayed."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            self._offset = self.path.stat().st_size
+        except OSError:
+            self._offset = 0
+
+    def poll(self) -> List[Dict]:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return []
+        if size < self._offset:
+            # Truncated or replaced by a fresh consumer run.
+            self._offset = 0
+        if size == self._offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        # A record still being written has no newline yet; leave it for the next poll.
+        end = chunk.rfind(b"\n") + 1
+        self._offset += end
+        out = []
+        for line in chunk[:end].splitlines():
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                pass
+        return out
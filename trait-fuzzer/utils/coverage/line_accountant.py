@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""Incremental line coverage from profraw counters, without `llvm-cov export`.
+
+The instrumented objects (rustc, librustc_driver-*.so) carry their coverage
+mapping in the `__llvm_covmap` / `__llvm_covfun` ELF sections: per function,
+regions of source (file, line span) attached to a counter or to an expression
+over counters. `LineAccountant` indexes those records once, and then, for each
+case, evaluates the regions that have not run yet of the functions the case
+entered, using the case's own counts, and ORs the lines of newly run regions
+into one Python-int bitset per file (bit L = line L). A function is decoded on
+first use and skipped once all of its regions have run.
+
+Executable lines per file are the union of the code/gap region spans, computed
+once per object and cached next to the live reports. Line counts follow
+llvm-cov's rule (max of the regions starting on the line and the region
+wrapping it) closely but not exactly, so totals can differ from a full export
+by a fraction of a percent. The live consumer also writes `*_exact` summary
+files from a full export every so often (see rustc_multi_case_coverage.py).
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from profraw_counters import RawProfile
+
+# Counter encoding (llvm/ProfileData/Coverage/CoverageMapping.h).
+_TAG_ZERO, _TAG_COUNTER, _TAG_SUB, _TAG_ADD = 0, 1, 2, 3
+_EXPANSION_BIT = 1 << 2
+_KIND_SHIFT = 3
+_CODE, _EXPANSION, _SKIPPED, _GAP, _BRANCH, _MCDC_DECISION, _MCDC_BRANCH = range(7)
+_GAP_BIT = 1 << 31
+
+# covmap header Version field is zero-based: 3 == format version 4 (separate covfun section).
+_MIN_COVMAP_VERSION = 3
+# From format version 6 on, filenames[0] is the compilation directory.
+_COMP_DIR_VERSION = 5
+
+_SHF_COMPRESSED = 0x800
+
+
+def _uleb(buf: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _md5_low64(blob: bytes) -> int:
+    return int.from_bytes(hashlib.md5(blob).digest()[:8], "little")
+
+
+def elf_sections(path: Path, names: Iterable[str]) -> Dict[str, bytes]:
+    """Contents of the named sections of a 64-bit little-endian ELF file (missing ones omitted)."""
+    wanted = set(names)
+    out: Dict[str, bytes] = {}
+    with open(path, "rb") as f:
+        ident = f.read(64)
+        if len(ident) < 64 or ident[:4] != b"\x7fELF" or ident[4] != 2 or ident[5] != 1:
+            return out
+        shoff = struct.unpack_from("<Q", ident, 0x28)[0]
+        shentsize, shnum, shstrndx = struct.unpack_from("<HHH", ident, 0x3A)
+        f.seek(shoff)
+        table = f.read(shentsize * shnum)
+        headers = [struct.unpack_from("<IIQQQQ", table, i * shentsize) for i in range(shnum)]
+        _n, _t, _fl, _a, str_off, str_size = headers[shstrndx]
+        f.seek(str_off)
+        strtab = f.read(str_size)
+        for name_off, _type, flags, _addr, offset, size in headers:
+            name = strtab[name_off:strtab.index(b"\0", name_off)].decode("ascii", errors="replace")
+            if name not in wanted:
+                continue
+            f.seek(offset)
+            raw = f.read(size)
+            if flags & _SHF_COMPRESSED:
+                ch_type = struct.unpack_from("<I", raw, 0)[0]
+                if ch_type != 1:  # ELFCOMPRESS_ZLIB
+                    continue
+                raw = zlib.decompress(raw[24:])
+            out[name] = raw
+    return out
+
+
+def _decode_filenames(blob: bytes, version: int) -> List[str]:
+    n, pos = _uleb(blob, 0)
+    _raw_len, pos = _uleb(blob, pos)
+    compressed_len, pos = _uleb(blob, pos)
+    if compressed_len:
+        buf = zlib.decompress(blob[pos:pos + compressed_len])
+        pos = 0
+    else:
+        buf = blob
+    names = []
+    for _ in range(n):
+        ln, pos = _uleb(buf, pos)
+        names.append(buf[pos:pos + ln].decode("utf-8", errors="replace"))
+        pos += ln
+    if version >= _COMP_DIR_VERSION and names:
+        comp_dir = names[0]
+        names = [names[0]] + [
+            p if (not comp_dir or os.path.isabs(p)) else os.path.join(comp_dir, p) for p in names[1:]
+        ]
+    return names
+
+
+def _decode_counter(buf: bytes, pos: int) -> Tuple[Tuple[int, int], int]:
+    v, pos = _uleb(buf, pos)
+    return (v & 3, v >> 2), pos
+
+
+def decode_mapping(buf: bytes) -> Tuple[List[int], List[Tuple], List[Tuple]]:
+    """(file id -> filename index, expressions, regions) of one function's mapping.
+
+    Regions are (file id, kind, counter, line start, col start, line end, col end);
+    counters are (tag, index) pairs.
+    """
+    n_files, pos = _uleb(buf, 0)
+    file_ids = []
+    for _ in range(n_files):
+        idx, pos = _uleb(buf, pos)
+        file_ids.append(idx)
+    n_expr, pos = _uleb(buf, pos)
+    exprs = []
+    for _ in range(n_expr):
+        lhs, pos = _decode_counter(buf, pos)
+        rhs, pos = _decode_counter(buf, pos)
+        exprs.append((lhs, rhs))
+    regions = []
+    for file_id in range(n_files):
+        n_regions, pos = _uleb(buf, pos)
+        line = 0
+        for _ in range(n_regions):
+            enc, pos = _uleb(buf, pos)
+            kind = _CODE
+            counter = (enc & 3, enc >> 2)
+            if counter[0] == _TAG_ZERO:
+                counter = (_TAG_ZERO, 0)
+                if enc & _EXPANSION_BIT:
+                    kind = _EXPANSION
+                else:
+                    kind = enc >> _KIND_SHIFT
+                    if kind in (_BRANCH, _MCDC_BRANCH):
+                        counter, pos = _decode_counter(buf, pos)
+                        _false, pos = _decode_counter(buf, pos)
+                        if kind == _MCDC_BRANCH:
+                            for _ in range(3):
+                                _v, pos = _uleb(buf, pos)
+                    elif kind == _MCDC_DECISION:
+                        for _ in range(2):
+                            _v, pos = _uleb(buf, pos)
+            delta, pos = _uleb(buf, pos)
+            col_start, pos = _uleb(buf, pos)
+            n_lines, pos = _uleb(buf, pos)
+            col_end, pos = _uleb(buf, pos)
+            if col_end & _GAP_BIT:
+                kind = _GAP
+                col_end &= ~_GAP_BIT
+            line += delta
+            if col_start == 0 and col_end == 0:
+                col_start, col_end = 1, 1 << 31
+            regions.append((file_id, kind, counter, line, col_start, line + n_lines, col_end))
+    return file_ids, exprs, regions
+
+
+def _evaluate(counter: Tuple[int, int], exprs: List[Tuple], counts: List[int], memo: Dict[int, int]) -> int:
+    tag, idx = counter
+    if tag == _TAG_COUNTER:
+        return counts[idx] if idx < len(counts) else 0
+    if tag == _TAG_ZERO:
+        return 0
+    if idx in memo:
+        return memo[idx]
+    lhs, rhs = exprs[idx]
+    a = _evaluate(lhs, exprs, counts, memo)
+    b = _evaluate(rhs, exprs, counts, memo)
+    value = max(0, a - b) if tag == _TAG_SUB else a + b
+    memo[idx] = value
+    return value
+
+
+def covered_lines(regions: List[Tuple], hit: int) -> Dict[int, int]:
+    """file id -> bitset of covered lines, given the regions (bit i = regions[i]) with a non-zero count.
+
+    A line is covered when the region wrapping its start or a code region
+    starting on it ran. Only whether a count is non-zero matters, so the
+    lines of a merged profile follow from the union of regions hit by each run.
+    """
+    by_file: Dict[int, List[Tuple[int, int, int, int, int, bool]]] = {}
+    for i, (file_id, kind, _counter, l0, c0, l1, c1) in enumerate(regions):
+        if kind in (_CODE, _GAP, _SKIPPED):
+            by_file.setdefault(file_id, []).append((l0, c0, l1, c1, kind, bool(hit >> i & 1)))
+
+    out: Dict[int, int] = {}
+    for file_id, regs in by_file.items():
+        if not any(r[5] for r in regs):
+            continue
+        # Starts sorted by position; ties put the enclosing (longer) region first.
+        regs.sort(key=lambda r: (r[0], r[1], -r[2], -r[3]))
+        starts_at: Dict[int, List[Tuple]] = {}
+        for r in regs:
+            starts_at.setdefault(r[0], []).append(r)
+        bits = 0
+        # Sweep lines with a stack of open regions; the top is the innermost one
+        # wrapping the start of the current line (regions nest in practice).
+        stack: List[Tuple] = []
+        j = 0
+        for line in range(regs[0][0], max(r[2] for r in regs) + 1):
+            while j < len(regs) and regs[j][0] < line:
+                stack.append(regs[j])
+                j += 1
+            while stack and not (stack[-1][2] > line or (stack[-1][2] == line and stack[-1][3] > 1)):
+                stack.pop()
+            wrapped = stack[-1] if stack else None
+            ran = wrapped is not None and wrapped[4] != _SKIPPED and wrapped[5]
+            if not ran:
+                ran = any(r[4] == _CODE and r[5] for r in starts_at.get(line, ()))
+            if ran:
+                bits |= 1 << line
+        if bits:
+            out[file_id] = bits
+    return out
+
+
+class _Function:
+    """Decoded mapping of one function plus which of its regions have run so far."""
+
+    __slots__ = ("file_ids", "exprs", "regions", "names", "countable", "hit")
+
+    def __init__(self, mapping: bytes, names: List[str]):
+        self.file_ids, self.exprs, self.regions = decode_mapping(mapping)
+        self.names = names
+        # Regions that can ever run: code/gap regions not tied to the Zero counter.
+        self.countable = 0
+        for i, (_f, kind, counter, *_span) in enumerate(self.regions):
+            if kind in (_CODE, _GAP) and counter[0] != _TAG_ZERO:
+                self.countable |= 1 << i
+        self.hit = 0
+
+    def complete(self) -> bool:
+        return self.hit == self.countable
+
+    def update(self, counts: List[int]) -> bool:
+        """Mark the not-yet-hit regions with a non-zero count under `counts`; True if any."""
+        memo: Dict[int, int] = {}
+        todo = self.countable & ~self.hit
+        fresh = 0
+        while todo:
+            low = todo & -todo
+            i = low.bit_length() - 1
+            todo ^= low
+            if _evaluate(self.regions[i][2], self.exprs, counts, memo) > 0:
+                fresh |= low
+        self.hit |= fresh
+        return bool(fresh)
+
+
+class _Module:
+    """Per-profraw-module lookup from counter index to the owning function."""
+
+    def __init__(self, prof: RawProfile):
+        funcs = sorted(prof.functions(), key=lambda f: f[2])
+        self.starts = [f[2] for f in funcs]
+        self.funcs = funcs
+
+    def functions_hit(self, mask: int) -> List[Tuple[int, int, int, int]]:
+        """Data records of the functions with at least one counter set in `mask`."""
+        # Bit 8*i of the mask is counter i, so its bytes are one 0/1 flag per counter.
+        flags = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        hit = []
+        pos = flags.find(1)
+        while pos >= 0:
+            i = bisect.bisect_right(self.starts, pos) - 1
+            end = pos + 1
+            if i >= 0:
+                f = self.funcs[i]
+                if pos < f[2] + f[3]:
+                    hit.append(f)
+                    # The function's other counters need no second lookup.
+                    end = f[2] + f[3]
+            pos = flags.find(1, end)
+        return hit
+
+
+class LineAccountant:
+    """Covered lines per source file, updated from each case's new counters."""
+
+    def __init__(self):
+        self.filenames: Dict[int, List[str]] = {}  # FilenamesRef -> names
+        # (NameRef, FuncHash) -> (covfun bytes, offset, size, FilenamesRef)
+        self.functions: Dict[Tuple[int, int], Tuple[bytes, int, int, int]] = {}
+        self.executable: Dict[str, int] = {}
+        self.covered: Dict[str, int] = {}
+        self.line_count = 0
+        self.line_covered = 0
+        self._modules: Dict[str, _Module] = {}
+        self._state: Dict[Tuple[int, int], _Function] = {}
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[str], cache_dir: Optional[Path] = None) -> Optional["LineAccountant"]:
+        """Index the coverage mapping of `objects`; None if none of them has one."""
+        acc = cls()
+        for obj in objects:
+            try:
+                sections = elf_sections(Path(obj), ("__llvm_covmap", "__llvm_covfun"))
+            except OSError:
+                continue
+            covmap = sections.get("__llvm_covmap")
+            covfun = sections.get("__llvm_covfun")
+            if not covmap or not covfun:
+                continue
+            if not acc._add_covmap(covmap):
+                continue
+            acc._add_covfun(covfun)
+            acc._add_executable(obj, covfun, cache_dir)
+        if not acc.functions:
+            return None
+        acc.line_count = sum(bits.bit_count() for bits in acc.executable.values())
+        return acc
+
+    def _add_covmap(self, covmap: bytes) -> bool:
+        off = 0
+        added = False
+        while off + 16 <= len(covmap):
+            _n, filenames_size, coverage_size, version = struct.unpack_from("<IIII", covmap, off)
+            if version < _MIN_COVMAP_VERSION:
+                return False
+            blob = covmap[off + 16:off + 16 + filenames_size]
+            self.filenames[_md5_low64(blob)] = _decode_filenames(blob, version)
+            added = True
+            off += 16 + filenames_size + coverage_size
+            off = (off + 7) & ~7
+        return added
+
+    def _add_covfun(self, covfun: bytes):
+        off = 0
+        while off + 28 <= len(covfun):
+            name_ref, size, func_hash, filenames_ref = struct.unpack_from("<QIQQ", covfun, off)
+            if size:
+                self.functions.setdefault((name_ref, func_hash), (covfun, off + 28, size, filenames_ref))
+            off = (off + 28 + size + 7) & ~7
+
+    def _add_executable(self, obj: str, covfun: bytes, cache_dir: Optional[Path]):
+        """Union of code/gap region spans per file, cached per object (path, size, mtime)."""
+        st = os.stat(obj)
+        ident = f"{Path(obj).resolve()}:{st.st_size}:{int(st.st_mtime)}"
+        cache = None
+        if cache_dir is not None:
+            cache = Path(cache_dir) / f"line_map_{hashlib.sha1(ident.encode()).hexdigest()[:16]}.json"
+            try:
+                payload = json.loads(cache.read_text(encoding="utf-8"))
+                if payload.get("object") == ident:
+                    for name, hexbits in payload["executable"].items():
+                        self.executable[name] = self.executable.get(name, 0) | int(hexbits, 16)
+                    return
+            except (OSError, ValueError, KeyError):
+                pass
+
+        spans: Dict[str, int] = {}
+        off = 0
+        while off + 28 <= len(covfun):
+            _name_ref, size, _func_hash, filenames_ref = struct.unpack_from("<QIQQ", covfun, off)
+            names = self.filenames.get(filenames_ref)
+            if size and names is not None:
+                file_ids, _exprs, regions = decode_mapping(covfun[off + 28:off + 28 + size])
+                for file_id, kind, _c, l0, _c0, l1, _c1 in regions:
+                    if kind not in (_CODE, _GAP):
+                        continue
+                    name = names[file_ids[file_id]]
+                    spans[name] = spans.get(name, 0) | (((1 << (l1 - l0 + 1)) - 1) << l0)
+            off = (off + 28 + size + 7) & ~7
+        for name, bits in spans.items():
+            self.executable[name] = self.executable.get(name, 0) | bits
+        if cache is not None:
+            try:
+                cache.write_text(
+                    json.dumps({"object": ident, "executable": {n: format(b, "x") for n, b in spans.items()}}),
+                    encoding="utf-8",
+                )
+            except OSError:
+                pass
+
+    def absorb(self, prof: RawProfile, mask: int) -> int:
+        """Add one profile (`mask` = its covered counters); returns newly covered lines.
+
+        Every function the profile entered is considered, not only those with
+        new counters: a region counted by an expression (an `else` arm is
+        `parent - then`) can start running without any new counter.
+        Functions whose regions have all run are skipped.
+        """
+        module = self._modules.get(prof.module)
+        if module is None:
+            module = self._modules[prof.module] = _Module(prof)
+        new_lines = 0
+        for name_ref, func_hash, start, n in module.functions_hit(mask):
+            key = (name_ref, func_hash)
+            fn = self._state.get(key)
+            if fn is None:
+                record = self.functions.get(key)
+                names = self.filenames.get(record[3]) if record is not None else None
+                if names is None:
+                    continue
+                covfun, off, size, _ref = record
+                fn = self._state[key] = _Function(covfun[off:off + size], names)
+            if fn.complete():
+                continue
+            if not fn.update([prof.count(start + k) for k in range(n)]):
+                continue
+            for file_id, bits in covered_lines(fn.regions, fn.hit).items():
+                name = fn.names[fn.file_ids[file_id]]
+                bits &= self.executable.get(name, 0)
+                old = self.covered.get(name, 0)
+                fresh = bits & ~old
+                if fresh:
+                    self.covered[name] = old | bits
+                    added = fresh.bit_count()
+                    new_lines += added
+                    self.line_covered += added
+        return new_lines
+
+    def totals(self) -> Dict[str, float]:
+        """Same shape as rustc_multi_case_coverage.totals_from_export."""
+        count = self.line_count
+        covered = self.line_covered
+        return {
+            "line_count": count,
+            "line_covered": covered,
+            "line_missed": max(0, count - covered),
+            "line_percent": (covered * 100.0 / count) if count else 0.0,
+        }
+
+    def export_payload(self) -> Dict:
+        """A `llvm-cov export -summary-only`-shaped payload (lines only)."""
+        files = []
+        for name, bits in self.executable.items():
+            count = bits.bit_count()
+            covered = self.covered.get(name, 0).bit_count()
+            files.append(
+                {
+                    "filename": name,
+                    "summary": {
+                        "lines": {
+                            "count": count,
+                            "covered": covered,
+                            "percent": (covered * 100.0 / count) if count else 0.0,
+                        }
+                    },
+                }
+            )
+        t = self.totals()
+        lines = {"count": t["line_count"], "covered": t["line_covered"], "percent": t["line_percent"]}
+        return {"data": [{"files": files, "totals": {"lines": lines}}]}
+
+    def save(self, path: Path):
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps({"covered": {n: format(b, "x") for n, b in self.covered.items()}}),
+            encoding="utf-8",
+        )
+        tmp.replace(path)
+
+    def load(self, path: Path) -> bool:
+        """Restore covered lines saved by `save`; False if there was nothing to load."""
+        try:
+            payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        self.covered = {
+            n: int(h, 16) & self.executable.get(n, 0) for n, h in payload.get("covered", {}).items()
+        }
+        self.line_covered = sum(b.bit_count() for b in self.covered.values())
+        return True
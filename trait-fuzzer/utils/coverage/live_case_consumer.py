@@ -5,11 +5,14 @@ import argparse
 import csv
 import json
 import os
+import queue
 import random
 import re
 import shutil
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
@@ -23,6 +26,9 @@ from rustc_multi_case_coverage import (
     infer_sysroot_from_rustc,
     totals_from_export,
 )
+from case_queue import BACKPRESSURE_FLAG, FEEDBACK_FILENAME, append_feedback
+from line_accountant import LineAccountant
+from profraw_counters import CounterCoverage
 
 
 class DirLock:
@@ -79,6 +85,27 @@ def append_timeline_row(path: Path, row: Dict[str, object]) -> None:
         )
 
 
+def append_attribution_row(path: Path, row: Dict[str, object]) -> None:
+    exists = path.exists()
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if not exists:
+            w.writerow(
+                ["timestamp", "worker", "variant_id", "rustc_exit", "new_counters", "covered_counters", "new_lines"]
+            )
+        w.writerow(
+            [
+                row.get("timestamp", ""),
+                row.get("worker", ""),
+                row.get("variant_id", ""),
+                row.get("rustc_exit", ""),
+                row.get("new_counters", 0),
+                row.get("covered_counters", 0),
+                row.get("new_lines", ""),
+            ]
+        )
+
+
 def write_component_csv(path: Path, rows: List[Dict[str, object]]) -> None:
     with open(path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
@@ -95,6 +122,16 @@ def write_component_csv(path: Path, rows: List[Dict[str, object]]) -> None:
             )
 
 
+def write_summary_files(total_json: Path, components_json: Path, components_csv: Path, payload: Dict):
+    """Write totals and per-component rows of an export-shaped payload; returns the totals."""
+    totals = totals_from_export(payload)
+    comps = component_summary_from_export(payload)
+    total_json.write_text(json.dumps(totals, ensure_ascii=False, indent=2), encoding="utf-8")
+    components_json.write_text(json.dumps(comps, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_component_csv(components_csv, comps)
+    return totals
+
+
 def parse_case_meta(case_path: Path):
     stem = case_path.stem
     worker = 0
@@ -130,7 +167,44 @@ def main() -> int:
         "--summary-every",
         type=int,
         default=20,
-        help="Run expensive llvm-cov summary export every N merged cases",
+        help="Without line accounting: run the expensive llvm-cov summary export every N merged cases",
+    )
+    parser.add_argument(
+        "--exact-every",
+        type=int,
+        default=1000,
+        help="With line accounting: also write summary_*_exact.{json,csv} from a full llvm-cov export "
+        "every N merged cases (0 disables)",
+    )
+    parser.add_argument(
+        "--line-accounting",
+        choices=["auto", "off"],
+        default="auto",
+        help="auto: keep line coverage incrementally from the objects' coverage mapping, so the "
+        "timeline and summary files are updated for every case without llvm-cov export (falls back "
+        "to export if there is none). These totals follow llvm-cov's line rule closely but not "
+        "exactly and can differ from an export by a fraction of a percent; see --exact-every. "
+        "off: always use llvm-cov export",
+    )
+    parser.add_argument(
+        "--batch-cases",
+        type=int,
+        default=16,
+        help="Merge profraws into total.profdata once this many cases are pending",
+    )
+    parser.add_argument(
+        "--batch-seconds",
+        type=float,
+        default=30.0,
+        help="Merge pending profraws at least this often even if the batch is not full",
+    )
+    parser.add_argument("--merge-threads", type=int, default=4, help="llvm-profdata merge --num-threads")
+    parser.add_argument("--jobs", type=int, default=4, help="Instrumented rustc compiles run concurrently")
+    parser.add_argument(
+        "--max-queued",
+        type=int,
+        default=512,
+        help="Ask producers to pause while more than this many cases are queued (0 disables)",
     )
     args = parser.parse_args()
 
@@ -140,9 +214,16 @@ def main() -> int:
     tmp_dir = work_dir / "tmp"
     total_profdata = work_dir / "total.profdata"
     timeline_csv = work_dir / "timeline_total.csv"
+    attribution_csv = work_dir / "attribution.csv"
+    feedback_file = work_dir / FEEDBACK_FILENAME
+    counters_file = work_dir / "counter_masks.bin"
+    line_state_file = work_dir / "line_coverage.json"
     summary_total_json = work_dir / "summary_total.json"
     summary_components_json = work_dir / "summary_components.json"
     summary_components_csv = work_dir / "summary_components.csv"
+    exact_total_json = work_dir / "summary_total_exact.json"
+    exact_components_json = work_dir / "summary_components_exact.json"
+    exact_components_csv = work_dir / "summary_components_exact.csv"
     lock_dir = work_dir / "stats_lock.dir"
     failed_dir = work_dir / "failed_cases"
     claimed_keys_file = work_dir / "claimed_iter_keys.txt"
@@ -174,11 +255,19 @@ def main() -> int:
 
     # Stale raw profiles from previous interrupted runs can grow very large.
     # We keep incremental state in total.profdata, so it's safe to drop leftovers here.
-    for stale in profraw_dir.glob("*.profraw"):
+    for stale in profraw_dir.iterdir():
         try:
-            stale.unlink()
+            if stale.is_dir():
+                shutil.rmtree(stale)
+            else:
+                stale.unlink()
         except Exception:
             pass
+    backpressure_flag = case_dir / BACKPRESSURE_FLAG
+    try:
+        backpressure_flag.unlink()
+    except Exception:
+        pass
 
     claimed_iter_keys = set()
     if claimed_keys_file.exists():
@@ -203,6 +292,7 @@ def main() -> int:
 
     merged_counter = 0
     summary_every = max(1, int(args.summary_every))
+    exact_every = max(0, int(args.exact_every))
 
     def load_last_totals() -> Dict[str, float]:
         if summary_total_json.exists():
@@ -237,15 +327,345 @@ def main() -> int:
 
     cov_objects = collect_cov_objects(rustc_bin, sysroot_arg)
 
+    batch_cases = max(1, int(args.batch_cases))
+    batch_seconds = max(0.0, float(args.batch_seconds))
+    merge_threads = max(1, int(args.merge_threads))
+
+    # Counters hit so far, for per-case "new coverage" without touching total.profdata.
+    counter_cov = CounterCoverage.load(counters_file)
+
+    # Covered lines per file, updated per case from the same profraws (see line_accountant.py).
+    line_acc = None
+    if args.line_accounting != "off":
+        started = time.time()
+        try:
+            line_acc = LineAccountant.from_objects(cov_objects, cache_dir=work_dir)
+        except Exception as e:
+            print(f"[consumer] line accounting unavailable: {e}")
+        if line_acc is None:
+            print("[consumer] no usable coverage mapping; using llvm-cov export for summaries")
+        else:
+            line_acc.load(line_state_file)
+            print(
+                f"[consumer] line accounting: {len(line_acc.functions)} functions, "
+                f"{line_acc.line_count} lines ({time.time() - started:.1f}s)"
+            )
+    pending: List[Dict[str, object]] = []
+    batch_started = 0.0
+
+    def flush_batch() -> None:
+        """Merge every pending case's profraws into total.profdata with one llvm-profdata run."""
+        nonlocal merged_counter, last_totals
+        if not pending:
+            return
+        batch = list(pending)
+        inputs = [str(p) for c in batch for p in c["profraw"]]
+        ts = int(time.time() * 1000)
+        snapshot_profdata = tmp_dir / f"snapshot_{ts}.profdata"
+        merged_tmp = tmp_dir / f"total_{ts}.profdata"
+        input_list = tmp_dir / f"inputs_{ts}.txt"
+
+        merge_cmd = [llvm_profdata, "merge", "-sparse", f"--num-threads={merge_threads}"]
+        if len(inputs) > 64:
+            input_list.write_text("\n".join(inputs) + "\n", encoding="utf-8")
+            merge_cmd.extend(["-f", str(input_list)])
+        else:
+            merge_cmd.extend(inputs)
+        merge_cmd.extend(["-o", str(merged_tmp)])
+
+        try:
+            try:
+                with DirLock(lock_dir, timeout=180.0):
+                    if total_profdata.exists():
+                        merge_cmd.insert(4, str(total_profdata))
+                    merge_res = subprocess.run(merge_cmd, capture_output=True, text=True)
+                    merged = merge_res.returncode == 0
+                    if merged:
+                        merged_tmp.replace(total_profdata)
+                        shutil.copy2(total_profdata, snapshot_profdata)
+            except TimeoutError:
+                # Keep the batch pending; the next flush retries it.
+                return
+
+            pending.clear()
+            for c in batch:
+                shutil.rmtree(c["profraw_dir"], ignore_errors=True)
+
+            if not merged:
+                print(f"[consumer] batch merge failed ({len(batch)} cases): {merge_res.stderr[:300]}")
+                for c in batch:
+                    try:
+                        c["case"].rename(failed_dir / c["case"].name)
+                    except Exception:
+                        pass
+                return
+
+            before = merged_counter
+            merged_counter += len(batch)
+            should_export = line_acc is not None or (
+                (before // summary_every != merged_counter // summary_every)
+                or (not summary_total_json.exists())
+                or (not summary_components_json.exists())
+                or (not summary_components_csv.exists())
+            )
+            if should_export:
+                if line_acc is not None:
+                    payload = line_acc.export_payload()
+                else:
+                    payload = export_summary_json(llvm_cov, snapshot_profdata, cov_objects)
+                last_totals = write_summary_files(
+                    summary_total_json, summary_components_json, summary_components_csv, payload
+                )
+            # The incremental totals are close to but not exactly llvm-cov's; an exact
+            # export alongside them, at a much lower cadence, keeps figures reproducible.
+            if line_acc is not None and exact_every and (
+                before // exact_every != merged_counter // exact_every or not exact_total_json.exists()
+            ):
+                try:
+                    write_summary_files(
+                        exact_total_json,
+                        exact_components_json,
+                        exact_components_csv,
+                        export_summary_json(llvm_cov, snapshot_profdata, cov_objects),
+                    )
+                except Exception as e:
+                    print(f"[consumer] exact summary export failed: {e}")
+
+            now = datetime.now().isoformat(timespec="seconds")
+            for c in batch:
+                # With line accounting every case has its own cumulative totals.
+                totals = c["totals"] or last_totals
+                append_timeline_row(
+                    timeline_csv,
+                    {
+                        "timestamp": c["at"] if c["totals"] else now,
+                        "worker": c["worker"],
+                        "variant_id": c["variant"],
+                        "rustc_exit": c["rustc_exit"],
+                        "cumulative_line_count": totals.get("line_count", 0),
+                        "cumulative_line_covered": totals.get("line_covered", 0),
+                        "cumulative_line_missed": totals.get("line_missed", 0),
+                        "cumulative_line_percent": totals.get("line_percent", 0.0),
+                    },
+                )
+                append_attribution_row(
+                    attribution_csv,
+                    {
+                        "timestamp": c["at"],
+                        "worker": c["worker"],
+                        "variant_id": c["variant"],
+                        "rustc_exit": c["rustc_exit"],
+                        "new_counters": c["new_counters"],
+                        "covered_counters": c["covered_counters"],
+                        "new_lines": c["new_lines"],
+                    },
+                )
+                try:
+                    c["case"].unlink()
+                except Exception:
+                    pass
+            # Feedback for the fuzzing workers (see case_queue.FeedbackReader).
+            append_feedback(
+                feedback_file,
+                [
+                    {
+                        "worker": c["worker"],
+                        "variant_id": c["variant"],
+                        "rustc_exit": c["rustc_exit"],
+                        "new_counters": c["new_counters"],
+                        "new_lines": c["new_lines"],
+                        "compile_sec": round(float(c["compile_sec"]), 3),
+                    }
+                    for c in batch
+                ],
+            )
+            counter_cov.save(counters_file)
+            if line_acc is not None:
+                line_acc.save(line_state_file)
+        finally:
+            for p in (snapshot_profdata, merged_tmp, input_list):
+                try:
+                    if p.exists():
+                        p.unlink()
+                except Exception:
+                    pass
+
+    def compile_case(case: Path) -> Dict[str, object]:
+        """Pool job: one instrumented compile into a profraw directory of its own."""
+        slug = case.stem
+        ts = int(time.time() * 1000)
+        case_profraw_dir = profraw_dir / f"{slug}-{ts}"
+        case_profraw_dir.mkdir(parents=True, exist_ok=True)
+        out_bin = tmp_dir / f"build_{slug}_{ts}"
+
+        env = os.environ.copy()
+        env["LLVM_PROFILE_FILE"] = str((case_profraw_dir / "rustc-%p-%m.profraw").resolve())
+
+        cmd = [
+            rustc_bin,
+            str(case),
+            "-o",
+            str(out_bin),
+            "-Copt-level=0",
+            "-Cdebuginfo=1",
+        ]
+        if sysroot_arg:
+            cmd.extend(["--sysroot", str(sysroot_arg)])
+
+        started = time.time()
+        try:
+            comp = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                env=env,
+                timeout=max(1.0, float(args.compile_timeout)),
+            )
+        except Exception:
+            # Includes subprocess.TimeoutExpired.
+            comp = None
+        finally:
+            try:
+                if out_bin.exists():
+                    out_bin.unlink()
+            except Exception:
+                pass
+
+        return {
+            "case": case,
+            "rustc_exit": None if comp is None else int(comp.returncode),
+            "profraw_dir": case_profraw_dir,
+            "profraw": sorted(case_profraw_dir.glob("*.profraw")),
+            "compile_sec": time.time() - started,
+        }
+
+    # Cases handed to the pool and not yet merged (or failed); the dispatcher skips them.
+    in_flight = set()
+    in_flight_lock = threading.Lock()
+    compiled: "queue.Queue[Dict[str, object]]" = queue.Queue()
+
+    def finish(cases) -> None:
+        with in_flight_lock:
+            in_flight.difference_update(cases)
+
+    def merge_loop() -> None:
+        """Single merger: attribution, batching and every write to total.profdata."""
+        nonlocal batch_started
+
+        def on_profile(prof, mask) -> None:
+            # Fail inside the callback so counter attribution of the case still
+            # happens exactly once; a second absorb would diff the profiles it
+            # already took against themselves.
+            nonlocal line_acc
+            if line_acc is None:
+                return
+            try:
+                new_lines.append(line_acc.absorb(prof, mask))
+            except Exception as e:
+                # A mapping we cannot decode: keep going on llvm-cov export.
+                print(f"[consumer] line accounting disabled: {e}")
+                line_acc = None
+
+        new_lines: List[int] = []
+        while True:
+            try:
+                item = compiled.get(timeout=max(0.2, float(args.poll_interval)))
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                case = item["case"]
+                if item["rustc_exit"] is None or not item["profraw"]:
+                    if item["profraw_dir"] is not None:
+                        shutil.rmtree(item["profraw_dir"], ignore_errors=True)
+                    try:
+                        case.rename(failed_dir / case.name)
+                    except Exception:
+                        pass
+                    finish([case])
+                else:
+                    # Attribution from the raw counters; the profraws wait for the batch merge.
+                    new_lines.clear()
+                    use_lines = line_acc is not None
+                    new_counters, unreadable = counter_cov.absorb(
+                        item["profraw"], on_profile=on_profile if use_lines else None
+                    )
+                    worker, variant = parse_case_meta(case)
+                    if not pending:
+                        batch_started = time.time()
+                    pending.append(
+                        {
+                            **item,
+                            "worker": worker,
+                            "variant": variant,
+                            "at": datetime.now().isoformat(timespec="seconds"),
+                            "new_counters": new_counters if unreadable < len(item["profraw"]) else -1,
+                            "covered_counters": counter_cov.covered(),
+                            "new_lines": sum(new_lines) if line_acc is not None else "",
+                            "totals": line_acc.totals() if line_acc is not None else None,
+                        }
+                    )
+
+            if pending and (len(pending) >= batch_cases or (time.time() - batch_started) >= batch_seconds):
+                batch = [c["case"] for c in pending]
+                flush_batch()
+                if not pending:
+                    finish(batch)
+
+    jobs = max(1, int(args.jobs))
+    max_queued = max(0, int(args.max_queued))
+    pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="cov-compile")
+    merger = threading.Thread(target=merge_loop, name="cov-merge", daemon=True)
+    merger.start()
+
+    compiling: List = []
+
+    def submit(case: Path) -> None:
+        def _done(fut) -> None:
+            if fut.exception() is not None:
+                print(f"[consumer] compile job failed for {case.name}: {fut.exception()}")
+                compiled.put({"case": case, "rustc_exit": None, "profraw_dir": None, "profraw": [], "compile_sec": 0.0})
+            else:
+                compiled.put(fut.result())
+
+        with in_flight_lock:
+            in_flight.add(case)
+        fut = pool.submit(compile_case, case)
+        fut.add_done_callback(_done)
+        compiling.append(fut)
+
     print(f"[consumer] case_dir={case_dir}")
     print(f"[consumer] work_dir={work_dir}")
     print(f"[consumer] rustc={rustc_bin}")
+    print(f"[consumer] jobs={jobs} batch_cases={batch_cases} max_queued={max_queued}")
 
     while True:
+        if not merger.is_alive():
+            print("[consumer] merger thread exited; stopping")
+            pool.shutdown(wait=False, cancel_futures=True)
+            return 1
+
         try:
             queued = list(case_dir.glob("*.rs"))
         except Exception:
             queued = []
+        with in_flight_lock:
+            busy = set(in_flight)
+        queued = [p for p in queued if p not in busy]
+
+        # Backpressure with hysteresis: set above max_queued, cleared below half of it.
+        # The flag is re-touched every poll so producers can tell a live consumer from a dead one.
+        if max_queued:
+            if len(queued) > max_queued or (backpressure_flag.exists() and len(queued) > max_queued // 2):
+                try:
+                    backpressure_flag.touch()
+                except Exception:
+                    pass
+            elif backpressure_flag.exists():
+                try:
+                    backpressure_flag.unlink()
+                except Exception:
+                    pass
 
         # Queue-level one-pass rule:
         # 1) if key already claimed: delete all queued files for that key;
@@ -281,177 +701,19 @@ def main() -> int:
 
         random.shuffle(cases)
 
-        if not cases:
-            time.sleep(max(0.2, float(args.poll_interval)))
-            continue
-
-        for case in cases:
+        # Keep the pool fed but bounded: no more than two compiles queued per job.
+        compiling[:] = [f for f in compiling if not f.done()]
+        room = max(0, 2 * jobs - len(compiling))
+        for case in cases[:room]:
             worker, variant = parse_case_meta(case)
             iter_key = iter_key_from_variant(variant)
-
-            # Coverage rule: for each (worker, iter), only test one case.
-            # Any subsequent same-key cases are deleted directly.
-            if iter_key and iter_key in claimed_iter_keys:
-                try:
-                    case.unlink()
-                except Exception:
-                    pass
-                continue
+            # Claims are made here, on the dispatcher thread only, so each
+            # (worker, iter) key is compiled exactly once.
             if iter_key:
                 claim_iter_key(iter_key)
+            submit(case)
 
-            slug = case.stem
-            ts = int(time.time() * 1000)
-            profraw_pattern = str((profraw_dir / f"rustc-{slug}-{ts}-%p-%m.profraw").resolve())
-            out_bin = tmp_dir / f"build_{slug}_{ts}"
-            case_profdata = tmp_dir / f"case_{slug}_{ts}.profdata"
-            profraw_files: List[Path] = []
-
-            env = os.environ.copy()
-            env["LLVM_PROFILE_FILE"] = profraw_pattern
-
-            cmd = [
-                rustc_bin,
-                str(case),
-                "-o",
-                str(out_bin),
-                "-Copt-level=0",
-                "-Cdebuginfo=1",
-            ]
-            if sysroot_arg:
-                cmd.extend(["--sysroot", str(sysroot_arg)])
-
-            try:
-                comp = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    env=env,
-                    timeout=max(1.0, float(args.compile_timeout)),
-                )
-            except subprocess.TimeoutExpired:
-                try:
-                    case.rename(failed_dir / case.name)
-                except Exception:
-                    pass
-                continue
-            except Exception:
-                try:
-                    case.rename(failed_dir / case.name)
-                except Exception:
-                    pass
-                continue
-            merged_ok = False
-            snapshot_profdata = tmp_dir / f"snapshot_{slug}_{ts}.profdata"
-            try:
-                profraw_files = sorted(profraw_dir.glob(f"rustc-{slug}-{ts}-*.profraw"))
-                if not profraw_files:
-                    try:
-                        case.rename(failed_dir / case.name)
-                    except Exception:
-                        pass
-                    continue
-
-                merge_cmd = [llvm_profdata, "merge", "-sparse", *[str(p) for p in profraw_files], "-o", str(case_profdata)]
-                merge_res = subprocess.run(merge_cmd, capture_output=True, text=True)
-                if merge_res.returncode != 0:
-                    try:
-                        case.rename(failed_dir / case.name)
-                    except Exception:
-                        pass
-                    continue
-
-                try:
-                    with DirLock(lock_dir, timeout=180.0):
-                        if total_profdata.exists():
-                            merged_tmp = tmp_dir / f"total_{ts}.profdata"
-                            merge_total_cmd = [
-                                llvm_profdata,
-                                "merge",
-                                "-sparse",
-                                str(total_profdata),
-                                str(case_profdata),
-                                "-o",
-                                str(merged_tmp),
-                            ]
-                            merge_total_res = subprocess.run(merge_total_cmd, capture_output=True, text=True)
-                            if merge_total_res.returncode != 0:
-                                try:
-                                    case.rename(failed_dir / case.name)
-                                except Exception:
-                                    pass
-                                continue
-                            merged_tmp.replace(total_profdata)
-                        else:
-                            shutil.copy2(case_profdata, total_profdata)
-
-                        shutil.copy2(total_profdata, snapshot_profdata)
-
-                    merged_counter += 1
-                    should_export = (
-                        (merged_counter % summary_every == 0)
-                        or (not summary_total_json.exists())
-                        or (not summary_components_json.exists())
-                        or (not summary_components_csv.exists())
-                    )
-
-                    current_totals = last_totals
-                    if should_export:
-                        payload = export_summary_json(llvm_cov, snapshot_profdata, cov_objects)
-                        totals = totals_from_export(payload)
-                        comps = component_summary_from_export(payload)
-
-                        summary_total_json.write_text(json.dumps(totals, ensure_ascii=False, indent=2), encoding="utf-8")
-                        summary_components_json.write_text(json.dumps(comps, ensure_ascii=False, indent=2), encoding="utf-8")
-                        write_component_csv(summary_components_csv, comps)
-                        last_totals = totals
-                        current_totals = totals
-
-                    append_timeline_row(
-                        timeline_csv,
-                        {
-                            "timestamp": datetime.now().isoformat(timespec="seconds"),
-                            "worker": worker,
-                            "variant_id": variant,
-                            "rustc_exit": int(comp.returncode),
-                            "cumulative_line_count": current_totals.get("line_count", 0),
-                            "cumulative_line_covered": current_totals.get("line_covered", 0),
-                            "cumulative_line_missed": current_totals.get("line_missed", 0),
-                            "cumulative_line_percent": current_totals.get("line_percent", 0.0),
-                        },
-                    )
-
-                    merged_ok = True
-                except TimeoutError:
-                    # Skip this case and continue loop; do not crash consumer.
-                    continue
-            finally:
-                if merged_ok:
-                    try:
-                        case.unlink()
-                    except Exception:
-                        pass
-
-                for p in profraw_files:
-                    try:
-                        p.unlink()
-                    except Exception:
-                        pass
-                try:
-                    if case_profdata.exists():
-                        case_profdata.unlink()
-                except Exception:
-                    pass
-                try:
-                    if out_bin.exists():
-                        out_bin.unlink()
-                except Exception:
-                    pass
-                try:
-                    if snapshot_profdata.exists():
-                        snapshot_profdata.unlink()
-                except Exception:
-                    pass
+        time.sleep(max(0.2, float(args.poll_interval)))
 
 
 if __name__ == "__main__":
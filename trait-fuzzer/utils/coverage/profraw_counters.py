@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Read the counter section of raw LLVM profiles (.profraw) without llvm-profdata.
+
+Every profraw written by the same instrumented module has the same counter
+layout, so "which counters did this run hit that no earlier run hit" is a
+bitwise diff over the counter arrays. That is what the live consumer uses for
+per-case attribution: it costs one file read and a few big-int operations per
+case, instead of a merge against the multi-hundred-MB total profile.
+
+Masks are Python ints with one flag bit per counter (bit 8*i = counter i is
+non-zero; the byte stride keeps building them to a few C-level passes), keyed
+by the module's binary ids and counter count.
+"""
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+_MAGIC_64 = 0xFF6C70726F667281  # "\xfflprofr\x81"
+_VERSION_MASK = 0xFFFFFFFF
+_VARIANT_BYTE_COVERAGE = 1 << 60
+
+# version -> (header words, data record bytes, index of NumData, NumCounters,
+#             padding-before-counters, BinaryIdsSize, CountersDelta)
+_LAYOUTS = {
+    5: (10, 48, 2, 4, 3, None, 7),
+    6: (11, 48, 3, 5, 4, 2, 8),
+    7: (11, 48, 3, 5, 4, 2, 8),
+    8: (11, 48, 3, 5, 4, 2, 8),
+    9: (14, 64, 3, 5, 4, 2, 10),
+    10: (16, 64, 3, 5, 4, 2, 10),
+}
+
+# Byte 0 -> 0, anything else -> 1 (8-byte counters: non-zero count means covered).
+_NONZERO = bytes([0] + [1] * 255)
+# Single-byte coverage counters start at 0xff and are cleared to 0 when hit.
+_ZERO = bytes([1] + [0] * 255)
+
+
+def _fold_words(raw: bytes) -> int:
+    """Mask with bit 8*i set iff little-endian u64 word i of `raw` is non-zero."""
+    flags = raw[:len(raw) // 8 * 8].translate(_NONZERO)
+    mask = 0
+    for k in range(8):
+        mask |= int.from_bytes(flags[k::8], "little")
+    return mask
+
+
+@dataclass
+class RawProfile:
+    """The parts of one profraw the coverage tools use."""
+
+    version: int
+    module: str  # "<binary ids hex>:<counter count>"
+    num_counters: int
+    byte_coverage: bool
+    counters: bytes
+    data: bytes  # the __llvm_prf_data records
+    data_size: int  # bytes per data record
+    counters_delta: int
+
+    def mask(self) -> int:
+        """Covered-counter mask: bit 8*i set iff counter i is non-zero (hit)."""
+        if self.byte_coverage:
+            return int.from_bytes(self.counters.translate(_ZERO), "little")
+        return _fold_words(self.counters)
+
+    def count(self, index: int) -> int:
+        if self.byte_coverage:
+            return 1 if self.counters[index] == 0 else 0
+        return int.from_bytes(self.counters[index * 8:index * 8 + 8], "little")
+
+    def functions(self) -> Iterator[Tuple[int, int, int, int]]:
+        """(NameRef, FuncHash, first counter index, counter count) per data record.
+
+        Only versions with relative counter pointers (8+) can be mapped back to functions.
+        """
+        if self.version < 8:
+            return
+        counter_size = 1 if self.byte_coverage else 8
+        # v9 added BitmapPtr before FunctionPointer/Values, moving NumCounters.
+        num_counters_at = 48 if self.version >= 9 else 40
+        delta = self.counters_delta
+        for off in range(0, len(self.data) - self.data_size + 1, self.data_size):
+            name_ref, func_hash, counter_ptr = struct.unpack_from("<QQq", self.data, off)
+            (num_counters,) = struct.unpack_from("<I", self.data, off + num_counters_at)
+            yield name_ref, func_hash, (counter_ptr - delta) // counter_size, num_counters
+            delta -= self.data_size
+
+
+def read_raw_profile(path: Path) -> Optional[RawProfile]:
+    """Parse one 64-bit little-endian profraw; None if unreadable or an unknown version."""
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return None
+    if len(data) < 16:
+        return None
+    magic, version_word = struct.unpack_from("<QQ", data, 0)
+    if magic != _MAGIC_64:
+        return None
+    version = version_word & _VERSION_MASK
+    layout = _LAYOUTS.get(version)
+    if layout is None:
+        return None
+    n_words, data_size, i_data, i_counters, i_pad, i_ids, i_delta = layout
+    header_bytes = n_words * 8
+    if len(data) < header_bytes:
+        return None
+    header = struct.unpack_from(f"<{n_words}Q", data, 0)
+    binary_ids_size = header[i_ids] if i_ids is not None else 0
+    num_data = header[i_data]
+    num_counters = header[i_counters]
+    byte_coverage = bool(version_word & _VARIANT_BYTE_COVERAGE)
+    counter_size = 1 if byte_coverage else 8
+
+    data_start = header_bytes + binary_ids_size
+    start = data_start + num_data * data_size + header[i_pad]
+    end = start + num_counters * counter_size
+    if end > len(data):
+        return None
+    module = data[header_bytes:data_start].hex() or f"v{version}"
+    # CountersDelta is stored as an unsigned word but used as a signed address difference.
+    counters_delta = struct.unpack("<q", struct.pack("<Q", header[i_delta]))[0]
+    return RawProfile(
+        version=int(version),
+        module=f"{module}:{num_counters}",
+        num_counters=int(num_counters),
+        byte_coverage=byte_coverage,
+        counters=data[start:end],
+        data=data[data_start:data_start + num_data * data_size],
+        data_size=data_size,
+        counters_delta=counters_delta,
+    )
+
+
+def read_counter_mask(path: Path) -> Optional[Tuple[str, int, int]]:
+    """(module key, covered-counter mask, counter count) of one profraw; None if unreadable."""
+    prof = read_raw_profile(path)
+    if prof is None:
+        return None
+    return prof.module, prof.mask(), prof.num_counters
+
+
+class CounterCoverage:
+    """Union of covered counters per module, with cheap "what is new" queries."""
+
+    def __init__(self):
+        self.masks: Dict[str, int] = {}
+
+    def covered(self) -> int:
+        return sum(m.bit_count() for m in self.masks.values())
+
+    def absorb(
+        self,
+        files: Iterable[Path],
+        on_profile: Optional[Callable[[RawProfile, int], None]] = None,
+    ) -> Tuple[int, int]:
+        """Add one case's profraw files; returns (new counters, unreadable files).
+
+        `on_profile(profile, mask)` is called for every readable file with its
+        covered-counter mask (see `RawProfile.mask`).
+        """
+        new = 0
+        unreadable = 0
+        for p in files:
+            prof = read_raw_profile(p)
+            if prof is None:
+                unreadable += 1
+                continue
+            mask = prof.mask()
+            total = self.masks.get(prof.module, 0)
+            new += (mask & ~total).bit_count()
+            self.masks[prof.module] = total | mask
+            if on_profile is not None:
+                on_profile(prof, mask)
+        return new, unreadable
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            for key, mask in sorted(self.masks.items()):
+                k = key.encode("ascii")
+                raw = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+                f.write(struct.pack("<II", len(k), len(raw)))
+                f.write(k)
+                f.write(raw)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "CounterCoverage":
+        cov = cls()
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            return cov
+        off = 0
+        while off + 8 <= len(data):
+            klen, rlen = struct.unpack_from("<II", data, off)
+            off += 8
+            key = data[off:off + klen].decode("ascii", errors="replace")
+            off += klen
+            cov.masks[key] = int.from_bytes(data[off:off + rlen], "little")
+            off += rlen
+        return cov
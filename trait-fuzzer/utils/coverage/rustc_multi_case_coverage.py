@@ -3,12 +3,15 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
 import json
+import multiprocessing
 import os
 import re
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -265,6 +268,7 @@ def write_resume_state(
     processed_cases: List[str],
     merged_case_count: int,
     last_totals: Dict[str, float],
+    shards: Optional[Dict[str, object]] = None,
 ) -> None:
     state = {
         "processed_cases": processed_cases,
@@ -276,6 +280,10 @@ def write_resume_state(
             "line_percent": float(last_totals.get("line_percent", 0.0) or 0.0),
         },
     }
+    # Present only after a --jobs run: total.profdata is then a reduction of
+    # shards/base.profdata + shards/shard_<k>/partial.profdata, not an incremental merge.
+    if shards is not None:
+        state["shards"] = shards
     state_path.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
@@ -293,6 +301,450 @@ def should_mark_case_processed(row: Dict[str, object]) -> bool:
     return rustc_exit != 0 or profraw_count > 0
 
 
+def build_case_profile(
+    case: Path,
+    case_slug: str,
+    case_dir: Path,
+    *,
+    rustc_bin: str,
+    sysroot_arg: Optional[str],
+    llvm_profdata: str,
+    llvm_cov: str,
+    cov_objects: List[str],
+    keep_intermediate: bool,
+) -> Tuple[Dict[str, object], Optional[Path]]:
+    """Compile one case under LLVM_PROFILE_FILE and merge its profraw into case.profdata.
+
+    Returns the per-case row and the case.profdata path (None if nothing was merged).
+    """
+    profraw_dir = case_dir / "profraw"
+    build_dir = case_dir / "build"
+    profraw_dir.mkdir(parents=True, exist_ok=True)
+    build_dir.mkdir(parents=True, exist_ok=True)
+    # Left behind by an interrupted attempt at this case; merging them again would double its counts.
+    for stale in profraw_dir.glob("*.profraw"):
+        stale.unlink()
+
+    compile_env = os.environ.copy()
+    compile_env["LLVM_PROFILE_FILE"] = str((profraw_dir / f"rustc-{case_slug}-%p-%m.profraw").resolve())
+
+    out_bin = build_dir / f"{case_slug}_bin"
+    cmd = [
+        rustc_bin,
+        str(case),
+        "-o",
+        str(out_bin),
+        "-Copt-level=0",
+        "-Cdebuginfo=1",
+    ]
+    if sysroot_arg:
+        cmd.extend(["--sysroot", str(sysroot_arg)])
+
+    comp = run_cmd(cmd, env=compile_env, cwd=case.parent)
+    case_profraw = sorted(profraw_dir.glob("*.profraw"))
+
+    case_profdata = case_dir / "case.profdata"
+    case_export = case_dir / "case_export_summary.json"
+
+    row: Dict[str, object] = {
+        "case": str(case),
+        "slug": case_slug,
+        "rustc_exit": int(comp.returncode),
+        "profraw_count": len(case_profraw),
+        "line_count": 0,
+        "line_covered": 0,
+        "line_missed": 0,
+        "line_percent": 0.0,
+    }
+    if not case_profraw:
+        return row, None
+
+    merge_cmd = [llvm_profdata, "merge", "-sparse", *[str(p) for p in case_profraw], "-o", str(case_profdata)]
+    merge_res = run_cmd(merge_cmd)
+    if merge_res.returncode != 0:
+        return row, None
+    try:
+        payload = export_summary_json(llvm_cov, case_profdata, cov_objects)
+        if keep_intermediate:
+            case_export.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        row.update(totals_from_export(payload))
+    except Exception:
+        pass
+    return row, case_profdata
+
+
+def cleanup_case_artifacts(case_dir: Path, case_slug: str) -> None:
+    # Cleanup per-case intermediates to control disk usage.
+    profraw_dir = case_dir / "profraw"
+    build_dir = case_dir / "build"
+    for p in sorted(profraw_dir.glob("*.profraw")):
+        try:
+            p.unlink()
+        except Exception:
+            pass
+    for p in (case_dir / "case.profdata", case_dir / "case_export_summary.json", build_dir / f"{case_slug}_bin"):
+        try:
+            if p.exists():
+                p.unlink()
+        except Exception:
+            pass
+    for d in (profraw_dir, build_dir):
+        try:
+            if d.exists() and not any(d.iterdir()):
+                d.rmdir()
+        except Exception:
+            pass
+
+
+def shard_of(case: str, jobs: int) -> int:
+    # Stable across runs (unlike hash()), so a resumed run sends every case to the same shard.
+    return int(hashlib.md5(case.encode("utf-8")).hexdigest()[:8], 16) % jobs
+
+
+def tree_merge_profdata(
+    llvm_profdata: str,
+    inputs: List[Path],
+    out_path: Path,
+    scratch_dir: Path,
+    *,
+    fan_in: int = 4,
+    jobs: int = 1,
+) -> bool:
+    """Merge `inputs` into `out_path` level by level, running each level's merges in parallel.
+
+    Every merge reads at most `fan_in` profiles, so no single llvm-profdata call has to
+    hold all partial profiles at once. The inputs themselves are left untouched.
+    """
+    if not inputs:
+        return False
+    fan_in = max(2, int(fan_in))
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    level = list(inputs)
+    originals = set(level)
+    round_idx = 0
+    while len(level) > 1:
+        groups = [level[i:i + fan_in] for i in range(0, len(level), fan_in)]
+        next_level: List[Path] = []
+        pending = []
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(groups)))) as pool:
+            for g_idx, group in enumerate(groups):
+                if len(group) == 1:
+                    next_level.append(group[0])
+                    continue
+                dst = scratch_dir / f"reduce_{round_idx}_{g_idx}.profdata"
+                cmd = [llvm_profdata, "merge", "-sparse", *[str(p) for p in group], "-o", str(dst)]
+                pending.append((group, pool.submit(run_cmd, cmd)))
+                next_level.append(dst)
+            failed = None
+            for group, fut in pending:
+                res = fut.result()
+                if res.returncode != 0 and failed is None:
+                    failed = res.stderr[:200]
+        # Intermediate outputs of the previous level are consumed now.
+        for group, _ in pending:
+            for p in group:
+                if p not in originals and p.exists():
+                    p.unlink()
+        if failed is not None:
+            print(f"[WARN] profdata reduction failed at level {round_idx}: {failed}")
+            for p in next_level:
+                if p not in originals and p.exists():
+                    p.unlink()
+            return False
+        level = next_level
+        round_idx += 1
+
+    tmp_out = out_path.with_name(out_path.name + ".tmp")
+    if level[0] in originals:
+        shutil.copy2(level[0], tmp_out)
+    else:
+        level[0].replace(tmp_out)
+    tmp_out.replace(out_path)
+    return True
+
+
+def _write_shard_state(path: Path, state: Dict[str, object]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def run_shard(spec: Dict[str, object]) -> Dict[str, object]:
+    """Worker process for --jobs: fold one shard's cases into shard_<k>/partial.profdata.
+
+    Progress goes to shard_<k>/shard_state.json after every case, so an interrupted
+    shard picks up where it stopped and a finished one is not touched again.
+    """
+    shard_index = int(spec["index"])
+    shard_dir = Path(str(spec["shard_dir"]))
+    work_dir = Path(str(spec["work_dir"]))
+    keep_intermediate = bool(spec["keep_intermediate"])
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    partial = shard_dir / "partial.profdata"
+    state_file = shard_dir / "shard_state.json"
+
+    state = load_json_file(state_file, {})
+    if not isinstance(state, dict):
+        state = {}
+    processed: List[str] = [c for c in state.get("processed", []) if isinstance(c, str)]
+    rows: Dict[str, Dict[str, object]] = state.get("rows") if isinstance(state.get("rows"), dict) else {}
+    merged = int(state.get("merged_case_count", 0) or 0)
+    merged_tmp = shard_dir / "partial.tmp.profdata"
+    committing = state.get("committing")
+    if isinstance(committing, dict) and committing.get("case"):
+        # Killed between recording a merge and the state update that follows it: the
+        # merge is in partial.profdata (or still in the tmp file), so it must not be redone.
+        if merged_tmp.exists():
+            merged_tmp.replace(partial)
+        if partial.exists():
+            processed.append(str(committing["case"]))
+            if isinstance(committing.get("row"), dict):
+                rows[str(committing["case"])] = committing["row"]
+            merged += 1
+    elif merged_tmp.exists():
+        merged_tmp.unlink()
+    # Same rule as total.profdata in the serial path: no partial profile, no resume.
+    if merged > 0 and not partial.exists():
+        processed, rows, merged = [], {}, 0
+    done_set = set(processed)
+
+    assigned: List[Tuple[int, str]] = [(int(i), str(c)) for i, c in spec["cases"]]
+    state = {
+        "index": shard_index,
+        "cases": [c for _, c in assigned],
+        "processed": processed,
+        "merged_case_count": merged,
+        "rows": rows,
+        "done": False,
+    }
+
+    for idx, case_str in assigned:
+        if case_str in done_set:
+            continue
+        if os.getppid() != int(spec["parent_pid"]):
+            # The runner was killed; stop before a restarted run picks this shard up too.
+            break
+        case = Path(case_str)
+        case_slug = safe_slug(case, idx)
+        case_dir = work_dir / "cases" / case_slug
+        row, case_profdata = build_case_profile(
+            case,
+            case_slug,
+            case_dir,
+            rustc_bin=str(spec["rustc_bin"]),
+            sysroot_arg=spec.get("sysroot_arg"),
+            llvm_profdata=str(spec["llvm_profdata"]),
+            llvm_cov=str(spec["llvm_cov"]),
+            cov_objects=list(spec["cov_objects"]),
+            keep_intermediate=keep_intermediate,
+        )
+        merged_into_partial = False
+        if case_profdata is not None:
+            if merged == 0:
+                shutil.copy2(case_profdata, merged_tmp)
+                merged_into_partial = True
+            else:
+                res = run_cmd([
+                    str(spec["llvm_profdata"]),
+                    "merge",
+                    "-sparse",
+                    str(partial),
+                    str(case_profdata),
+                    "-o",
+                    str(merged_tmp),
+                ])
+                if res.returncode == 0:
+                    merged_into_partial = True
+                else:
+                    print(f"[WARN][shard {shard_index}] merge failed for {case_slug}: {res.stderr[:200]}")
+                    if merged_tmp.exists():
+                        merged_tmp.unlink()
+            if merged_into_partial:
+                _write_shard_state(state_file, dict(state, committing={"case": case_str, "row": row}))
+                merged_tmp.replace(partial)
+                merged += 1
+        if row["profraw_count"] and not keep_intermediate:
+            cleanup_case_artifacts(case_dir, case_slug)
+
+        rows[case_str] = row
+        if merged_into_partial or int(row["rustc_exit"]) != 0:
+            processed.append(case_str)
+            done_set.add(case_str)
+        state["merged_case_count"] = merged
+        _write_shard_state(state_file, state)
+        print(
+            f"[CASE][shard {shard_index}] {case_slug}: exit={row['rustc_exit']} profraw={row['profraw_count']} "
+            f"lines={row['line_covered']}/{row['line_count']} ({float(row['line_percent']):.2f}%)",
+            flush=True,
+        )
+
+    state["done"] = all(c in done_set for _, c in assigned)
+    _write_shard_state(state_file, state)
+    return state
+
+
+def run_shards(
+    cases: List[Path],
+    *,
+    jobs: int,
+    fan_in: int,
+    work_dir: Path,
+    total_profdata: Path,
+    resume_state: Dict,
+    processed_cases: List[str],
+    merged_case_count: int,
+    tool_spec: Dict[str, object],
+) -> Optional[Tuple[List[str], int, Dict[str, object], Dict[str, Dict[str, object]]]]:
+    """--jobs mode: shard the unprocessed cases over `jobs` processes, then reduce.
+
+    Whatever total.profdata held before the first sharded run becomes shards/base.profdata;
+    afterwards total.profdata is always rebuilt as base + every shard's partial profile.
+    Returns (processed cases, merged case count, shard resume state, per-case rows by path),
+    or None if the previous shards could not be folded into the base. A failed reduction
+    is reported as shard state "reduced": False; the shards themselves are kept.
+    """
+    shards_root = work_dir / "shards"
+    shards_root.mkdir(parents=True, exist_ok=True)
+    base_profdata = shards_root / "base.profdata"
+    scratch_dir = shards_root / "reduce"
+
+    prev = resume_state.get("shards") if isinstance(resume_state, dict) else None
+    if isinstance(prev, dict):
+        base_cases = [c for c in prev.get("base_cases", []) if isinstance(c, str)]
+        base_merged = int(prev.get("base_merged_case_count", 0) or 0)
+        if not base_profdata.exists():
+            base_cases, base_merged = [], 0
+        if int(prev.get("jobs", 0) or 0) != jobs:
+            # Case -> shard assignment depends on --jobs: fold the old shards into the base.
+            old_dirs = sorted(d for d in shards_root.glob("shard_*") if d.is_dir())
+            inputs = [base_profdata] if base_profdata.exists() else []
+            for d in old_dirs:
+                if (d / "partial.profdata").exists():
+                    inputs.append(d / "partial.profdata")
+            if inputs and not tree_merge_profdata(
+                str(tool_spec["llvm_profdata"]), inputs, base_profdata, scratch_dir, fan_in=fan_in, jobs=jobs
+            ):
+                print("[ERR] failed to fold previous shards into the base profile")
+                return None
+            for d in old_dirs:
+                old_state = load_json_file(d / "shard_state.json", {})
+                if isinstance(old_state, dict):
+                    base_cases.extend(c for c in old_state.get("processed", []) if isinstance(c, str))
+                    base_merged += int(old_state.get("merged_case_count", 0) or 0)
+                shutil.rmtree(d, ignore_errors=True)
+    else:
+        # First sharded run on this work dir (or after a serial run): stale shard dirs
+        # would double-count cases already folded into total.profdata.
+        for d in shards_root.glob("shard_*"):
+            shutil.rmtree(d, ignore_errors=True)
+        if total_profdata.exists():
+            shutil.copy2(total_profdata, base_profdata)
+            base_cases, base_merged = list(processed_cases), merged_case_count
+        else:
+            if base_profdata.exists():
+                base_profdata.unlink()
+            base_cases, base_merged = [], 0
+
+    base_set = set(base_cases)
+    assignments: List[List[Tuple[int, str]]] = [[] for _ in range(jobs)]
+    for idx, case in enumerate(cases, start=1):
+        case_str = str(case)
+        if case_str not in base_set:
+            assignments[shard_of(case_str, jobs)].append((idx, case_str))
+
+    specs = []
+    for k in range(jobs):
+        shard_dir = shards_root / f"shard_{k}"
+        old = load_json_file(shard_dir / "shard_state.json", {})
+        if (
+            isinstance(old, dict)
+            and old.get("done")
+            and set(old.get("cases", [])) >= {c for _, c in assignments[k]}
+            and (shard_dir / "partial.profdata").exists() == bool(old.get("merged_case_count"))
+        ):
+            print(f"[SKIP] shard {k} already finished ({len(assignments[k])} cases)")
+            continue
+        if not assignments[k]:
+            continue
+        specs.append(
+            dict(
+                tool_spec,
+                index=k,
+                shard_dir=str(shard_dir),
+                work_dir=str(work_dir),
+                cases=assignments[k],
+                parent_pid=os.getpid(),
+            )
+        )
+
+    print(f"[INFO] shards: {jobs} ({len(specs)} to run), base cases: {len(base_cases)}")
+    if specs:
+        # Pool (not ProcessPoolExecutor): leaving the block terminates the workers, so an
+        # interrupted run does not keep compiling in the background.
+        with multiprocessing.Pool(processes=min(jobs, len(specs))) as pool:
+            pending = [(spec["index"], pool.apply_async(run_shard, (spec,))) for spec in specs]
+            for k, res in pending:
+                try:
+                    st = res.get()
+                    print(f"[INFO] shard {k} finished: merged={st.get('merged_case_count', 0)} done={st.get('done')}")
+                except Exception as e:
+                    # Its shard_state.json still records what it finished; a rerun resumes it.
+                    print(f"[WARN] shard {k} failed: {e}")
+
+    processed_out = list(base_cases)
+    merged_out = base_merged
+    rows_out: Dict[str, Dict[str, object]] = {}
+    shard_meta: List[Dict[str, object]] = []
+    partials: List[Path] = []
+    for k in range(jobs):
+        shard_dir = shards_root / f"shard_{k}"
+        st = load_json_file(shard_dir / "shard_state.json", {})
+        if not isinstance(st, dict):
+            st = {}
+        partial = shard_dir / "partial.profdata"
+        shard_merged = int(st.get("merged_case_count", 0) or 0)
+        if shard_merged and not partial.exists():
+            st = {}
+            shard_merged = 0
+        shard_processed = [c for c in st.get("processed", []) if isinstance(c, str)]
+        processed_out.extend(shard_processed)
+        merged_out += shard_merged
+        if isinstance(st.get("rows"), dict):
+            rows_out.update(st["rows"])
+        if shard_merged:
+            partials.append(partial)
+        shard_meta.append(
+            {
+                "index": k,
+                "cases": len(assignments[k]),
+                "processed": len(shard_processed),
+                "merged_case_count": shard_merged,
+                "done": bool(st.get("done")),
+                "partial": str(partial) if shard_merged else None,
+            }
+        )
+
+    inputs = ([base_profdata] if base_profdata.exists() else []) + partials
+    reduced = True
+    if inputs:
+        print(f"[INFO] reducing {len(inputs)} profiles (fan-in {fan_in})")
+        reduced = tree_merge_profdata(
+            str(tool_spec["llvm_profdata"]), inputs, total_profdata, scratch_dir, fan_in=fan_in, jobs=jobs
+        )
+    if (not inputs or not reduced) and total_profdata.exists():
+        # Stale; it is rebuilt from base + partials on the next run.
+        total_profdata.unlink()
+
+    shards_state = {
+        "jobs": jobs,
+        "base_cases": base_cases,
+        "base_merged_case_count": base_merged,
+        "reduced": reduced,
+        "shards": shard_meta,
+    }
+    return processed_out, merged_out, shards_state, rows_out
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Collect rustc coverage for multiple .rs cases: per-case + merged total + per-component"
@@ -317,7 +769,21 @@ def main() -> int:
         action="store_true",
         help="Keep per-case intermediate artifacts (profraw/profdata/build). Default is to delete after merge.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Shard cases across N processes, each building a partial profdata, then tree-merge them. "
+        "With N > 1 the timeline gets one row per run instead of one per case.",
+    )
+    parser.add_argument(
+        "--merge-fan-in",
+        type=int,
+        default=4,
+        help="Profiles per llvm-profdata call in the --jobs reduction stage",
+    )
     args = parser.parse_args()
+    args.jobs = max(1, int(args.jobs))
 
     cases = discover_cases(here, args.cases, args.cases_dir, args.pattern)
     if not cases:
@@ -442,67 +908,86 @@ def main() -> int:
         comp_summary_json.write_text(json.dumps(comps_now, ensure_ascii=False, indent=2), encoding="utf-8")
         write_component_csv(comp_summary_csv, comps_now)
 
-    for idx, case in enumerate(cases, start=1):
-        case_str = str(case)
-        if not args.clean and case_str in processed_cases_set:
-            old = per_case_by_path.get(case_str)
-            if old is not None:
-                per_case_rows.append(old)
-            print(f"[SKIP] already processed: {case_str}")
-            continue
+    shards_state: Optional[Dict[str, object]] = None
+    if args.jobs > 1:
+        shard_result = run_shards(
+            cases,
+            jobs=args.jobs,
+            fan_in=args.merge_fan_in,
+            work_dir=work_dir,
+            total_profdata=total_profdata,
+            resume_state=resume_state,
+            processed_cases=processed_cases_order,
+            merged_case_count=merged_case_count,
+            tool_spec={
+                "rustc_bin": rustc_bin,
+                "sysroot_arg": sysroot_arg,
+                "llvm_profdata": llvm_profdata,
+                "llvm_cov": llvm_cov,
+                "cov_objects": cov_objects,
+                "keep_intermediate": args.keep_intermediate,
+            },
+        )
+        if shard_result is None:
+            return 1
+        processed_cases_order, merged_case_count, shards_state, shard_rows = shard_result
+        per_case_by_path.update(shard_rows)
+        write_resume_state(
+            resume_state_file,
+            processed_cases=processed_cases_order,
+            merged_case_count=merged_case_count,
+            last_totals=last_totals,
+            shards=shards_state,
+        )
+        if not shards_state["reduced"]:
+            print("[ERR] shard reduction failed; rerun to retry (finished shards are kept)")
+            return 1
+        if total_profdata.exists():
+            try:
+                total_payload_now = export_summary_json(llvm_cov, total_profdata, cov_objects)
+                last_totals = totals_from_export(total_payload_now)
+                append_timeline_row(
+                    timeline_csv,
+                    {
+                        "timestamp": datetime.now().isoformat(timespec="seconds"),
+                        "case_index": len(cases),
+                        "case_slug": f"shards-{args.jobs}",
+                        "rustc_exit": "",
+                        "cumulative_line_count": last_totals.get("line_count", 0),
+                        "cumulative_line_covered": last_totals.get("line_covered", 0),
+                        "cumulative_line_missed": last_totals.get("line_missed", 0),
+                        "cumulative_line_percent": last_totals.get("line_percent", 0.0),
+                    },
+                )
+            except Exception as e:
+                print(f"[WARN] failed to write timeline row for shard reduction: {e}")
 
-        case_slug = safe_slug(case, idx)
-        case_dir = work_dir / "cases" / case_slug
-        profraw_dir = case_dir / "profraw"
-        build_dir = case_dir / "build"
-        profraw_dir.mkdir(parents=True, exist_ok=True)
-        build_dir.mkdir(parents=True, exist_ok=True)
-
-        compile_env = os.environ.copy()
-        compile_env["LLVM_PROFILE_FILE"] = str((profraw_dir / f"rustc-{case_slug}-%p-%m.profraw").resolve())
-
-        out_bin = build_dir / f"{case_slug}_bin"
-        cmd = [
-            rustc_bin,
-            str(case),
-            "-o",
-            str(out_bin),
-            "-Copt-level=0",
-            "-Cdebuginfo=1",
-        ]
-        if sysroot_arg:
-            cmd.extend(["--sysroot", str(sysroot_arg)])
-
-        comp = run_cmd(cmd, env=compile_env, cwd=case.parent)
-        case_profraw = sorted(profraw_dir.glob("*.profraw"))
-
-        case_profdata = case_dir / "case.profdata"
-        case_export = case_dir / "case_export_summary.json"
-
-        row: Dict[str, object] = {
-            "case": str(case),
-            "slug": case_slug,
-            "rustc_exit": int(comp.returncode),
-            "profraw_count": len(case_profraw),
-            "line_count": 0,
-            "line_covered": 0,
-            "line_missed": 0,
-            "line_percent": 0.0,
-        }
-        merged_into_total = False
-
-        if case_profraw:
-            merge_cmd = [llvm_profdata, "merge", "-sparse", *[str(p) for p in case_profraw], "-o", str(case_profdata)]
-            merge_res = run_cmd(merge_cmd)
-            if merge_res.returncode == 0:
-                try:
-                    payload = export_summary_json(llvm_cov, case_profdata, cov_objects)
-                    if args.keep_intermediate:
-                        case_export.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-                    row.update(totals_from_export(payload))
-                except Exception:
-                    pass
+    else:
+        for idx, case in enumerate(cases, start=1):
+            case_str = str(case)
+            if not args.clean and case_str in processed_cases_set:
+                old = per_case_by_path.get(case_str)
+                if old is not None:
+                    per_case_rows.append(old)
+                print(f"[SKIP] already processed: {case_str}")
+                continue
+
+            case_slug = safe_slug(case, idx)
+            case_dir = work_dir / "cases" / case_slug
+            row, case_profdata = build_case_profile(
+                case,
+                case_slug,
+                case_dir,
+                rustc_bin=rustc_bin,
+                sysroot_arg=sysroot_arg,
+                llvm_profdata=llvm_profdata,
+                llvm_cov=llvm_cov,
+                cov_objects=cov_objects,
+                keep_intermediate=args.keep_intermediate,
+            )
+            merged_into_total = False
 
+            if case_profdata is not None:
                 # Incremental merge into total.profdata, so we can delete per-case artifacts early.
                 try:
                     if merged_case_count == 0:
@@ -539,7 +1024,7 @@ def main() -> int:
                                 "timestamp": datetime.now().isoformat(timespec="seconds"),
                                 "case_index": idx,
                                 "case_slug": case_slug,
-                                "rustc_exit": int(comp.returncode),
+                                "rustc_exit": int(row["rustc_exit"]),
                                 "cumulative_line_count": last_totals.get("line_count", 0),
                                 "cumulative_line_covered": last_totals.get("line_covered", 0),
                                 "cumulative_line_missed": last_totals.get("line_missed", 0),
@@ -551,54 +1036,24 @@ def main() -> int:
                 except Exception as e:
                     print(f"[WARN] incremental merge failed for {case_slug}: {e}")
 
-            # Cleanup per-case intermediates to control disk usage.
-            if not args.keep_intermediate:
-                for p in case_profraw:
-                    try:
-                        p.unlink()
-                    except Exception:
-                        pass
-                try:
-                    if case_profdata.exists():
-                        case_profdata.unlink()
-                except Exception:
-                    pass
-                try:
-                    if case_export.exists():
-                        case_export.unlink()
-                except Exception:
-                    pass
-                try:
-                    if out_bin.exists():
-                        out_bin.unlink()
-                except Exception:
-                    pass
-                try:
-                    if profraw_dir.exists() and not any(profraw_dir.iterdir()):
-                        profraw_dir.rmdir()
-                except Exception:
-                    pass
-                try:
-                    if build_dir.exists() and not any(build_dir.iterdir()):
-                        build_dir.rmdir()
-                except Exception:
-                    pass
-
-        per_case_rows.append(row)
-        per_case_by_path[case_str] = row
-        if (merged_into_total or int(row["rustc_exit"]) != 0) and case_str not in processed_cases_set:
-            processed_cases_set.add(case_str)
-            processed_cases_order.append(case_str)
-        write_resume_state(
-            resume_state_file,
-            processed_cases=processed_cases_order,
-            merged_case_count=merged_case_count,
-            last_totals=last_totals,
-        )
-        print(
-            f"[CASE] {case_slug}: exit={row['rustc_exit']} profraw={row['profraw_count']} "
-            f"lines={row['line_covered']}/{row['line_count']} ({float(row['line_percent']):.2f}%)"
-        )
+            if row["profraw_count"] and not args.keep_intermediate:
+                cleanup_case_artifacts(case_dir, case_slug)
+
+            per_case_rows.append(row)
+            per_case_by_path[case_str] = row
+            if (merged_into_total or int(row["rustc_exit"]) != 0) and case_str not in processed_cases_set:
+                processed_cases_set.add(case_str)
+                processed_cases_order.append(case_str)
+            write_resume_state(
+                resume_state_file,
+                processed_cases=processed_cases_order,
+                merged_case_count=merged_case_count,
+                last_totals=last_totals,
+            )
+            print(
+                f"[CASE] {case_slug}: exit={row['rustc_exit']} profraw={row['profraw_count']} "
+                f"lines={row['line_covered']}/{row['line_count']} ({float(row['line_percent']):.2f}%)"
+            )
 
     final_per_case_rows: List[Dict[str, object]] = []
     for case in cases:
@@ -656,6 +1111,7 @@ def main() -> int:
         processed_cases=processed_cases_order,
         merged_case_count=merged_case_count,
         last_totals=last_totals,
+        shards=shards_state,
     )
 
     return 0
@@ -14,9 +14,14 @@ Usage examples:
   # If you only have the ui directory:
   python tools/import_rustc_ui.py --src /path/to/rust/src/test/ui --dst seeds/rust-official/ui
 
+  # Also score the copied files into the seed metrics index (one bulk mutation-ast run):
+  python utils/import_rustc_ui.py --src /path/to/rust --dst seeds/rust-official/ui --index seeds
+
 Notes:
 - The fuzzer already has filtering/skip logic for non-parsable/internal-only seeds;
   importing more UI tests is safe but will increase scan time.
+- With --index, copied files are scored with `mutation-ast --mode ttdn_metrics_bulk`
+  and recorded in <seeds>/.index, so the fuzzer does not rescore them at startup.
 """
 
 from __future__ import annotations
@@ -25,8 +30,12 @@ import argparse
 import hashlib
 import os
 import shutil
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 
 @dataclass
@@ -36,6 +45,9 @@ class Stats:
     skipped_auxiliary: int = 0
     skipped_existing_same: int = 0
     skipped_existing_conflict: int = 0
+    indexed: int = 0
+    parse_failed: int = 0
+    copied_paths: List[Path] = field(default_factory=list)
 
 
 def _sha256(path: Path) -> str:
@@ -105,10 +117,32 @@ def import_ui(src: Path, dst: Path, *, include_auxiliary: bool) -> Stats:
 
         shutil.copy2(rs_path, out_path)
         stats.copied += 1
+        stats.copied_paths.append(out_path)
 
     return stats
 
 
+def index_copied(stats: Stats, seeds_dir: Path, *, jobs: int = 0) -> None:
+    """Bulk-score the copied files into the persistent seed metrics index."""
+    from utils.seed_index import SeedIndex
+    from utils.ttdn_model import TTDNModel
+
+    if not stats.copied_paths:
+        return
+    index = SeedIndex.for_seeds_dir(seeds_dir)
+    try:
+        model = TTDNModel(mutation_ast_dir=Path(__file__).resolve().parent.parent / "mutation" / "mutation-AST")
+        for path, metrics in model.bulk_metrics(stats.copied_paths, jobs=jobs or None):
+            if metrics is None:
+                continue
+            index.put(path, metrics)
+            stats.indexed += 1
+            if not metrics:
+                stats.parse_failed += 1
+    finally:
+        index.close()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -127,8 +161,22 @@ def main() -> None:
         help="include files under any 'auxiliary' directory (not standalone; usually not useful as seeds)",
     )
 
+    parser.add_argument(
+        "--index",
+        default=None,
+        help="seeds root whose .index should receive TTDN metrics of the copied files (e.g. seeds)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="threads for --index scoring (default: one per core)",
+    )
+
     args = parser.parse_args()
     stats = import_ui(Path(args.src), Path(args.dst), include_auxiliary=args.include_auxiliary)
+    if args.index:
+        index_copied(stats, Path(args.index), jobs=args.jobs)
 
     print(
         "\n".join(
@@ -139,6 +187,8 @@ def main() -> None:
                 f"  skipped_auxiliary:       {stats.skipped_auxiliary}",
                 f"  skipped_existing_same:   {stats.skipped_existing_same}",
                 f"  skipped_existing_conflict:{stats.skipped_existing_conflict}",
+                f"  indexed:                 {stats.indexed}",
+                f"  parse_failed:            {stats.parse_failed}",
             ]
         )
     )
@@ -0,0 +1,245 @@
+import json
+import logging
+import queue
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class MutationToolError(RuntimeError):
+    """The mutation server failed, timed out, or returned an error response."""
+
+
+@dataclass
+class MutationResponse:
+    parse_failed: bool
+    mutated: bool
+    count: int
+    index: int
+    choice_count: int
+    choice_index: int
+    output: Optional[str]
+    error: str = ""
+
+
+@dataclass
+class BatchMutant:
+    site_index: int
+    # Drawn index: global choice index for constraint_injection/projection_rewrite,
+    # candidate index otherwise. Pass it back via `exclude` to avoid re-drawing it.
+    choice_index: int
+    output: str
+
+
+@dataclass
+class MutationBatch:
+    parse_failed: bool
+    count: int
+    choice_count: int
+    mutants: List[BatchMutant]
+    error: str = ""
+
+
+class MutationServerClient:
+    """Client for a long-lived `mutation-ast --mode serve` process.
+
+    One request/response pair per line (JSON). The server caches the parsed
+    `syn::File` and `TtdnInfo` per seed content, so repeated mutations of the
+    same seed skip process startup and re-parsing. The process is (re)started
+    lazily; a timed-out or crashed server is killed and restarted on the next call.
+    """
+
+    def __init__(self, bin_path: Path, cwd: Optional[Path] = None, timeout_sec: float = 12.0):
+        self.bin_path = Path(bin_path)
+        self.cwd = Path(cwd) if cwd is not None else None
+        self.timeout_sec = float(timeout_sec)
+        self.logger = logging.getLogger(__name__)
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: Optional[queue.Queue] = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _start(self):
+        self._proc = subprocess.Popen(
+            [str(self.bin_path), "--mode", "serve"],
+            cwd=str(self.cwd.absolute()) if self.cwd is not None else None,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        lines: queue.Queue = queue.Queue()
+
+        def _pump(stream, out: queue.Queue):
+            try:
+                for line in stream:
+                    out.put(line)
+            except Exception:
+                pass
+            out.put(None)
+
+        threading.Thread(target=_pump, args=(self._proc.stdout, lines), daemon=True).start()
+        self._lines = lines
+        self.logger.info("Started mutation server (pid=%d)", self._proc.pid)
+
+    def _kill(self):
+        proc = self._proc
+        self._proc = None
+        self._lines = None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            proc = self._proc
+            if proc is None:
+                return
+            try:
+                proc.stdin.write(json.dumps({"op": "shutdown"}) + "\n")
+                proc.stdin.flush()
+                proc.wait(timeout=2)
+            except Exception:
+                pass
+            self._kill()
+
+    def _request(self, payload: Dict, timeout_sec: Optional[float] = None) -> Dict:
+        timeout = self.timeout_sec if timeout_sec is None else float(timeout_sec)
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._kill()
+                self._start()
+            self._next_id += 1
+            req_id = self._next_id
+            payload = dict(payload, id=req_id)
+            try:
+                self._proc.stdin.write(json.dumps(payload) + "\n")
+                self._proc.stdin.flush()
+            except Exception as e:
+                self._kill()
+                raise MutationToolError(f"mutation server write failed: {e}")
+
+            while True:
+                try:
+                    line = self._lines.get(timeout=timeout)
+                except queue.Empty:
+                    self._kill()
+                    raise MutationToolError(f"mutation server timed out after {timeout}s (op={payload.get('op')})")
+                if line is None:
+                    self._kill()
+                    raise MutationToolError("mutation server exited unexpectedly")
+                try:
+                    resp = json.loads(line)
+                except ValueError:
+                    continue
+                if resp.get("id") != req_id:
+                    continue
+                if not resp.get("ok", False):
+                    raise MutationToolError(str(resp.get("error", "unknown error")))
+                return resp
+
+    def mutate(
+        self,
+        input_path: Path,
+        mode: str,
+        index: Optional[int] = None,
+        constraint_index: Optional[int] = None,
+        choice_index: Optional[int] = None,
+        pattern_index: Optional[int] = None,
+    ) -> MutationResponse:
+        resp = self._request({
+            "op": "mutate",
+            "input": str(Path(input_path).absolute()),
+            "mode": str(mode),
+            "index": index,
+            "constraint_index": constraint_index,
+            "choice_index": choice_index,
+            "pattern_index": pattern_index,
+        })
+        return MutationResponse(
+            parse_failed=bool(resp.get("parse_failed", False)),
+            mutated=bool(resp.get("mutated", False)),
+            count=int(resp.get("count") or 0),
+            index=int(resp.get("index") or 0),
+            choice_count=int(resp.get("choice_count") or 0),
+            choice_index=int(resp.get("choice_index") or 0),
+            output=resp.get("output"),
+            error=str(resp.get("error") or ""),
+        )
+
+    def mutate_batch(
+        self,
+        input_path: Path,
+        mode: str,
+        n: int,
+        distinct: bool = True,
+        exclude: Optional[Iterable[int]] = None,
+        pattern_index: Optional[int] = None,
+    ) -> MutationBatch:
+        """Up to `n` mutants of `mode` from one parse, with their (site, choice) indices.
+
+        Fewer than `n` mutants means the index space (minus `exclude`) is exhausted.
+        """
+        resp = self._request(
+            {
+                "op": "mutate_batch",
+                "input": str(Path(input_path).absolute()),
+                "mode": str(mode),
+                "batch": int(n),
+                "distinct": bool(distinct),
+                "exclude": sorted(int(i) for i in (exclude or ())),
+                "pattern_index": pattern_index,
+            },
+            timeout_sec=self.timeout_sec * max(1, int(n)),
+        )
+        mutants = [
+            BatchMutant(
+                site_index=int(m.get("site_index") or 0),
+                choice_index=int(m.get("choice_index") or 0),
+                output=str(m.get("output") or ""),
+            )
+            for m in resp.get("mutants") or []
+        ]
+        return MutationBatch(
+            parse_failed=bool(resp.get("parse_failed", False)),
+            count=int(resp.get("count") or 0),
+            choice_count=int(resp.get("choice_count") or 0),
+            mutants=mutants,
+            error=str(resp.get("error") or ""),
+        )
+
+    def ttdn_metrics(self, input_path: Optional[Path] = None, source: Optional[str] = None) -> Dict[str, int]:
+        """Same payload as `--mode ttdn_metrics`; empty dict if the file does not parse."""
+        payload: Dict = {"op": "ttdn_metrics"}
+        if source is not None:
+            payload["source"] = source
+        else:
+            payload["input"] = str(Path(input_path).absolute())
+        resp = self._request(payload)
+        if resp.get("parse_failed"):
+            return {}
+        metrics = resp.get("metrics") or {}
+        return {k: int(v) for k, v in metrics.items() if isinstance(v, int)}
+
+    def stats(self) -> Dict[str, int]:
+        resp = self._request({"op": "stats"})
+        return {
+            k: int(v)
+            for k, v in resp.items()
+            if k != "id" and isinstance(v, int) and not isinstance(v, bool)
+        }
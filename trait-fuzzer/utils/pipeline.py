@@ -0,0 +1,205 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+
+_END = object()
+
+
+class VariantPipeline:
+    """Bounded mutate -> compile -> classify pipeline for one worker.
+
+    - Producer stage: `produce()` runs on its own thread and yields work items
+      (planned mutants) in variant order.
+    - Compile stage: `compile_fn(item)` runs on a pool of `compile_workers` threads.
+    - Classifier/persister stage: `run()` yields `(item, result, error)` on the
+      caller's thread strictly in production order, so variant ids, logging and
+      kill-fate/chaining decisions keep the serial semantics.
+
+    At most `max_pending` items are in flight (produced but not yet classified);
+    the producer blocks once that window is full. `cancel()` stops production and
+    drops compiles that have not started; finished-but-unconsumed results are
+    handed to `discard_fn` (e.g. to delete temp sources).
+
+    Queue-depth metrics (`stats()`) tell whether the compile pool or the producer
+    is the bottleneck: a full window with little classifier wait means compile
+    workers can be added; a long classifier wait with a shallow queue means the
+    producer (mutator) is starved.
+    """
+
+    def __init__(
+        self,
+        compile_fn: Callable[[Any], Any],
+        compile_workers: int = 1,
+        max_pending: int = 4,
+        discard_fn: Optional[Callable[[Any, Any], None]] = None,
+        name: str = "pipeline",
+    ):
+        self.compile_fn = compile_fn
+        self.compile_workers = max(1, int(compile_workers))
+        self.max_pending = max(1, int(max_pending))
+        self.discard_fn = discard_fn
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.compile_workers,
+            thread_name_prefix=f"{name}-compile",
+        )
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._producer_error: Optional[BaseException] = None
+
+        # Metrics
+        self._produced = 0
+        self._compiled = 0
+        self._classified = 0
+        self._depth_samples = 0
+        self._depth_sum = 0
+        self._depth_max = 0
+        self._ready_sum = 0
+        self._producer_block_sec = 0.0
+        self._classifier_wait_sec = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _on_compiled(self, _fut: Future):
+        with self._lock:
+            self._compiled += 1
+
+    def run(self, produce: Callable[[], Iterable[Any]]) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+        ordered: queue.Queue = queue.Queue()
+        slots = threading.Semaphore(self.max_pending)
+
+        def _producer():
+            try:
+                for item in produce():
+                    t0 = time.time()
+                    while not slots.acquire(timeout=0.2):
+                        if self._cancel.is_set():
+                            return
+                    with self._lock:
+                        self._producer_block_sec += time.time() - t0
+                    if self._cancel.is_set():
+                        slots.release()
+                        return
+                    fut = self._executor.submit(self.compile_fn, item)
+                    fut.add_done_callback(self._on_compiled)
+                    with self._lock:
+                        self._produced += 1
+                    ordered.put((item, fut))
+            except BaseException as e:  # surfaced to the classifier thread
+                self._producer_error = e
+            finally:
+                ordered.put(_END)
+
+        producer = threading.Thread(target=_producer, name=f"{self.name}-produce", daemon=True)
+        producer.start()
+        try:
+            while True:
+                entry = ordered.get()
+                if entry is _END:
+                    break
+                item, fut = entry
+                if self._cancel.is_set():
+                    self._discard(item, fut)
+                    slots.release()
+                    continue
+
+                with self._lock:
+                    depth = self._produced - self._classified
+                    ready = self._compiled - self._classified
+                    self._depth_samples += 1
+                    self._depth_sum += depth
+                    self._ready_sum += ready
+                    self._depth_max = max(self._depth_max, depth)
+
+                t0 = time.time()
+                result, error = None, None
+                try:
+                    result = fut.result()
+                except BaseException as e:
+                    error = e
+                with self._lock:
+                    self._classifier_wait_sec += time.time() - t0
+
+                try:
+                    yield item, result, error
+                finally:
+                    with self._lock:
+                        self._classified += 1
+                    slots.release()
+        finally:
+            # Early exit (break/return/exception in the consumer) cancels the rest.
+            self._cancel.set()
+            producer.join()
+            while True:
+                try:
+                    entry = ordered.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is not _END:
+                    self._discard(*entry)
+            self._cancel.clear()
+
+        if self._producer_error is not None:
+            err, self._producer_error = self._producer_error, None
+            raise err
+
+    def _discard(self, item: Any, fut: Future):
+        if fut.cancel() or self.discard_fn is None:
+            return
+        try:
+            result = fut.result()
+        except BaseException:
+            result = None
+        try:
+            self.discard_fn(item, result)
+        except Exception:
+            pass
+
+    def cancel(self):
+        """Stop producing; remaining items are discarded when `run()` unwinds."""
+        self._cancel.set()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            samples = max(1, self._depth_samples)
+            return {
+                "produced": self._produced,
+                "classified": self._classified,
+                "depth_avg": self._depth_sum / samples,
+                "depth_max": self._depth_max,
+                "ready_avg": self._ready_sum / samples,
+                "producer_block_sec": self._producer_block_sec,
+                "classifier_wait_sec": self._classifier_wait_sec,
+            }
+
+    def log_stats(self, label: str = ""):
+        st = self.stats()
+        self.logger.info(
+            "%s%s: produced=%d classified=%d depth avg=%.2f max=%d (window=%d) ready avg=%.2f "
+            "producer_block=%.1fs classifier_wait=%.1fs compile_workers=%d",
+            self.name,
+            f" [{label}]" if label else "",
+            st["produced"],
+            st["classified"],
+            st["depth_avg"],
+            st["depth_max"],
+            self.max_pending,
+            st["ready_avg"],
+            st["producer_block_sec"],
+            st["classifier_wait_sec"],
+            self.compile_workers,
+        )
+
+    def close(self):
+        self._cancel.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
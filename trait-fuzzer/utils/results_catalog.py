@@ -0,0 +1,246 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+CATALOG_FILENAME = ".results_catalog.sqlite3"
+
+
+def case_dir_stats(case_dir: Path) -> Tuple[float, int]:
+    """(mtime, total bytes) of one case directory: the directory's own mtime and the
+    size of every regular file under it, walked iteratively with scandir (symlinks not followed)."""
+    total = 0
+    stack = [str(case_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    try:
+        mtime = case_dir.stat().st_mtime
+    except OSError:
+        mtime = time.time()
+    return mtime, total
+
+
+class ResultsCatalog:
+    """Case count, bytes and age per (namespace, status), kept as cases are written and pruned.
+
+    One SQLite file (WAL) under the results root shared by every worker:
+    `cases` has one row per `<ns>/<status>/case_*` directory with its mtime and
+    size, and `totals` keeps the running count/bytes per status, so limit checks
+    are a single-row read. The (ns, status, mtime) index is the eviction heap:
+    `claim_oldest` pops victims from it and deletes their rows in one IMMEDIATE
+    transaction, so concurrent workers never pick the same victim.
+
+    Directories created or deleted behind the catalog's back are picked up by
+    `reconcile`, which rescans one namespace (callers run it every few minutes).
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cases ("
+            " ns TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " name TEXT NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " bytes INTEGER NOT NULL,"
+            " PRIMARY KEY (ns, status, name))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cases_age ON cases (ns, status, mtime)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS totals ("
+            " ns TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " bytes INTEGER NOT NULL,"
+            " PRIMARY KEY (ns, status))"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS reconciled (ns TEXT PRIMARY KEY, at REAL NOT NULL)")
+
+    @classmethod
+    def for_results(cls, results_root: Path) -> "ResultsCatalog":
+        return cls(Path(results_root) / CATALOG_FILENAME)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, ns: str, status: str, dcount: int, dbytes: int):
+        conn.execute(
+            "INSERT INTO totals (ns, status, count, bytes) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (ns, status) DO UPDATE SET"
+            " count = MAX(0, count + excluded.count), bytes = MAX(0, bytes + excluded.bytes)",
+            (ns, status, int(dcount), int(dbytes)),
+        )
+
+    def record(self, case_dir: Path):
+        """Add (or refresh) `<ns>/<status>/<case>` after its files have been written."""
+        case_dir = Path(case_dir)
+        ns, status, name = case_dir.parent.parent.name, case_dir.parent.name, case_dir.name
+        mtime, size = case_dir_stats(case_dir)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT bytes FROM cases WHERE ns = ? AND status = ? AND name = ?", (ns, status, name)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO cases (ns, status, name, mtime, bytes) VALUES (?, ?, ?, ?, ?)",
+                (ns, status, name, mtime, size),
+            )
+            if row is None:
+                self._bump(conn, ns, status, 1, size)
+            else:
+                self._bump(conn, ns, status, 0, size - int(row[0]))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self, ns: str, statuses: Iterable[str]) -> Tuple[int, int]:
+        """(case count, bytes) summed over `statuses` of `ns`."""
+        statuses = list(statuses)
+        if not statuses:
+            return 0, 0
+        marks = ",".join("?" * len(statuses))
+        row = self._conn().execute(
+            f"SELECT COALESCE(SUM(count), 0), COALESCE(SUM(bytes), 0) FROM totals WHERE ns = ? AND status IN ({marks})",
+            [ns, *statuses],
+        ).fetchone()
+        return int(row[0]), int(row[1])
+
+    def claim_oldest(
+        self,
+        ns: str,
+        statuses: Iterable[str],
+        max_count: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> List[Tuple[str, str]]:
+        """Pop the oldest cases of `statuses` until count <= max_count and bytes <= max_bytes.
+
+        Claimed rows are removed from the catalog before returning; the caller
+        deletes the returned (status, name) directories.
+        """
+        statuses = list(statuses)
+        if not statuses or (max_count is None and max_bytes is None):
+            return []
+        marks = ",".join("?" * len(statuses))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT COALESCE(SUM(count), 0), COALESCE(SUM(bytes), 0) FROM totals WHERE ns = ? AND status IN ({marks})",
+                [ns, *statuses],
+            ).fetchone()
+            count, size = int(row[0]), int(row[1])
+            victims: List[Tuple[str, str]] = []
+            while (max_count is not None and count > max_count) or (max_bytes is not None and size > max_bytes):
+                batch = conn.execute(
+                    f"SELECT status, name, bytes FROM cases WHERE ns = ? AND status IN ({marks})"
+                    " ORDER BY mtime LIMIT 64",
+                    [ns, *statuses],
+                ).fetchall()
+                if not batch:
+                    break
+                for status, name, nbytes in batch:
+                    if not ((max_count is not None and count > max_count) or (max_bytes is not None and size > max_bytes)):
+                        break
+                    conn.execute("DELETE FROM cases WHERE ns = ? AND status = ? AND name = ?", (ns, status, name))
+                    self._bump(conn, ns, status, -1, -int(nbytes))
+                    count -= 1
+                    size -= int(nbytes)
+                    victims.append((str(status), str(name)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return victims
+
+    def needs_reconcile(self, ns: str, interval_sec: float) -> bool:
+        row = self._conn().execute("SELECT at FROM reconciled WHERE ns = ?", (ns,)).fetchone()
+        return row is None or (interval_sec >= 0 and time.time() - float(row[0]) >= interval_sec)
+
+    def reconcile(self, results_dir: Path) -> Tuple[int, int]:
+        """Rescan one namespace directory and make its rows match the disk.
+
+        Sizes of cases whose mtime is unchanged are reused, so a reconcile costs
+        one stat per case plus a size walk for new/changed ones. Returns
+        (cases added, cases dropped).
+        """
+        results_dir = Path(results_dir)
+        ns = results_dir.name
+        conn = self._conn()
+        known = {
+            (status, name): (mtime, nbytes)
+            for status, name, mtime, nbytes in conn.execute(
+                "SELECT status, name, mtime, bytes FROM cases WHERE ns = ?", (ns,)
+            )
+        }
+        found = {}
+        try:
+            status_dirs = [p for p in results_dir.iterdir() if p.is_dir()]
+        except OSError:
+            status_dirs = []
+        for status_dir in status_dirs:
+            try:
+                entries = list(os.scandir(status_dir))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.startswith("case_"):
+                    continue
+                try:
+                    if not entry.is_dir():
+                        continue
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                key = (status_dir.name, entry.name)
+                prev = known.get(key)
+                if prev is not None and prev[0] == mtime:
+                    found[key] = prev
+                else:
+                    found[key] = (mtime, case_dir_stats(Path(entry.path))[1])
+
+        added = len(found.keys() - known.keys())
+        dropped = len(known.keys() - found.keys())
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cases WHERE ns = ?", (ns,))
+            conn.execute("DELETE FROM totals WHERE ns = ?", (ns,))
+            conn.executemany(
+                "INSERT INTO cases (ns, status, name, mtime, bytes) VALUES (?, ?, ?, ?, ?)",
+                [(ns, status, name, mtime, nbytes) for (status, name), (mtime, nbytes) in found.items()],
+            )
+            conn.execute(
+                "INSERT INTO totals (ns, status, count, bytes)"
+                " SELECT ns, status, COUNT(*), SUM(bytes) FROM cases WHERE ns = ? GROUP BY status",
+                (ns,),
+            )
+            conn.execute("INSERT OR REPLACE INTO reconciled (ns, at) VALUES (?, ?)", (ns, time.time()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added, dropped
@@ -0,0 +1,159 @@
+import atexit
+import hashlib
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class ScratchWorkspace:
+    """Per-worker directory for transient files, on a RAM-backed filesystem.
+
+    Holds the files that used to land in the repo root or in a fresh
+    `TemporaryDirectory` per compile: `temp_{variant_id}.rs`, round/baseline
+    seed copies, rewrite probes, `.ttdn_out` files and compiler out-dirs.
+
+    - Names are deterministic (`path(name)`); compiler out-dirs are one reused
+      `trait_fuzzer_rustc_t<k>` directory per compile thread, emptied after use.
+    - The directory is wiped when the workspace is created (leftovers of a
+      crashed or killed previous run) and removed again at interpreter exit.
+    """
+
+    def __init__(self, root: Path, name: str):
+        self.root = Path(root)
+        self.dir = self.root / name
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._slots = itertools.count()
+        self.reset()
+        atexit.register(self.cleanup)
+
+    @staticmethod
+    def default_root() -> Path:
+        shm = Path("/dev/shm")
+        base = shm if shm.is_dir() and os.access(shm, os.W_OK) else Path(tempfile.gettempdir())
+        try:
+            user = str(os.getuid())
+        except AttributeError:
+            user = "user"
+        return base / f"trait-fuzzer-{user}"
+
+    @classmethod
+    def root_from_config(cls, config: Dict) -> Path:
+        configured = config.get("paths", {}).get("scratch")
+        return Path(configured) if configured else cls.default_root()
+
+    @classmethod
+    def campaign_dir(cls, config: Dict, owner_pid: Optional[int] = None) -> Path:
+        """This campaign's directory under the scratch root: `<results-dir hash>-<owner pid>`.
+
+        The root is shared by every campaign of the user, so each one gets its own
+        subdirectory, tagged with the pid of the process that owns it.
+        """
+        results = Path(config.get("paths", {}).get("results", "results")).resolve()
+        tag = hashlib.sha1(str(results).encode("utf-8")).hexdigest()[:10]
+        pid = os.getpid() if owner_pid is None else int(owner_pid)
+        return cls.root_from_config(config) / f"{tag}-{pid}"
+
+    @classmethod
+    def for_worker(cls, config: Dict, worker_index: int, owner_pid: Optional[int] = None) -> "ScratchWorkspace":
+        return cls(cls.campaign_dir(config, owner_pid), f"w{worker_index}")
+
+    @staticmethod
+    def purge_root(root: Path):
+        """Parent-side: drop campaign directories whose owning process is gone.
+
+        Directories of campaigns that are still running are left alone.
+        """
+        root = Path(root)
+        if not root.is_dir():
+            return
+        for child in root.iterdir():
+            _, sep, pid = child.name.rpartition("-")
+            if not sep or not pid.isdigit() or not child.is_dir():
+                continue
+            if not _pid_alive(int(pid)):
+                shutil.rmtree(child, ignore_errors=True)
+
+    def reset(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def cleanup(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        try:
+            # The campaign directory goes with its last worker.
+            self.root.rmdir()
+        except OSError:
+            pass
+
+    def path(self, name: str) -> Path:
+        return self.dir / name
+
+    @contextmanager
+    def compile_dir(self):
+        """This thread's reusable compiler out-dir, emptied when the compile is done."""
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            slot = next(self._slots)
+            self._local.slot = slot
+        out_dir = self.dir / f"trait_fuzzer_rustc_t{slot}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            yield str(out_dir)
+        finally:
+            for child in out_dir.iterdir():
+                try:
+                    if child.is_dir() and not child.is_symlink():
+                        shutil.rmtree(child, ignore_errors=True)
+                    else:
+                        child.unlink()
+                except Exception:
+                    pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # EPERM: alive but owned by someone else.
+        return True
+    return True
+
+
+_active_scratch: Optional[ScratchWorkspace] = None
+
+
+def configure_scratch(workspace: Optional[ScratchWorkspace]):
+    """Install the process-wide workspace used by RustCompiler and TTDNModel."""
+    global _active_scratch
+    _active_scratch = workspace
+
+
+def get_scratch() -> Optional[ScratchWorkspace]:
+    return _active_scratch
+
+
+def scratch_path(name: str) -> Path:
+    """`name` inside the active workspace, or in the current directory without one."""
+    ws = _active_scratch
+    return ws.path(name) if ws is not None else Path(name)
+
+
+@contextmanager
+def compile_scratch_dir():
+    """Compiler out-dir: the workspace's per-thread slot, or a fresh temp directory."""
+    ws = _active_scratch
+    if ws is None:
+        with tempfile.TemporaryDirectory(prefix="trait_fuzzer_rustc_") as tmp:
+            yield tmp
+        return
+    with ws.compile_dir() as tmp:
+        yield tmp
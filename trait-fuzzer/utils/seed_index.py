@@ -0,0 +1,337 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.mutation_client import MutationServerClient, MutationToolError
+from utils.ttdn_model import TTDNModel
+
+
+DEFAULT_INDEX_DIRNAME = ".index"
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_tool_ids: Dict[Tuple[str, int, int], str] = {}
+
+
+def tool_identity(bin_path: Path) -> str:
+    """Content hash of the mutation-ast binary: parse verdicts are only valid for one build."""
+    bin_path = Path(bin_path).resolve()
+    st = bin_path.stat()
+    key = (str(bin_path), st.st_size, st.st_mtime_ns)
+    ident = _tool_ids.get(key)
+    if ident is None:
+        ident = file_sha256(bin_path)
+        _tool_ids[key] = ident
+    return ident
+
+
+class SeedIndex:
+    """Persistent TTDN metrics per seed file (SQLite under `seeds/.index`).
+
+    Rows are keyed by path and validated by (size, mtime_ns); when the stat
+    changed but the content hash did not (touch, copy, checkout) the row is
+    revalidated instead of recomputed. Lookups by sha256 let copies of an
+    indexed file (e.g. a promoted seed) reuse its metrics.
+
+    A second table records whether a content hash parses with a given
+    mutation-ast build (`tool_identity`); a rebuilt binary or edited seed
+    simply misses it.
+
+    `metrics` is the full `mutation-ast --mode ttdn_metrics` payload.
+    """
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.index_dir / "seed_metrics.sqlite3"
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seeds ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL,"
+            " parse_ok INTEGER NOT NULL,"
+            " metrics TEXT NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS seeds_sha256 ON seeds(sha256)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_status ("
+            " sha256 TEXT NOT NULL,"
+            " tool TEXT NOT NULL,"
+            " parse_ok INTEGER NOT NULL,"
+            " error TEXT NOT NULL,"
+            " updated REAL NOT NULL,"
+            " PRIMARY KEY (sha256, tool))"
+        )
+
+    @classmethod
+    def for_seeds_dir(cls, seeds_dir: Path) -> "SeedIndex":
+        return cls(Path(seeds_dir) / DEFAULT_INDEX_DIRNAME)
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path: Path) -> Optional[Dict[str, int]]:
+        """Metrics for `path` if the index holds them for its current content, else None."""
+        path = Path(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        key = self._key(path)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, sha256, metrics FROM seeds WHERE path = ?",
+                    (key,),
+                ).fetchone()
+            if row is not None and int(row[0]) == st.st_size and int(row[1]) == st.st_mtime_ns:
+                return json.loads(row[3])
+
+            # Stat changed or path unknown: fall back to the content hash.
+            digest = file_sha256(path)
+            with self._lock:
+                if row is not None and row[2] == digest:
+                    metrics_json = row[3]
+                else:
+                    hit = self._conn.execute(
+                        "SELECT parse_ok, metrics FROM seeds WHERE sha256 = ? LIMIT 1",
+                        (digest,),
+                    ).fetchone()
+                    if hit is None:
+                        return None
+                    metrics_json = hit[1]
+                metrics = json.loads(metrics_json)
+                self._store(key, st.st_size, st.st_mtime_ns, digest, metrics)
+            return metrics
+        except (sqlite3.Error, OSError, ValueError) as e:
+            self.logger.warning("seed index lookup failed for %s: %s", path, e)
+            return None
+
+    def known_digest(self, path: Path, size: int, mtime_ns: int) -> Optional[str]:
+        """sha256 recorded for `path` if its stat still matches (saves re-hashing)."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, sha256 FROM seeds WHERE path = ?",
+                    (self._key(path),),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is not None and int(row[0]) == int(size) and int(row[1]) == int(mtime_ns):
+            return str(row[2])
+        return None
+
+    def digest_for(self, path: Path) -> Optional[str]:
+        try:
+            st = Path(path).stat()
+            return self.known_digest(path, st.st_size, st.st_mtime_ns) or file_sha256(path)
+        except OSError:
+            return None
+
+    def parse_status(self, digest: str, tool: str) -> Optional[bool]:
+        """Whether content `digest` parses with mutation-ast build `tool`; None if unknown."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT parse_ok FROM parse_status WHERE sha256 = ? AND tool = ?",
+                    (digest, tool),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return None if row is None else bool(row[0])
+
+    def set_parse_status(self, digest: str, tool: str, parse_ok: bool, error: str = ""):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO parse_status (sha256, tool, parse_ok, error, updated)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (digest, tool, 1 if parse_ok else 0, str(error or "")[:2000], time.time()),
+                )
+        except sqlite3.Error as e:
+            self.logger.warning("parse status update failed: %s", e)
+
+    def record_parse(self, path: Path, tool: str, parse_ok: bool, error: str = ""):
+        digest = self.digest_for(path)
+        if digest is not None:
+            self.set_parse_status(digest, tool, parse_ok, error)
+
+    def path_parse_status(self, path: Path, tool: str) -> Optional[bool]:
+        digest = self.digest_for(path)
+        return self.parse_status(digest, tool) if digest is not None else None
+
+    def _store(self, key: str, size: int, mtime_ns: int, digest: str, metrics: Dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO seeds (path, size, mtime_ns, sha256, parse_ok, metrics, updated)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, int(size), int(mtime_ns), digest, 1 if metrics else 0, json.dumps(metrics, sort_keys=True), time.time()),
+        )
+
+    def put(self, path: Path, metrics: Dict[str, int]):
+        """Record `metrics` ({} = did not parse) for the current content of `path`."""
+        path = Path(path)
+        try:
+            st = path.stat()
+            digest = file_sha256(path)
+            with self._lock:
+                self._store(self._key(path), st.st_size, st.st_mtime_ns, digest, dict(metrics))
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning("seed index update failed for %s: %s", path, e)
+
+    def remove_missing(self, root: Optional[Path] = None) -> int:
+        """Drop rows whose files no longer exist (optionally only under `root`)."""
+        prefix = self._key(root) if root is not None else ""
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM seeds WHERE path LIKE ?", (prefix + "%",)).fetchall()
+        gone = [(p,) for (p,) in rows if not os.path.exists(p)]
+        if gone:
+            with self._lock:
+                self._conn.executemany("DELETE FROM seeds WHERE path = ?", gone)
+        return len(gone)
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM seeds").fetchone()[0])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def iter_seed_files(seeds_dir: Path) -> List[Path]:
+    seeds_dir = Path(seeds_dir)
+    return sorted(
+        p for p in seeds_dir.rglob("*.rs")
+        if DEFAULT_INDEX_DIRNAME not in p.relative_to(seeds_dir).parts and p.is_file()
+    )
+
+
+def build_index(index: SeedIndex, files: Iterable[Path], bin_path: Path, jobs: int, timeout_sec: float = 20.0) -> Dict[str, int]:
+    """Score every file not already indexed.
+
+    One `ttdn_metrics_bulk` run over all of them; if the binary predates that
+    mode, `jobs` mutation servers score them in parallel instead.
+    """
+    todo = [p for p in files if index.get(p) is None]
+    counts = {"total": len(todo), "indexed": 0, "parse_failed": 0, "errors": 0}
+    if not todo:
+        return counts
+
+    def _record(p: Path, metrics: Optional[Dict[str, int]], n: int):
+        if metrics is None:
+            counts["errors"] += 1
+            return
+        index.put(p, metrics)
+        counts["indexed"] += 1
+        if not metrics:
+            counts["parse_failed"] += 1
+        if n % 1000 == 0:
+            logging.info("indexed %d/%d (%.1f files/s)", n, len(todo), n / max(1e-6, time.time() - start))
+
+    start = time.time()
+    # <mutation-AST>/target/<profile>/mutation-ast
+    model = TTDNModel(mutation_ast_dir=Path(bin_path).absolute().parents[2], bin_path=bin_path)
+    try:
+        for n, (p, metrics) in enumerate(model.bulk_metrics(todo, jobs=jobs), 1):
+            _record(p, metrics, n)
+        return counts
+    except MutationToolError as e:
+        if counts["indexed"] or counts["errors"]:
+            raise
+        logging.warning("bulk scoring unavailable (%s); falling back to %d mutation servers", e, jobs)
+
+    local = threading.local()
+    clients: List[MutationServerClient] = []
+    clients_lock = threading.Lock()
+
+    def _client() -> MutationServerClient:
+        c = getattr(local, "client", None)
+        if c is None:
+            c = MutationServerClient(bin_path, cwd=Path(bin_path).parent, timeout_sec=timeout_sec)
+            local.client = c
+            with clients_lock:
+                clients.append(c)
+        return c
+
+    def _score(p: Path):
+        try:
+            return p, _client().ttdn_metrics(p)
+        except MutationToolError:
+            return p, None
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as ex:
+            futures = [ex.submit(_score, p) for p in todo]
+            for n, fut in enumerate(as_completed(futures), 1):
+                p, metrics = fut.result()
+                _record(p, metrics, n)
+    finally:
+        for c in clients:
+            c.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build/refresh the persistent seed TTDN metrics index.")
+    parser.add_argument("--seeds", type=Path, default=Path("seeds"), help="Seeds directory")
+    parser.add_argument("--index-dir", type=Path, default=None, help="Index directory (default: <seeds>/.index)")
+    parser.add_argument(
+        "--bin",
+        type=Path,
+        default=Path("mutation/mutation-AST/target/release/mutation-ast"),
+        help="mutation-ast binary",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel scorers")
+    parser.add_argument("--prune", action="store_true", help="Drop rows for files that no longer exist")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    index = SeedIndex(args.index_dir) if args.index_dir else SeedIndex.for_seeds_dir(args.seeds)
+    if args.prune:
+        logging.info("pruned %d stale rows", index.remove_missing(args.seeds))
+    files = iter_seed_files(args.seeds)
+    start = time.time()
+    counts = build_index(index, files, args.bin, args.jobs)
+    logging.info(
+        "seed index: %d files, %d to score, %d indexed (%d parse failures, %d errors) in %.1fs; %d rows in %s",
+        len(files),
+        counts["total"],
+        counts["indexed"],
+        counts["parse_failed"],
+        counts["errors"],
+        time.time() - start,
+        index.count(),
+        index.db_path,
+    )
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.mutation_client import MutationToolError
+from utils.seed_index import DEFAULT_INDEX_DIRNAME, SeedIndex
+from utils.ttdn_model import TTDNModel
+
+
+# Only this much of a seed is scanned for internal-only markers.
+INTERNAL_SCAN_BYTES = 8000
+
+
+def is_internal_only_source(head: str) -> bool:
+    """Heuristically flag seeds that rely on internal-only rustc features.
+
+    Motivation: ICEs triggered by incorrect usage of internal-only features (e.g.
+    rustc_attrs/lang_items/intrinsics) are typically not accepted upstream.
+
+    `head` is a prefix of the file: these attributes are almost always at the top.
+    """
+    head = head[:INTERNAL_SCAN_BYTES]
+
+    # Feature gates that strongly suggest "internal-only" testing seeds.
+    internal_features = (
+        "rustc_attrs",
+        "lang_items",
+        "intrinsics",
+        "core_intrinsics",
+        "rustc_private",
+    )
+
+    # Quick substring checks (fast path).
+    if "#![feature(" in head and any(f in head for f in internal_features):
+        return True
+
+    # Attributes often used with rustc-internal plumbing.
+    internal_attr_markers = (
+        "#[rustc_",
+        "#![rustc_",
+        "#[lang =",
+        "#![no_core]",
+        "#![rustc_attrs]",
+    )
+    if any(m in head for m in internal_attr_markers):
+        return True
+
+    # Intrinsics linkage style.
+    if "extern \"rust-intrinsic\"" in head:
+        return True
+
+    return False
+
+
+def infer_family(seed: Path) -> str:
+    # If filename encodes family: <stem>__fam__<family>
+    try:
+        stem = seed.stem
+        if "__fam__" in stem:
+            return stem.split("__fam__", 1)[1]
+    except Exception:
+        pass
+    # Fallback: treat each original seed as its own family
+    return str(seed.resolve())
+
+
+@dataclass(frozen=True)
+class SeedEntry:
+    path: Path
+    sha256: str
+    size: int
+    internal_only: bool
+    family: str
+    parse_ok: Optional[bool]  # None: never parsed by this mutation-ast build
+    duplicates: int = 0  # other paths with identical content, collapsed into this one
+
+
+class SeedManifest:
+    """Corpus summary built once by the parent process.
+
+    One pass over `seeds_dir` (stat, sha256, internal-only scan of the head);
+    hashes of unchanged files come from the seed index instead of being
+    recomputed, and the parse-ok flag from its parse-status table for the
+    current mutation-ast build (`tool`). Identical contents collapse to their
+    first path in sorted order. Workers receive only `shard(i, n)`.
+    """
+
+    def __init__(self, entries: List[SeedEntry], empty: int = 0, duplicates: int = 0, elapsed: float = 0.0):
+        self.entries = entries
+        self.empty = empty
+        self.duplicates = duplicates
+        self.elapsed = elapsed
+
+    @classmethod
+    def build(
+        cls,
+        seeds_dir: Path,
+        index: Optional[SeedIndex] = None,
+        jobs: int = 8,
+        tool: Optional[str] = None,
+    ) -> "SeedManifest":
+        start = time.time()
+        seeds_dir = Path(seeds_dir)
+        paths = sorted(
+            p for p in seeds_dir.rglob("*.rs")
+            if DEFAULT_INDEX_DIRNAME not in p.relative_to(seeds_dir).parts
+        )
+
+        def _scan(p: Path):
+            try:
+                st = p.stat()
+            except OSError:
+                return None
+            if not p.is_file():
+                return None
+            if st.st_size == 0:
+                return p, None, 0, False
+            digest = index.known_digest(p, st.st_size, st.st_mtime_ns) if index is not None else None
+            try:
+                if digest is None:
+                    data = p.read_bytes()
+                    digest = hashlib.sha256(data).hexdigest()
+                    head = data[:INTERNAL_SCAN_BYTES]
+                else:
+                    with open(p, "rb") as f:
+                        head = f.read(INTERNAL_SCAN_BYTES)
+            except OSError:
+                return None
+            internal = is_internal_only_source(head.decode("utf-8", errors="ignore"))
+            return p, digest, st.st_size, internal
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as ex:
+            scanned = [r for r in ex.map(_scan, paths) if r is not None]
+
+        entries: List[SeedEntry] = []
+        first_by_digest: Dict[str, int] = {}
+        dup_counts: Dict[str, int] = {}
+        empty = 0
+        for p, digest, size, internal in scanned:
+            if digest is None:
+                empty += 1
+                continue
+            if digest in first_by_digest:
+                dup_counts[digest] = dup_counts.get(digest, 0) + 1
+                continue
+            first_by_digest[digest] = len(entries)
+            parse_ok = index.parse_status(digest, tool) if index is not None and tool else None
+            entries.append(SeedEntry(p, digest, size, internal, infer_family(p), parse_ok))
+        for digest, n in dup_counts.items():
+            i = first_by_digest[digest]
+            e = entries[i]
+            entries[i] = SeedEntry(e.path, e.sha256, e.size, e.internal_only, e.family, e.parse_ok, n)
+        return cls(entries, empty=empty, duplicates=sum(dup_counts.values()), elapsed=time.time() - start)
+
+    def preparse(self, index: SeedIndex, tool: str, model: TTDNModel, jobs: Optional[int] = None) -> int:
+        """Bulk-parse entries with unknown parse status; records verdicts and metrics.
+
+        Returns the number of entries whose status was filled in.
+        """
+        pending = {e.path.absolute(): i for i, e in enumerate(self.entries) if e.parse_ok is None and not e.internal_only}
+        if not pending:
+            return 0
+        filled = 0
+        try:
+            for path, metrics in model.bulk_metrics(list(pending), jobs=jobs):
+                i = pending.get(path)
+                if i is None or metrics is None:
+                    continue
+                e = self.entries[i]
+                ok = bool(metrics)
+                index.set_parse_status(e.sha256, tool, ok)
+                index.put(e.path, metrics)
+                self.entries[i] = SeedEntry(e.path, e.sha256, e.size, e.internal_only, e.family, ok, e.duplicates)
+                filled += 1
+        except MutationToolError:
+            # Older binary without ttdn_metrics_bulk: workers discover failures as they go.
+            pass
+        return filled
+
+    def usable(self) -> List[SeedEntry]:
+        """Entries a worker may fuzz: not internal-only and not known to fail parsing."""
+        return [e for e in self.entries if not e.internal_only and e.parse_ok is not False]
+
+    def shard(self, shard_index: int, num_shards: int) -> List[SeedEntry]:
+        num_shards = max(1, int(num_shards))
+        return self.usable()[shard_index::num_shards]
+
+    def summary(self) -> str:
+        internal = sum(1 for e in self.entries if e.internal_only)
+        unparsable = sum(1 for e in self.entries if e.parse_ok is False)
+        return (
+            f"seed manifest: {len(self.usable())} usable of {len(self.entries)} distinct seeds "
+            f"({self.duplicates} duplicate copies collapsed, {self.empty} empty, "
+            f"{internal} internal-only, {unparsable} known parse failures) in {self.elapsed:.1f}s"
+        )
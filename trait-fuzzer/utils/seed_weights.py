@@ -0,0 +1,209 @@
+import random
+from array import array
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class FenwickTree:
+    """Binary indexed tree over non-negative float weights.
+
+    `set`, `prefix` and `find` are O(log n); growing doubles the capacity and
+    rebuilds in O(n). Incremental float updates drift, so the tree is rebuilt
+    from the exact per-slot values every `4 * capacity` updates (amortized O(1)).
+    """
+
+    def __init__(self, capacity: int = 16):
+        self._values = array("d", [0.0]) * max(1, int(capacity))
+        self._tree = array("d", [0.0]) * (len(self._values) + 1)
+        self._updates = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def grow(self, capacity: int):
+        if capacity <= len(self._values):
+            return
+        self._values.extend(array("d", [0.0]) * (capacity - len(self._values)))
+        self.rebuild()
+
+    def rebuild(self):
+        n = len(self._values)
+        tree = array("d", [0.0]) * (n + 1)
+        for i in range(1, n + 1):
+            tree[i] += self._values[i - 1]
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+        self._updates = 0
+
+    def get(self, i: int) -> float:
+        return self._values[i]
+
+    def set(self, i: int, weight: float):
+        weight = max(0.0, float(weight))
+        delta = weight - self._values[i]
+        if delta == 0.0:
+            return
+        self._values[i] = weight
+        n = len(self._values)
+        j = i + 1
+        tree = self._tree
+        while j <= n:
+            tree[j] += delta
+            j += j & -j
+        self._updates += 1
+        if self._updates > 4 * n:
+            self.rebuild()
+
+    def prefix(self, i: int) -> float:
+        """Sum of slots [0, i)."""
+        total = 0.0
+        tree = self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def total(self) -> float:
+        return self.prefix(len(self._values))
+
+    def _descend(self, target: float) -> int:
+        pos = 0
+        tree = self._tree
+        n = len(self._values)
+        step = 1 << (n.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+    def find(self, target: float) -> Optional[int]:
+        """Slot i with prefix(i) <= target < prefix(i + 1), skipping zero-weight slots."""
+        pos = self._descend(target)
+        if pos < len(self._values) and self._values[pos] > 0.0:
+            return pos
+        # Only reachable through float drift near the upper end: resync and clamp.
+        self.rebuild()
+        total = self.total()
+        if total <= 0.0:
+            return None
+        pos = self._descend(min(target, total * (1.0 - 1e-12)))
+        return pos if pos < len(self._values) and self._values[pos] > 0.0 else None
+
+
+class WeightedSampler(Generic[K]):
+    """Keys with non-negative weights; O(log n) add/remove/reweight/sample.
+
+    Keeps two trees over the same slots: the weights, and a 0/1 "live" count
+    (weight > 0) for uniform sampling among live keys. Removed slots are reused.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self._weights = FenwickTree(capacity)
+        self._live = FenwickTree(capacity)
+        self._keys: List[Optional[K]] = [None] * len(self._weights)
+        self._slot: Dict[K, int] = {}
+        self._free: List[int] = list(range(len(self._keys) - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._slot
+
+    def __iter__(self):
+        return iter(self._slot)
+
+    def _grow(self):
+        capacity = len(self._keys) * 2
+        self._weights.grow(capacity)
+        self._live.grow(capacity)
+        self._free.extend(range(capacity - 1, len(self._keys) - 1, -1))
+        self._keys.extend([None] * (capacity - len(self._keys)))
+
+    def add(self, key: K, weight: float):
+        if key in self._slot:
+            self.set_weight(key, weight)
+            return
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._keys[slot] = key
+        self._slot[key] = slot
+        self._weights.set(slot, weight)
+        self._live.set(slot, 1.0 if weight > 0 else 0.0)
+
+    def add_many(self, items: Iterable):
+        """Bulk insert of (key, weight) pairs with a single O(n) rebuild."""
+        items = [(k, w) for k, w in items if k not in self._slot]
+        need = len(self._slot) + len(items)
+        capacity = len(self._keys)
+        while capacity < need:
+            capacity *= 2
+        if capacity > len(self._keys):
+            self._weights._values.extend(array("d", [0.0]) * (capacity - len(self._keys)))
+            self._live._values.extend(array("d", [0.0]) * (capacity - len(self._keys)))
+            self._free = list(range(capacity - 1, len(self._keys) - 1, -1)) + self._free
+            self._keys.extend([None] * (capacity - len(self._keys)))
+        for key, weight in items:
+            slot = self._free.pop()
+            weight = max(0.0, float(weight))
+            self._keys[slot] = key
+            self._slot[key] = slot
+            self._weights._values[slot] = weight
+            self._live._values[slot] = 1.0 if weight > 0 else 0.0
+        self._weights.rebuild()
+        self._live.rebuild()
+
+    def remove(self, key: K):
+        slot = self._slot.pop(key, None)
+        if slot is None:
+            return
+        self._weights.set(slot, 0.0)
+        self._live.set(slot, 0.0)
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def set_weight(self, key: K, weight: float):
+        slot = self._slot.get(key)
+        if slot is None:
+            return
+        self._weights.set(slot, weight)
+        self._live.set(slot, 1.0 if weight > 0 else 0.0)
+
+    def weight(self, key: K) -> float:
+        slot = self._slot.get(key)
+        return self._weights.get(slot) if slot is not None else 0.0
+
+    def total_weight(self) -> float:
+        return self._weights.total()
+
+    def live_count(self) -> int:
+        return int(round(self._live.total()))
+
+    def sample(self, uniform: bool = False, rng=random) -> Optional[K]:
+        """One live key, proportional to weight (or uniformly); None if none is live."""
+        tree = self._live if uniform else self._weights
+        total = tree.total()
+        if total <= 0.0:
+            return None
+        slot = tree.find(rng.random() * total)
+        return self._keys[slot] if slot is not None else None
+
+    def sample_many(self, k: int, uniform: bool = False, rng=random) -> List[K]:
+        """Up to `k` distinct live keys (draws with replacement, duplicates dropped)."""
+        picked: Dict[K, None] = {}
+        for _ in range(max(0, int(k))):
+            key = self.sample(uniform=uniform, rng=rng)
+            if key is None:
+                break
+            picked[key] = None
+        return list(picked)
+
+    def live_keys(self, keys: Iterable[K]) -> List[K]:
+        return [k for k in keys if self.weight(k) > 0.0]
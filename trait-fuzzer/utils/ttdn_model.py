@@ -1,8 +1,13 @@
 import json
+import os
 import subprocess
+import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from utils.mutation_client import MutationServerClient, MutationToolError
+from utils.scratch import get_scratch, scratch_path
 
 
 @dataclass(frozen=True)
@@ -15,15 +20,35 @@ class TTDNModel:
 
     Source of truth is the Rust `syn`-based extractor in mutation-AST (crate::ttdn).
     We call it via `cargo run` in `--mode ttdn_metrics` and parse the JSON output.
+    If a `MutationServerClient` is given, metrics are served by the long-lived
+    `--mode serve` process instead (one subprocess per file otherwise).
+    Whole corpora go through `bulk_metrics` (`--mode ttdn_metrics_bulk`).
     """
 
-    def __init__(self, mutation_ast_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        mutation_ast_dir: Optional[Path] = None,
+        client: Optional[MutationServerClient] = None,
+        bin_path: Optional[Path] = None,
+    ):
         self.mutation_ast_dir = Path(mutation_ast_dir) if mutation_ast_dir is not None else Path("mutation/mutation-AST")
+        self.client = client
+        self.bin_path = Path(bin_path) if bin_path is not None else None
 
     def calculate_complexity_for_file(self, rust_file: Path, timeout_sec: int = 20) -> TTDNComplexity:
         rust_file = Path(rust_file)
+        if self.client is not None:
+            try:
+                return TTDNComplexity(extra=self.client.ttdn_metrics(rust_file))
+            except MutationToolError:
+                # Fall through to the one-shot subprocess path.
+                pass
+
         # Write to a temp output path (content is irrelevant for metrics mode).
-        out_path = rust_file.with_suffix(rust_file.suffix + ".ttdn_out")
+        if get_scratch() is not None:
+            out_path = scratch_path(rust_file.name + ".ttdn_out")
+        else:
+            out_path = rust_file.with_suffix(rust_file.suffix + ".ttdn_out")
 
         bin_path = self.mutation_ast_dir / "target" / "debug" / "mutation-ast"
         if bin_path.exists():
@@ -72,3 +97,84 @@ class TTDNModel:
                     out_path.unlink()
             except Exception:
                 pass
+
+    def _bin_path(self) -> Optional[Path]:
+        if self.bin_path is not None and self.bin_path.exists():
+            return self.bin_path
+        if self.client is not None and self.client.bin_path.exists():
+            return self.client.bin_path
+        for profile in ("release", "debug"):
+            candidate = self.mutation_ast_dir / "target" / profile / "mutation-ast"
+            if candidate.exists():
+                return candidate
+        return None
+
+    def bulk_metrics(
+        self,
+        inputs: Union[Path, List[Path]],
+        jobs: Optional[int] = None,
+        timeout_sec: Optional[float] = None,
+    ) -> Iterator[Tuple[Path, Optional[Dict[str, int]]]]:
+        """Score a directory tree or a list of files in one `ttdn_metrics_bulk` process.
+
+        Yields (path, metrics) in completion order: `{}` when the file does not
+        parse, None when it could not be read/scored. Paths are absolute.
+        Raises MutationToolError if the tool fails before producing any output.
+        """
+        list_path: Optional[str] = None
+        if isinstance(inputs, (str, Path)):
+            target = Path(inputs).absolute()
+        else:
+            fd, list_path = tempfile.mkstemp(prefix="ttdn_bulk_", suffix=".txt")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for p in inputs:
+                    f.write(str(Path(p).absolute()) + "\n")
+            target = Path(list_path)
+
+        bin_path = self._bin_path()
+        tail = ["--input", str(target), "--mode", "ttdn_metrics_bulk"]
+        if jobs:
+            tail += ["--jobs", str(int(jobs))]
+        if bin_path is not None:
+            cmd = [str(bin_path.absolute())] + tail
+        else:
+            cmd = ["cargo", "run", "--release", "--quiet", "--"] + tail
+
+        produced = 0
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                cwd=str(self.mutation_ast_dir.absolute()),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            try:
+                for line in proc.stdout:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    produced += 1
+                    path = Path(row.get("path", ""))
+                    if row.get("parse_failed"):
+                        yield path, {}
+                    elif isinstance(row.get("metrics"), dict):
+                        yield path, {k: int(v) for k, v in row["metrics"].items() if isinstance(v, int)}
+                    else:
+                        yield path, None
+                _, stderr = proc.communicate(timeout=timeout_sec)
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+            if proc.returncode != 0 and produced == 0:
+                raise MutationToolError(f"ttdn_metrics_bulk failed (rc={proc.returncode}): {(stderr or '').strip()[-500:]}")
+        except OSError as e:
+            raise MutationToolError(f"ttdn_metrics_bulk could not start: {e}")
+        finally:
+            if list_path is not None:
+                try:
+                    os.unlink(list_path)
+                except OSError:
+                    pass